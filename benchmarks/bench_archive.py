@@ -0,0 +1,129 @@
+"""
+Archive Benchmark - Live database size, backup time and report times before and after yearly archiving
+
+Builds a synthetic database with several years of invoices and stock
+transactions ending today, with month-end stock snapshots as the
+scheduler writes them, then archives every closed financial year and
+compacts the live database. Reports on the current year read the live
+tables only; reports spanning years also read the attached archives.
+
+Run from the project root:
+    python -m benchmarks.bench_archive [--invoices 400000] [--products 2000] [--days 1825]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from database.db_manager import DatabaseManager
+from benchmarks.bench_product_sales import timed
+from benchmarks.bench_stock_movement import TRANSACTION_TYPES
+from utils.stock_snapshots import write_due_snapshots
+
+LINES_PER_INVOICE = 3
+TRANSACTIONS_PER_INVOICE = 5
+
+
+def populate(db: DatabaseManager, invoices: int, products: int, days: int) -> date:
+    """Insert products, settled invoices with items and payments, and a stock ledger; returns the first day"""
+    rng = random.Random(1)
+    start = date.today() - timedelta(days=days)
+
+    def day(idx, total):
+        return (start + timedelta(days=idx * days // total)).isoformat()
+
+    db.cursor.executemany(
+        """INSERT INTO products (product_code, product_name, unit, purchase_price, selling_price,
+                                 opening_stock, current_stock)
+           VALUES (?, ?, 'PCS', 80, 100, 100, 100)""",
+        ((f"SKU{idx:06d}", f"Product {idx}") for idx in range(products))
+    )
+    db.cursor.executemany(
+        """INSERT INTO invoices (invoice_number, customer_name, invoice_date, invoice_time, subtotal,
+                                 grand_total, rounded_total, payment_status, amount_paid, balance_amount)
+           VALUES (?, 'Walk-in', ?, '10:00:00', 300, 354, 354, 'paid', 354, 0)""",
+        ((f"INV{idx:08d}", day(idx, invoices)) for idx in range(invoices))
+    )
+    db.cursor.executemany(
+        """INSERT INTO invoice_items (invoice_id, product_id, product_code, product_name, quantity,
+                                      unit_price, unit_cost, taxable_amount, gst_rate, gst_amount, total_amount)
+           VALUES (?, ?, '', '', 1, 100, 80, 100, 18, 18, 118)""",
+        ((idx // LINES_PER_INVOICE + 1, rng.randint(1, products)) for idx in range(invoices * LINES_PER_INVOICE))
+    )
+    db.cursor.executemany(
+        """INSERT INTO payments (invoice_id, payment_date, payment_time, amount, payment_mode)
+           VALUES (?, ?, '10:05:00', 354, 'cash')""",
+        ((idx + 1, day(idx, invoices)) for idx in range(invoices))
+    )
+    transactions = invoices * TRANSACTIONS_PER_INVOICE
+    db.cursor.executemany(
+        """INSERT INTO stock_transactions (product_id, transaction_type, quantity, transaction_date)
+           VALUES (?, ?, ?, ?)""",
+        ((rng.randint(1, products), rng.choice(TRANSACTION_TYPES), rng.randint(1, 10), day(idx, transactions))
+         for idx in range(transactions))
+    )
+    db.conn.commit()
+    return start
+
+
+def measure(db: DatabaseManager, tmp: str, periods) -> dict:
+    """File size, backup time and report times"""
+    backup_path = os.path.join(tmp, 'backup.db')
+    started = time.perf_counter()
+    db.backup_database(backup_path)
+    backup_seconds = time.perf_counter() - started
+    os.remove(backup_path)
+
+    results = {'size': os.path.getsize(db.db_path), 'backup': backup_seconds}
+    for label, start_date, end_date in periods:
+        results[label] = timed(lambda: (db.search_invoices(start_date=start_date, end_date=end_date),
+                                        db.get_stock_movement(start_date, end_date)), repeat=3)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--invoices', type=int, default=400000)
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=1825)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        first = populate(db, args.invoices, args.products, args.days)
+        write_due_snapshots(db)
+        today = date.today()
+        current_year = db.financial_year_of(today.isoformat())
+        periods = (
+            ("this month", today.replace(day=1).isoformat(), today.isoformat()),
+            ("this financial year", db.financial_year_bounds(current_year)[0], today.isoformat()),
+            ("all years", first.isoformat(), today.isoformat()),
+        )
+        print(f"{args.invoices:,} invoices, {args.invoices * TRANSACTIONS_PER_INVOICE:,} stock transactions "
+              f"from {first} to {today}")
+
+        before = measure(db, tmp, periods)
+
+        started = time.perf_counter()
+        years = db.get_archivable_years()
+        for year in years:
+            db.archive_financial_year(year)
+        archive_seconds = time.perf_counter() - started
+        db.compact_database()
+        after = measure(db, tmp, periods)
+
+        print(f"Archived {len(years)} financial years in {archive_seconds:.1f}s")
+        print(f"live database {before['size'] / 2 ** 20:>8.1f} MB -> {after['size'] / 2 ** 20:>8.1f} MB   "
+              f"backup {before['backup']:>6.2f} s -> {after['backup']:>6.2f} s")
+        for label, _, _ in periods:
+            (before_ms, before_rows), (after_ms, after_rows) = before[label], after[label]
+            assert len(before_rows[0]) == len(after_rows[0]) and before_rows[1] == after_rows[1]
+            print(f"{label:<20} invoices + stock movement {before_ms:>8.1f} ms -> {after_ms:>8.1f} ms")
+
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
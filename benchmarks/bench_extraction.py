@@ -0,0 +1,148 @@
+"""
+Extraction Benchmark - Throughput, peak memory and accuracy per extractor strategy
+
+Scores every strategy of EnhancedPDFPriceExtractor against the ground-truth
+sidecars written by benchmarks.synthetic_corpus.
+
+Run from the project root:
+    python -m benchmarks.synthetic_corpus --out bench_corpus
+    python -m benchmarks.bench_extraction bench_corpus [--strategies tables,streaming]
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import time
+import tracemalloc
+from typing import List, Dict, Callable
+
+from utils.pdf_price_extractor import EnhancedPDFPriceExtractor
+
+
+STRATEGIES: Dict[str, Callable[[EnhancedPDFPriceExtractor, str], List[Dict]]] = {
+    'tables': lambda e, path: e._extract_with_pdfplumber_tables(path),
+    'text': lambda e, path: e._extract_with_pdfplumber_text(path),
+    'pypdf2': lambda e, path: e._extract_with_pypdf2(path),
+    'patterns': lambda e, path: e._extract_with_pattern_matching(path),
+    'auto': lambda e, path: e.extract_from_pdf(path),
+    'streaming': lambda e, path: list(e.iter_products(path)),
+}
+
+
+def score(extracted: List[Dict], truth: List[Dict]) -> Dict:
+    """
+    Precision/recall against ground truth
+
+    An extracted product counts as correct when an unused truth product has
+    the same price and either the same code or a name contained in it.
+    """
+    by_price: Dict[float, List[Dict]] = {}
+    for item in truth:
+        by_price.setdefault(round(item['price'], 2), []).append(item)
+
+    correct = 0
+    for product in extracted:
+        candidates = by_price.get(round(product.get('price', 0), 2), [])
+        code = product.get('product_code', '').lower()
+        name = product.get('product_name', '').lower()
+        for idx, item in enumerate(candidates):
+            if (code == item['product_code'].lower()
+                    or item['product_name'].lower() in name
+                    or (name and name in item['product_name'].lower())):
+                candidates.pop(idx)
+                correct += 1
+                break
+
+    precision = correct / len(extracted) if extracted else 0.0
+    recall = correct / len(truth) if truth else 0.0
+    return {'correct': correct, 'precision': precision, 'recall': recall}
+
+
+def run_strategy(name: str, pdf_path: str, truth: Dict, measure_memory: bool) -> Dict:
+    """Time one strategy on one PDF, then optionally re-run it under tracemalloc"""
+    strategy = STRATEGIES[name]
+
+    start = time.perf_counter()
+    try:
+        extracted = strategy(EnhancedPDFPriceExtractor(), pdf_path)
+        error = ''
+    except Exception as e:
+        extracted, error = [], str(e)
+    elapsed = time.perf_counter() - start
+
+    peak_mb = None
+    if measure_memory and not error:
+        tracemalloc.start()
+        try:
+            strategy(EnhancedPDFPriceExtractor(), pdf_path)
+            peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+
+    result = {
+        'strategy': name,
+        'pdf': os.path.basename(pdf_path),
+        'pages': truth['pages'],
+        'seconds': elapsed,
+        'pages_per_sec': truth['pages'] / elapsed if elapsed else 0.0,
+        'extracted': len(extracted),
+        'peak_mb': peak_mb,
+        'error': error,
+    }
+    result.update(score(extracted, truth['products']))
+    return result
+
+
+def print_result(result: Dict):
+    """Print one result row"""
+    peak = f"{result['peak_mb']:8.1f}" if result['peak_mb'] is not None else '       -'
+    line = (f"{result['pdf']:<22} {result['strategy']:<10} {result['pages']:>6} "
+            f"{result['seconds']:>9.2f} {result['pages_per_sec']:>9.1f} {peak} "
+            f"{result['extracted']:>9} {result['precision']:>7.1%} {result['recall']:>7.1%}")
+    if result['error']:
+        line += f"  ERROR: {result['error']}"
+    print(line, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('corpus', help="Directory produced by benchmarks.synthetic_corpus")
+    parser.add_argument('--strategies', default=','.join(STRATEGIES),
+                        help=f"Comma-separated subset of: {', '.join(STRATEGIES)}")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Skip the tracemalloc pass (halves run time)")
+    parser.add_argument('--json', help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    # The extractor logs every page at INFO, which would dominate the timings
+    logging.getLogger('utils.pdf_price_extractor').setLevel(logging.WARNING)
+
+    strategies = [s.strip() for s in args.strategies.split(',') if s.strip()]
+    unknown = set(strategies) - set(STRATEGIES)
+    if unknown:
+        parser.error(f"Unknown strategies: {', '.join(sorted(unknown))}")
+
+    print(f"{'PDF':<22} {'Strategy':<10} {'Pages':>6} {'Seconds':>9} {'Pages/s':>9} "
+          f"{'Peak MB':>8} {'Products':>9} {'Prec':>7} {'Recall':>7}")
+
+    results = []
+    for pdf_path in sorted(glob.glob(os.path.join(args.corpus, '*.pdf'))):
+        truth_path = os.path.splitext(pdf_path)[0] + '.truth.json'
+        if not os.path.exists(truth_path):
+            continue
+        with open(truth_path, encoding='utf-8') as f:
+            truth = json.load(f)
+
+        for name in strategies:
+            result = run_strategy(name, pdf_path, truth, not args.no_memory)
+            print_result(result)
+            results.append(result)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
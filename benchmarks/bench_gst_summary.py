@@ -0,0 +1,54 @@
+"""
+GST Summary Benchmark - Tax by month and rate, rollup vs invoice_items scan
+
+Reuses the synthetic database of bench_product_sales, then times the GST
+summary read from gst_monthly_summary against the same aggregation over
+invoice_items joined to invoices.
+
+Run from the project root:
+    python -m benchmarks.bench_gst_summary [--lines 1000000] [--products 2000] [--days 730]
+"""
+import argparse
+import os
+import tempfile
+
+from database.db_manager import DatabaseManager
+from benchmarks.bench_product_sales import populate, timed
+
+SCAN_QUERY = """SELECT substr(i.invoice_date, 1, 7) AS tax_month, ii.gst_rate,
+                       SUM(ii.taxable_amount) AS taxable_amount, SUM(ii.gst_amount) AS gst_amount
+                FROM invoice_items ii
+                JOIN invoices i ON i.id = ii.invoice_id
+                WHERE i.invoice_date BETWEEN ? AND ?
+                GROUP BY tax_month, ii.gst_rate
+                ORDER BY tax_month, ii.gst_rate"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, default=1000000)
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=730)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        insert_seconds = populate(db, args.lines, args.products, args.days)
+        print(f"Inserted {args.lines:,} line items in {insert_seconds:.1f}s "
+              f"({args.lines / insert_seconds:,.0f}/s, rollup triggers included)")
+
+        for label, start_date, end_date in (("1 month", '2024-03-01', '2024-03-31'),
+                                            ("1 quarter", '2024-04-01', '2024-06-30'),
+                                            ("1 year", '2024-01-01', '2024-12-31')):
+            rollup_ms, rows = timed(lambda: db.get_gst_summary(start_date, end_date))
+            scan_ms, scanned = timed(lambda: db.execute_query(SCAN_QUERY, (start_date, end_date)), repeat=2)
+            assert len(rows) == len(scanned)
+            assert abs(sum(r['gst_amount'] for r in rows) - sum(r['gst_amount'] for r in scanned)) < 0.01
+            print(f"{label:<10} rollup {rollup_ms:>8.2f} ms   invoice_items scan {scan_ms:>8.1f} ms   "
+                  f"{len(rows)} month/rate rows")
+
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
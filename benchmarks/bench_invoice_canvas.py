@@ -0,0 +1,64 @@
+"""
+Invoice Canvas Benchmark - Invoices/sec for the canvas fast path vs the platypus layout
+
+Both renderers use the cached invoice template. Invoices too long for one
+page fall back to platypus inside the canvas renderer, so runs with many
+items measure the cost of that check as well.
+
+Run from the project root:
+    python -m benchmarks.bench_invoice_canvas [--invoices 500] [--items 10] [--logo logo.png]
+"""
+import argparse
+import io
+import random
+import time
+
+from benchmarks.bench_invoice_render import make_invoice
+from utils.pdf_generator import PDFGenerator, InvoiceTemplate
+
+
+def measure(renderer: str, company: dict, invoices: list):
+    """Render every invoice to memory and report invoices/sec"""
+    InvoiceTemplate.clear_cache()
+    generator = PDFGenerator(company, invoice_renderer=renderer)
+    # Warm the template so both runs measure steady-state rendering
+    generator.generate_invoice_pdf(*invoices[0], io.BytesIO())
+
+    size = 0
+    start = time.perf_counter()
+    for invoice, items in invoices:
+        buffer = io.BytesIO()
+        if not generator.generate_invoice_pdf(invoice, items, buffer):
+            raise RuntimeError(f"Failed to render {invoice['invoice_number']}")
+        size += buffer.tell()
+    elapsed = time.perf_counter() - start
+
+    print(f"{renderer:<9} {len(invoices):>6} invoices  {elapsed:>7.2f}s  "
+          f"{len(invoices) / elapsed:>8.1f} invoices/sec  {size / len(invoices) / 1024:>6.1f} KB/pdf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--invoices', type=int, default=500)
+    parser.add_argument('--items', type=int, default=10, help="Line items per invoice")
+    parser.add_argument('--logo', help="Logo image to include in the header")
+    args = parser.parse_args()
+
+    company = {
+        'company_name': 'ACME Electricals',
+        'address': '42 Industrial Estate, Pune',
+        'phone': '020-12345678',
+        'email': 'sales@acme.example',
+        'gstin': '27ABCDE1234F1Z5',
+        'logo_path': args.logo or '',
+    }
+
+    rng = random.Random(1)
+    invoices = [make_invoice(idx, args.items, rng) for idx in range(args.invoices)]
+
+    measure('platypus', company, invoices)
+    measure('canvas', company, invoices)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Invoice Render Benchmark - Invoices/sec with and without the cached invoice template
+
+"cold" drops the template cache before every invoice, so styles, header and
+logo are rebuilt per PDF as they were before the template layer; "cached"
+reuses them.
+
+Run from the project root:
+    python -m benchmarks.bench_invoice_render [--invoices 200] [--items 12] [--logo logo.png]
+"""
+import argparse
+import io
+import random
+import time
+
+from utils.pdf_generator import PDFGenerator, InvoiceTemplate
+
+
+def make_invoice(idx: int, item_count: int, rng: random.Random):
+    """One invoice row and its items, shaped like DatabaseManager results"""
+    items = []
+    subtotal = 0.0
+    for line in range(item_count):
+        quantity = rng.randint(1, 20)
+        unit_price = round(rng.uniform(10, 5000), 2)
+        taxable = quantity * unit_price
+        gst_amount = taxable * 0.18
+        subtotal += taxable
+        items.append({
+            'product_code': f"SKU{idx:05d}{line:02d}",
+            'product_name': f"Modular Switch {line % 9 + 1} Way Grey",
+            'quantity': quantity,
+            'unit': 'PCS',
+            'unit_price': unit_price,
+            'gst_rate': 18,
+            'total_amount': taxable + gst_amount,
+        })
+
+    tax_amount = subtotal * 0.18
+    invoice = {
+        'invoice_number': f"INV{1000 + idx}",
+        'invoice_date': '2024-03-31',
+        'invoice_time': '12:00:00',
+        'payment_status': 'unpaid',
+        'customer_name': f"Customer {idx}",
+        'customer_phone': '9876543210',
+        'customer_address': 'Shop 12, Main Road',
+        'subtotal': subtotal,
+        'tax_amount': tax_amount,
+        'grand_total': subtotal + tax_amount,
+        'rounded_total': round(subtotal + tax_amount),
+        'amount_paid': 0,
+        'balance_amount': round(subtotal + tax_amount),
+    }
+    return invoice, items
+
+
+def measure(label: str, company: dict, invoices: list, cold: bool):
+    """Render every invoice to memory and report invoices/sec"""
+    InvoiceTemplate.clear_cache()
+
+    start = time.perf_counter()
+    for invoice, items in invoices:
+        if cold:
+            InvoiceTemplate.clear_cache()
+        if not PDFGenerator(company).generate_invoice_pdf(invoice, items, io.BytesIO()):
+            raise RuntimeError(f"Failed to render {invoice['invoice_number']}")
+    elapsed = time.perf_counter() - start
+
+    print(f"{label:<7} {len(invoices):>6} invoices  {elapsed:>7.2f}s  "
+          f"{len(invoices) / elapsed:>8.1f} invoices/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--invoices', type=int, default=200)
+    parser.add_argument('--items', type=int, default=12, help="Line items per invoice")
+    parser.add_argument('--logo', help="Logo image to include in the header")
+    args = parser.parse_args()
+
+    company = {
+        'company_name': 'ACME Electricals',
+        'address': '42 Industrial Estate, Pune',
+        'phone': '020-12345678',
+        'email': 'sales@acme.example',
+        'gstin': '27ABCDE1234F1Z5',
+        'logo_path': args.logo or '',
+    }
+
+    rng = random.Random(1)
+    invoices = [make_invoice(idx, args.items, rng) for idx in range(args.invoices)]
+
+    measure('cold', company, invoices, cold=True)
+    measure('cached', company, invoices, cold=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Pattern Engine Benchmark - Lines/sec for the price-list text parsers
+
+Run from the project root:
+    python -m benchmarks.bench_pattern_engine [--lines 50000]
+"""
+import argparse
+import random
+import re
+import time
+
+from utils.pattern_engine import PatternEngine, DEFAULT_PATTERNS, PATTERN_FLAGS
+from utils.pdf_price_extractor import EnhancedPDFPriceExtractor
+
+
+LINES_PER_PAGE = 50
+
+
+def build_lines(count: int, seed: int = 42) -> list:
+    """Build a mix of line shapes seen in supplier price lists"""
+    rng = random.Random(seed)
+    shapes = [
+        lambda i: f"SKU-{i:05d} | Copper Wire {i % 40} mm | Rs. {rng.randint(100, 99999):,}.00",
+        lambda i: f"MOD{i:05d} Mono PERC Solar Module {rng.choice([330, 440, 550])}W {rng.randint(5000, 25000)}.00",
+        lambda i: f"LED Bulb Cool White Pack of {i % 12 + 1} ₹{rng.randint(50, 900)}",
+        lambda i: f"{rng.choice([100, 200, 550])}W Polycrystalline Panel {rng.randint(3000, 18000)}.00",
+        lambda i: f"Model: INV-{i:04d} Hybrid Inverter {rng.randint(1, 10)}kVA {rng.randint(20000, 90000)}.00",
+        lambda i: "Sr. No.   Description   Rate",
+    ]
+    return [rng.choice(shapes)(i) for i in range(count)]
+
+
+def legacy_scan(text: str) -> int:
+    """The pre-engine loop: pattern strings looked up and scanned per page"""
+    count = 0
+    for pattern in list(DEFAULT_PATTERNS):
+        for _ in re.finditer(pattern, text, PATTERN_FLAGS):
+            count += 1
+    return count
+
+
+def engine_scan(engine: PatternEngine, text: str) -> int:
+    """Scan with a compiled engine"""
+    return sum(1 for _ in engine.scan(text))
+
+
+def time_pages(label: str, pages: list, total_lines: int, scan) -> float:
+    """Time a page scanner and print lines/sec"""
+    start = time.perf_counter()
+    matches = sum(scan(page) for page in pages)
+    elapsed = time.perf_counter() - start
+    rate = total_lines / elapsed if elapsed else float('inf')
+    print(f"{label:<34} {rate:>12,.0f} lines/sec  ({matches} matches, {elapsed:.3f}s)")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, default=50000, help="Number of synthetic lines")
+    args = parser.parse_args()
+
+    lines = build_lines(args.lines)
+    pages = ['\n'.join(lines[i:i + LINES_PER_PAGE]) for i in range(0, len(lines), LINES_PER_PAGE)]
+
+    print(f"Scanning {len(lines):,} lines in {len(pages):,} pages\n")
+
+    sequential = PatternEngine.get('default')
+    PatternEngine.register_pack('bench-combined', DEFAULT_PATTERNS, combine=True)
+    combined = PatternEngine.get('bench-combined')
+
+    time_pages("page scan: legacy re.finditer", pages, len(lines), legacy_scan)
+    time_pages("page scan: engine (sequential)", pages, len(lines), lambda t: engine_scan(sequential, t))
+    time_pages("page scan: engine (combined)", pages, len(lines), lambda t: engine_scan(combined, t))
+
+    extractor = EnhancedPDFPriceExtractor()
+    time_pages("line parser: _parse_line_for_product", [lines], len(lines),
+               lambda chunk: sum(1 for idx, line in enumerate(chunk)
+                                 if extractor._parse_line_for_product(line, 1, idx)))
+    time_pages("full page: _patterns_from_text", pages, len(lines),
+               lambda t: len(extractor._patterns_from_text(t, 1, set())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Product Sales Benchmark - Product-wise sales over a date range, rollup vs invoice_items scan
+
+Builds a synthetic database, then times the product sales report read
+from the product_daily_sales / product_monthly_sales rollups against the
+same aggregation over invoice_items joined to invoices. Also reports the
+insert rate of line items with the rollup triggers in place.
+
+Run from the project root:
+    python -m benchmarks.bench_product_sales [--lines 1000000] [--products 2000] [--days 730]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from database.db_manager import DatabaseManager
+
+LINES_PER_INVOICE = 5
+
+SCAN_QUERY = """SELECT p.product_code, p.product_name, SUM(ii.quantity) AS quantity,
+                       SUM(ii.taxable_amount) AS revenue, SUM(ii.gst_amount) AS tax_amount,
+                       SUM(ii.taxable_amount - ii.quantity * p.purchase_price) AS margin
+                FROM invoice_items ii
+                JOIN invoices i ON i.id = ii.invoice_id
+                JOIN products p ON p.id = ii.product_id
+                WHERE i.invoice_date BETWEEN ? AND ?
+                GROUP BY ii.product_id
+                ORDER BY revenue DESC"""
+
+
+def populate(db: DatabaseManager, lines: int, products: int, days: int) -> float:
+    """Insert products, invoices and line items; returns seconds spent inserting line items"""
+    rng = random.Random(1)
+    start = date(2024, 1, 1)
+
+    db.cursor.executemany(
+        """INSERT INTO products (product_code, product_name, unit, purchase_price, selling_price)
+           VALUES (?, ?, 'PCS', ?, ?)""",
+        ((f"SKU{idx:06d}", f"Product {idx}", 80.0, 100.0) for idx in range(products))
+    )
+    invoices = lines // LINES_PER_INVOICE
+    db.cursor.executemany(
+        """INSERT INTO invoices (invoice_number, customer_name, invoice_date, invoice_time,
+                                 subtotal, grand_total, rounded_total)
+           VALUES (?, 'Walk-in', ?, '10:00:00', 0, 0, 0)""",
+        ((f"INV{idx:08d}", (start + timedelta(days=idx * days // invoices)).isoformat())
+         for idx in range(invoices))
+    )
+    db.conn.commit()
+
+    started = time.perf_counter()
+    db.cursor.executemany(
+        """INSERT INTO invoice_items (invoice_id, product_id, product_code, product_name, quantity,
+                                      unit_price, unit_cost, taxable_amount, gst_rate, gst_amount, total_amount)
+           VALUES (?, ?, '', '', ?, 100, 80, ?, 18, ?, ?)""",
+        ((idx // LINES_PER_INVOICE + 1, product_id, qty, qty * 100, qty * 18, qty * 118)
+         for idx in range(lines)
+         for product_id, qty in [(rng.randint(1, products), rng.randint(1, 10))])
+    )
+    db.conn.commit()
+    return time.perf_counter() - started
+
+
+def timed(fn, repeat: int = 5):
+    """Best of ``repeat`` runs, in milliseconds"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, default=1000000)
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=730)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        insert_seconds = populate(db, args.lines, args.products, args.days)
+        print(f"Inserted {args.lines:,} line items in {insert_seconds:.1f}s "
+              f"({args.lines / insert_seconds:,.0f}/s, rollup triggers included)")
+
+        for label, start_date, end_date in (("1 month", '2024-03-01', '2024-03-31'),
+                                            ("1 year", '2024-01-01', '2024-12-31'),
+                                            ("13 mon.", '2024-01-15', '2025-02-14')):
+            rollup_ms, rows = timed(lambda: db.get_product_sales(start_date, end_date))
+            scan_ms, scanned = timed(lambda: db.execute_query(SCAN_QUERY, (start_date, end_date)), repeat=2)
+            assert len(rows) == len(scanned)
+            assert abs(sum(r['revenue'] for r in rows) - sum(r['revenue'] for r in scanned)) < 0.01
+            print(f"{label:<8} rollup {rollup_ms:>8.1f} ms   invoice_items scan {scan_ms:>8.1f} ms   "
+                  f"{len(rows)} products")
+
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Spreadsheet Import Benchmark - Rows/sec and peak memory for XLSX/CSV price lists
+
+Run from the project root:
+    python -m benchmarks.bench_spreadsheet_import [--rows 500000] [--dir bench_corpus]
+"""
+import argparse
+import csv
+import logging
+import os
+import random
+import time
+import tracemalloc
+
+from utils.price_list_importer import SpreadsheetPriceExtractor
+
+
+HEADER = ['Sr', 'Item Code', 'Description', 'Unit', 'Dealer Price']
+
+
+def make_row(idx: int, rng: random.Random) -> list:
+    """One supplier row with a numeric price"""
+    return [idx, f"SKU{idx:07d}", f"Modular Switch {idx % 97} Way Grey", 'PCS',
+            round(rng.uniform(10, 50000), 2)]
+
+
+def write_csv(path: str, rows: int):
+    """Write a CSV price list with a title row above the header"""
+    rng = random.Random(1)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ACME Electricals - Dealer Price List'])
+        writer.writerow(HEADER)
+        for idx in range(rows):
+            writer.writerow(make_row(idx, rng))
+
+
+def write_xlsx(path: str, rows: int):
+    """Write an XLSX price list with openpyxl in write-only mode"""
+    from openpyxl import Workbook
+
+    rng = random.Random(1)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Price List')
+    sheet.append(['ACME Electricals - Dealer Price List'])
+    sheet.append(HEADER)
+    for idx in range(rows):
+        sheet.append(make_row(idx, rng))
+    workbook.save(path)
+
+
+def measure(label: str, path: str, rows: int):
+    """Stream a file through the extractor, timing and then tracing memory"""
+    start = time.perf_counter()
+    count = sum(1 for _ in SpreadsheetPriceExtractor().iter_products(path))
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        for _ in SpreadsheetPriceExtractor().iter_products(path):
+            pass
+        peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    print(f"{label:<6} {size_mb:>8.1f} MB  {count:>9,} products  {elapsed:>7.2f}s  "
+          f"{rows / elapsed:>10,.0f} rows/sec  peak {peak_mb:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--dir', default='bench_corpus', help="Where to write the generated files")
+    parser.add_argument('--skip-xlsx', action='store_true', help="XLSX generation is slow at 500k rows")
+    args = parser.parse_args()
+
+    logging.getLogger('utils.pdf_price_extractor').setLevel(logging.WARNING)
+    os.makedirs(args.dir, exist_ok=True)
+
+    csv_path = os.path.join(args.dir, f"price_list_{args.rows}.csv")
+    if not os.path.exists(csv_path):
+        print(f"Writing {csv_path} ...")
+        write_csv(csv_path, args.rows)
+    measure('CSV', csv_path, args.rows)
+
+    if not args.skip_xlsx:
+        xlsx_path = os.path.join(args.dir, f"price_list_{args.rows}.xlsx")
+        if not os.path.exists(xlsx_path):
+            print(f"Writing {xlsx_path} ...")
+            write_xlsx(xlsx_path, args.rows)
+        measure('XLSX', xlsx_path, args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Stock Movement Benchmark - Opening/in/out/closing per product, with and without snapshots
+
+Builds a synthetic stock ledger spread over several years, then times the
+stock movement report for a recent month before and after writing month-end
+stock snapshots. Without snapshots the opening stock replays every earlier
+transaction; with them only the transactions since the last month end.
+
+Run from the project root:
+    python -m benchmarks.bench_stock_movement [--transactions 2000000] [--products 2000] [--days 1460]
+"""
+import argparse
+import calendar
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from database.db_manager import DatabaseManager
+from benchmarks.bench_product_sales import timed
+
+TRANSACTION_TYPES = ('sale', 'sale', 'sale', 'purchase', 'return_from_customer', 'damage')
+
+
+def populate(db: DatabaseManager, transactions: int, products: int, days: int) -> date:
+    """Insert products and a stock ledger; returns the first day of the ledger"""
+    rng = random.Random(1)
+    start = date(2022, 1, 1)
+
+    db.cursor.executemany(
+        """INSERT INTO products (product_code, product_name, unit, purchase_price, selling_price,
+                                 opening_stock, current_stock)
+           VALUES (?, ?, 'PCS', 80, 100, 100, 100)""",
+        ((f"SKU{idx:06d}", f"Product {idx}") for idx in range(products))
+    )
+    db.cursor.executemany(
+        """INSERT INTO stock_transactions (product_id, transaction_type, quantity, transaction_date)
+           VALUES (?, ?, ?, ?)""",
+        ((rng.randint(1, products), rng.choice(TRANSACTION_TYPES), rng.randint(1, 10),
+          (start + timedelta(days=idx * days // transactions)).isoformat())
+         for idx in range(transactions))
+    )
+    db.conn.commit()
+    return start
+
+
+def month_ends(first: date, last: date):
+    """Last day of every month from first up to, not including, last"""
+    year, month = first.year, first.month
+    while True:
+        end = date(year, month, calendar.monthrange(year, month)[1])
+        if end >= last:
+            return
+        yield end.isoformat()
+        year, month = year + month // 12, month % 12 + 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--transactions', type=int, default=2000000)
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=1460)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        first = populate(db, args.transactions, args.products, args.days)
+        last = first + timedelta(days=args.days - 1)
+        period = (date(last.year, last.month, 1).isoformat(), last.isoformat())
+        print(f"{args.transactions:,} transactions over {args.days} days; report period {period[0]} to {period[1]}")
+
+        replay_ms, replayed = timed(lambda: db.get_stock_movement(*period), repeat=2)
+
+        started = time.perf_counter()
+        snapshots = 0
+        for snapshot_date in month_ends(first, last):
+            db.write_stock_snapshot(snapshot_date)
+            snapshots += 1
+        snapshot_seconds = time.perf_counter() - started
+
+        snapshot_ms, rows = timed(lambda: db.get_stock_movement(*period))
+        assert rows == replayed
+
+        print(f"Wrote {snapshots} month-end snapshots in {snapshot_seconds:.1f}s")
+        print(f"full replay {replay_ms:>8.1f} ms   from snapshot {snapshot_ms:>8.1f} ms   {len(rows)} products")
+
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Stock Report Benchmark - Time and peak memory of the stock report PDF by catalog size
+
+Compares the streamed export the Reports screen uses (cursor chunks into
+report_export.PDFReportWriter, which writes each page to the file as it
+fills) with PDFGenerator.generate_stock_report_pdf, which lays out every
+row in one platypus Table.
+
+Run from the project root:
+    python -m benchmarks.bench_stock_report [--rows 1000,10000,100000] [--baseline-max 20000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from database.db_manager import DatabaseManager
+from utils.pdf_generator import PDFGenerator
+from utils.report_export import ReportExporter
+
+
+def populate(db: DatabaseManager, rows: int):
+    """Insert synthetic products in one transaction"""
+    rng = random.Random(1)
+    db.cursor.executemany(
+        """INSERT INTO products (product_code, product_name, unit, purchase_price, selling_price,
+                                 current_stock, min_stock_level)
+           VALUES (?, ?, 'PCS', ?, ?, ?, ?)""",
+        ((f"SKU{idx:07d}", f"Modular Switch {idx % 97} Way Grey", 10.0, 12.5,
+          rng.randint(0, 500), rng.randint(5, 50)) for idx in range(rows))
+    )
+    db.conn.commit()
+
+
+def single_table_report(db: DatabaseManager, output_path: str):
+    """Baseline: every row in one Table, laid out by SimpleDocTemplate"""
+    if not PDFGenerator({}).generate_stock_report_pdf(db.get_all_products(), output_path):
+        raise RuntimeError("Stock report generation failed")
+
+
+def streaming_report(db: DatabaseManager, output_path: str):
+    """Reports screen export: database chunks straight into the PDF writer"""
+    ReportExporter(db).export('stock', output_path, 'pdf')
+
+
+def measure(label: str, report, db: DatabaseManager, rows: int, output_path: str):
+    """Time one run, then trace peak memory on a second run"""
+    start = time.perf_counter()
+    report(db, output_path)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        report(db, output_path)
+        peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+    size_mb = os.path.getsize(output_path) / (1024 * 1024)
+    print(f"{label:<10} {rows:>9,} rows  {elapsed:>8.2f}s  {rows / elapsed:>9,.0f} rows/sec  "
+          f"peak {peak_mb:>7.1f} MB  output {size_mb:>6.1f} MB", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', default='1000,10000,100000', help="Comma-separated catalog sizes")
+    parser.add_argument('--baseline-max', type=int, default=20000,
+                        help="Skip the single-table baseline above this many rows")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in (int(r) for r in args.rows.split(',')):
+            db = DatabaseManager(os.path.join(tmp, f"stock_{rows}.db"))
+            try:
+                populate(db, rows)
+                output_path = os.path.join(tmp, f"stock_{rows}.pdf")
+                if rows <= args.baseline_max:
+                    measure('single', single_table_report, db, rows, output_path)
+                measure('streaming', streaming_report, db, rows, output_path)
+            finally:
+                db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Synthetic Corpus - Generate supplier price-list PDFs with ground truth
+
+Each layout writes <name>.pdf next to a <name>.truth.json sidecar holding the
+products that were drawn on the page, so extraction runs can be scored.
+
+Run from the project root:
+    python -m benchmarks.synthetic_corpus --out bench_corpus [--large-pages 2000]
+"""
+import argparse
+import json
+import os
+import random
+from typing import List, Dict
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+
+
+PAGE_WIDTH, PAGE_HEIGHT = A4
+MARGIN = 0.6 * inch
+LINE_HEIGHT = 14
+
+NAME_WORDS = {
+    'general': ['Copper', 'Wire', 'Switch', 'Socket', 'Modular', 'LED', 'Bulb', 'Tube',
+                'Cable', 'Conduit', 'Junction', 'Box', 'MCB', 'Holder', 'Panel', 'Board'],
+    'solar': ['Mono', 'PERC', 'Bifacial', 'Polycrystalline', 'Half-Cut', 'Solar', 'Panel',
+              'Module', 'Inverter', 'Hybrid', 'Charge', 'Controller', 'Battery', 'Lithium'],
+}
+
+
+def make_products(count: int, seed: int, family: str = 'general') -> List[Dict]:
+    """Build deterministic products with unique codes"""
+    rng = random.Random(seed)
+    words = NAME_WORDS[family]
+    products = []
+
+    for idx in range(count):
+        name = ' '.join(rng.sample(words, 3))
+        if family == 'solar':
+            watts = rng.choice([330, 400, 445, 540, 550, 575])
+            name = f"{watts}W {name}"
+            code = f"SOL-{watts}-{idx:05d}"
+        else:
+            name = f"{name} {rng.randint(1, 99)}mm"
+            code = f"GEN{idx:05d}"
+        products.append({
+            'product_code': code,
+            'product_name': name,
+            'price': round(rng.uniform(50, 45000), 2),
+        })
+
+    return products
+
+
+def format_price(price: float) -> str:
+    """Format a price the way supplier lists usually print it"""
+    return f"Rs. {price:,.2f}"
+
+
+def write_truth(pdf_path: str, layout: str, products: List[Dict], pages: int):
+    """Write the ground-truth sidecar for a generated PDF"""
+    truth_path = os.path.splitext(pdf_path)[0] + '.truth.json'
+    with open(truth_path, 'w', encoding='utf-8') as f:
+        json.dump({'layout': layout, 'pages': pages, 'products': products}, f, indent=1)
+
+
+def build_table_pdf(path: str, products: List[Dict]) -> int:
+    """Ruled table with a Code | Product Name | Price header"""
+    rows = [['Code', 'Product Name', 'Price']]
+    rows += [[p['product_code'], p['product_name'], format_price(p['price'])] for p in products]
+
+    doc = SimpleDocTemplate(path, pagesize=A4, leftMargin=MARGIN, rightMargin=MARGIN,
+                            topMargin=MARGIN, bottomMargin=MARGIN)
+    table = Table(rows, colWidths=[1.3 * inch, 4 * inch, 1.4 * inch], repeatRows=1)
+    table.setStyle(TableStyle([
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ]))
+
+    page_count = []
+    doc.build([table], onFirstPage=lambda c, d: page_count.append(1),
+              onLaterPages=lambda c, d: page_count.append(1))
+    return len(page_count)
+
+
+def _draw_lines(path: str, lines: List[str], columns: int = 1) -> int:
+    """Draw text lines top-to-bottom, column by column, page by page"""
+    pdf = canvas.Canvas(path, pagesize=A4)
+    column_width = (PAGE_WIDTH - 2 * MARGIN) / columns
+    rows_per_column = int((PAGE_HEIGHT - 2 * MARGIN) // LINE_HEIGHT)
+    per_page = rows_per_column * columns
+    pages = 0
+
+    for start in range(0, len(lines), per_page):
+        pdf.setFont('Helvetica', 8 if columns > 1 else 9)
+        for offset, line in enumerate(lines[start:start + per_page]):
+            column, row = divmod(offset, rows_per_column)
+            pdf.drawString(MARGIN + column * column_width,
+                           PAGE_HEIGHT - MARGIN - row * LINE_HEIGHT, line)
+        pdf.showPage()
+        pages += 1
+
+    pdf.save()
+    return pages
+
+
+def build_text_pdf(path: str, products: List[Dict]) -> int:
+    """Plain space-separated lines: CODE Name Rs. price"""
+    lines = [f"{p['product_code']} {p['product_name']} {format_price(p['price'])}" for p in products]
+    return _draw_lines(path, lines)
+
+
+def build_solar_pdf(path: str, products: List[Dict]) -> int:
+    """Solar dealer list mixing wattage-led and Model:-led lines"""
+    lines = []
+    for idx, p in enumerate(products):
+        if idx % 2:
+            lines.append(f"Model: {p['product_code']} {p['product_name']} {format_price(p['price'])}")
+        else:
+            # Solar product names already start with the wattage, e.g. "540W Mono PERC Panel"
+            lines.append(f"{p['product_name']} {format_price(p['price'])}")
+    return _draw_lines(path, lines)
+
+
+def build_multi_column_pdf(path: str, products: List[Dict]) -> int:
+    """Two price-list columns side by side"""
+    lines = [f"{p['product_code']} {p['product_name']} {p['price']:.2f}" for p in products]
+    return _draw_lines(path, lines, columns=2)
+
+
+LAYOUTS = {
+    'table': (build_table_pdf, 'general'),
+    'plain_text': (build_text_pdf, 'general'),
+    'solar': (build_solar_pdf, 'solar'),
+    'multi_column': (build_multi_column_pdf, 'general'),
+}
+
+
+def generate_corpus(out_dir: str, products_per_layout: int = 500, large_pages: int = 2000,
+                    seed: int = 7) -> List[str]:
+    """Generate every layout plus a large plain-text catalog; returns the PDF paths"""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+
+    for idx, (layout, (builder, family)) in enumerate(LAYOUTS.items()):
+        products = make_products(products_per_layout, seed + idx, family)
+        path = os.path.join(out_dir, f"{layout}.pdf")
+        pages = builder(path, products)
+        write_truth(path, layout, products, pages)
+        paths.append(path)
+        print(f"{layout:<14} {pages:>6} pages  {len(products):>8} products  -> {path}")
+
+    if large_pages:
+        rows_per_page = int((PAGE_HEIGHT - 2 * MARGIN) // LINE_HEIGHT)
+        products = make_products(large_pages * rows_per_page, seed + 100)
+        path = os.path.join(out_dir, f"large_{large_pages}p.pdf")
+        pages = build_text_pdf(path, products)
+        write_truth(path, 'large', products, pages)
+        paths.append(path)
+        print(f"{'large':<14} {pages:>6} pages  {len(products):>8} products  -> {path}")
+
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--out', default='bench_corpus', help="Output directory")
+    parser.add_argument('--products', type=int, default=500, help="Products per small layout")
+    parser.add_argument('--large-pages', type=int, default=2000,
+                        help="Pages in the large catalog (0 to skip)")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    generate_corpus(args.out, args.products, args.large_pages, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,46 @@
 Database Manager - Handles all database operations
 """
 import sqlite3
+import calendar
 import os
 import hashlib
-from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timedelta
+from typing import Callable, List, Dict, Optional, Tuple, Iterator
+
+
+# Receivables aging buckets: (column, lowest age in days, highest age or None)
+AGING_BUCKETS = (
+    ('days_0_30', 0, 30),
+    ('days_31_60', 31, 60),
+    ('days_61_90', 61, 90),
+    ('days_90_plus', 91, None),
+)
+
+# Stock transaction types that take stock out; every other type adds its quantity
+STOCK_OUT_TYPES = ('sale', 'damage', 'return_to_supplier')
+
+# Pages copied per step of an online backup (4 MB at the default page size)
+BACKUP_STEP_PAGES = 1024
+
+# A file without these tables is not a backup of this application
+BACKUP_REQUIRED_TABLES = ('products', 'customers', 'invoices', 'invoice_items')
+
+# Financial years run from April to March
+FINANCIAL_YEAR_START_MONTH = 4
+
+# Tables whose closed-year rows move to yearly archive databases
+ARCHIVED_TABLES = ('invoices', 'invoice_items', 'payments', 'stock_transactions')
+
+# Invoices still owed money stay in the live database whatever their date
+OPEN_INVOICE_CONDITION = "payment_status IN ('unpaid', 'partially_paid') AND balance_amount > 0"
+
+# Date filter on each archived table, for reading a date range from main or one archive ({schema})
+ARCHIVE_DATE_FILTERS = {
+    'invoices': "invoice_date BETWEEN ? AND ?",
+    'invoice_items': "invoice_id IN (SELECT id FROM {schema}.invoices WHERE invoice_date BETWEEN ? AND ?)",
+    'payments': "payment_date BETWEEN ? AND ?",
+    'stock_transactions': "transaction_date BETWEEN ? AND ?",
+}
 
 
 class DatabaseManager:
@@ -18,11 +54,16 @@ class DatabaseManager:
     
     def initialize_database(self):
         """Create database and tables if they don't exist"""
+        # Archive databases attached to this connection, financial_year -> schema name
+        self._attached_archives = {}
         try:
             self.conn = sqlite3.connect(self.db_path)
             self.conn.row_factory = sqlite3.Row
             self.cursor = self.conn.cursor()
             
+            # WAL lets readers (backups, report workers) run alongside billing writes
+            self.cursor.execute("PRAGMA journal_mode=WAL").fetchone()
+            
             # Read and execute schema
             schema_path = os.path.join(os.path.dirname(__file__), 'schema.sql')
             if os.path.exists(schema_path):
@@ -30,12 +71,54 @@ class DatabaseManager:
                     schema = f.read()
                     self.cursor.executescript(schema)
                     self.conn.commit()
+                    self._migrate_schema(schema)
+            
+            self._backfill_rollups()
             
             print("Database initialized successfully")
         except Exception as e:
             print(f"Error initializing database: {e}")
             raise
     
+    def _migrate_schema(self, schema: str):
+        """Bring a database created before a schema change up to date; schema is schema.sql's text"""
+        columns = {row[1] for row in self.cursor.execute("PRAGMA main.table_info(company_settings)").fetchall()}
+        if 'invoice_renderer' not in columns:
+            self.cursor.execute("ALTER TABLE company_settings ADD COLUMN invoice_renderer TEXT DEFAULT 'canvas'")
+            self.conn.commit()
+        
+        columns = {row[1] for row in self.cursor.execute("PRAGMA main.table_info(invoice_items)").fetchall()}
+        if 'unit_cost' in columns:
+            return
+        
+        # The earlier sales triggers costed lines at the product's current price; schema.sql recreates them
+        for trigger in ('trg_invoice_items_insert_sales', 'trg_invoice_items_delete_sales',
+                        'trg_invoice_items_update_sales'):
+            self.cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        self.cursor.execute("ALTER TABLE invoice_items ADD COLUMN unit_cost REAL")
+        # Existing lines get the purchase price from before the first logged price change after them,
+        # or today's price if it hasn't changed since
+        self.cursor.execute(
+            """UPDATE invoice_items SET unit_cost = COALESCE(
+                   (SELECT h.old_purchase_price FROM price_update_history h
+                    WHERE h.product_id = invoice_items.product_id AND h.created_at > invoice_items.created_at
+                    ORDER BY h.created_at, h.id LIMIT 1),
+                   (SELECT purchase_price FROM products WHERE id = invoice_items.product_id), 0)
+               WHERE product_id IS NOT NULL"""
+        )
+        self.conn.commit()
+        self.cursor.executescript(schema)
+        self.rebuild_product_daily_sales()
+    
+    def _backfill_rollups(self):
+        """Build rollup tables once for databases that predate them; triggers keep them current after that"""
+        if (not self.execute_query("SELECT 1 FROM product_daily_sales LIMIT 1")
+                and self.execute_query("SELECT 1 FROM invoice_items WHERE product_id IS NOT NULL LIMIT 1")):
+            self.rebuild_product_daily_sales()
+        if (not self.execute_query("SELECT 1 FROM gst_monthly_summary LIMIT 1")
+                and self.execute_query("SELECT 1 FROM invoice_items LIMIT 1")):
+            self.rebuild_gst_monthly_summary()
+    
     def execute_query(self, query: str, params: tuple = ()) -> List[Dict]:
         """Execute SELECT query and return results"""
         try:
@@ -186,36 +269,330 @@ class DatabaseManager:
         )
         return self.execute_update(query, params) != -1
     
+    def bulk_update_prices(self, changes: List[Dict], update_source: str = 'pdf_import',
+                           notes: str = "", updated_by: int = None) -> Dict:
+        """
+        Apply many price changes and their price_update_history rows in one transaction
+        
+        Each change is a dict with 'product_id' and 'selling_price' and/or
+        'purchase_price'; a missing price keeps the product's current value.
+        Returns a diff summary, or an empty dict if the transaction failed.
+        """
+        rows = {}
+        for change in changes:
+            rows[change['product_id']] = (
+                change['product_id'],
+                change.get('selling_price'),
+                change.get('purchase_price')
+            )
+        
+        changed_filter = """(t.new_selling_price IS NOT NULL AND t.new_selling_price IS NOT p.selling_price)
+                            OR (t.new_purchase_price IS NOT NULL AND t.new_purchase_price IS NOT p.purchase_price)"""
+        
+        try:
+            self.cursor.execute("""CREATE TEMP TABLE IF NOT EXISTS temp_price_updates (
+                                       product_id INTEGER PRIMARY KEY,
+                                       new_selling_price REAL,
+                                       new_purchase_price REAL)""")
+            self.cursor.execute("DELETE FROM temp_price_updates")
+            self.cursor.executemany("INSERT INTO temp_price_updates VALUES (?, ?, ?)", rows.values())
+            
+            # Capture the diff before products are overwritten
+            self.cursor.execute(f"""SELECT p.id AS product_id, p.product_code, p.product_name,
+                                           p.selling_price AS old_selling_price,
+                                           COALESCE(t.new_selling_price, p.selling_price) AS new_selling_price,
+                                           p.purchase_price AS old_purchase_price,
+                                           COALESCE(t.new_purchase_price, p.purchase_price) AS new_purchase_price
+                                    FROM temp_price_updates t
+                                    JOIN products p ON p.id = t.product_id
+                                    WHERE {changed_filter}
+                                    ORDER BY p.product_name""")
+            diff = [dict(row) for row in self.cursor.fetchall()]
+            
+            self.cursor.execute("SELECT COUNT(*) FROM temp_price_updates t JOIN products p ON p.id = t.product_id")
+            found = self.cursor.fetchone()[0]
+            
+            self.cursor.execute(f"""INSERT INTO price_update_history
+                                    (product_id, old_purchase_price, new_purchase_price,
+                                     old_selling_price, new_selling_price, update_source, notes, updated_by)
+                                    SELECT p.id, p.purchase_price, COALESCE(t.new_purchase_price, p.purchase_price),
+                                           p.selling_price, COALESCE(t.new_selling_price, p.selling_price),
+                                           ?, ?, ?
+                                    FROM temp_price_updates t
+                                    JOIN products p ON p.id = t.product_id
+                                    WHERE {changed_filter}""",
+                                (update_source, notes, updated_by))
+            
+            if sqlite3.sqlite_version_info >= (3, 33, 0):
+                self.cursor.execute(f"""UPDATE products AS p SET
+                                        selling_price = COALESCE(t.new_selling_price, p.selling_price),
+                                        purchase_price = COALESCE(t.new_purchase_price, p.purchase_price),
+                                        updated_at = CURRENT_TIMESTAMP
+                                        FROM temp_price_updates AS t
+                                        WHERE p.id = t.product_id AND ({changed_filter})""")
+            else:
+                # UPDATE ... FROM needs SQLite 3.33+; correlated subqueries do the same job
+                self.cursor.execute(f"""UPDATE products SET
+                                       selling_price = COALESCE((SELECT new_selling_price FROM temp_price_updates
+                                                                 WHERE product_id = products.id), selling_price),
+                                       purchase_price = COALESCE((SELECT new_purchase_price FROM temp_price_updates
+                                                                  WHERE product_id = products.id), purchase_price),
+                                       updated_at = CURRENT_TIMESTAMP
+                                       WHERE id IN (SELECT t.product_id FROM temp_price_updates t
+                                                    JOIN products p ON p.id = t.product_id
+                                                    WHERE {changed_filter})""")
+            
+            self.cursor.execute("DELETE FROM temp_price_updates")
+            self.conn.commit()
+            
+            return {
+                'requested': len(rows),
+                'updated': len(diff),
+                'unchanged': found - len(diff),
+                'missing': len(rows) - found,
+                'changes': diff
+            }
+        except Exception as e:
+            print(f"Error applying bulk price update: {e}")
+            self.conn.rollback()
+            return {}
+    
     def update_product_stock(self, product_id: int, quantity: float, transaction_type: str, 
                             reference_type: str = None, reference_id: int = None, notes: str = "") -> bool:
         """Update product stock and record transaction"""
         try:
-            # Get current stock
-            product = self.get_product_by_id(product_id)
-            if not product:
+            # Apply the change in SQL and record it in the same transaction, so
+            # concurrent writers can't lose updates or leave the two out of step
+            delta = -quantity if transaction_type in STOCK_OUT_TYPES else quantity
+            self.cursor.execute(
+                "UPDATE products SET current_stock = current_stock + ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (delta, product_id)
+            )
+            if self.cursor.rowcount == 0:
+                self.conn.rollback()
                 return False
             
-            # Calculate new stock
-            if transaction_type in ['sale', 'damage', 'return_to_supplier']:
-                new_stock = product['current_stock'] - quantity
-            else:  # purchase, return_from_customer, adjustment
-                new_stock = product['current_stock'] + quantity
-            
-            # Update product stock
-            query = "UPDATE products SET current_stock = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?"
-            self.execute_update(query, (new_stock, product_id))
-            
             # Record transaction
             query = """INSERT INTO stock_transactions 
                        (product_id, transaction_type, quantity, reference_type, reference_id, notes, transaction_date)
                        VALUES (?, ?, ?, ?, ?, ?, DATE('now'))"""
-            self.execute_update(query, (product_id, transaction_type, quantity, reference_type, reference_id, notes))
+            self.cursor.execute(query, (product_id, transaction_type, quantity, reference_type, reference_id, notes))
+            self.conn.commit()
             
             return True
         except Exception as e:
             print(f"Error updating stock: {e}")
+            self.conn.rollback()
             return False
     
+    @staticmethod
+    def _stock_delta(alias: str = "t") -> str:
+        """SQL for a stock transaction's signed quantity"""
+        out_types = ", ".join(f"'{t}'" for t in STOCK_OUT_TYPES)
+        return (f"CASE WHEN {alias}.transaction_type IN ({out_types}) "
+                f"THEN -{alias}.quantity ELSE {alias}.quantity END")
+    
+    @staticmethod
+    def _unindexed(source: str) -> str:
+        """FROM clause reading a table with a full scan; views can't take NOT INDEXED"""
+        return f"{source} t" if source.endswith("_all") else f"{source} t NOT INDEXED"
+    
+    def write_stock_snapshot(self, snapshot_date: str) -> int:
+        """
+        Record every product's stock at the end of snapshot_date
+        
+        Starts from the nearest earlier snapshot and adds the transactions
+        after it, so the date should be a completed day. Returns the number
+        of products written, or -1 on error.
+        """
+        try:
+            count = self._insert_stock_snapshot(snapshot_date)
+            self.conn.commit()
+            return count
+        except Exception as e:
+            print(f"Error writing stock snapshot: {e}")
+            self.conn.rollback()
+            return -1
+    
+    def _insert_stock_snapshot(self, snapshot_date: str, transactions: str = None) -> int:
+        """write_stock_snapshot without the commit; transactions overrides the table read"""
+        params = []
+        if transactions is None:
+            transactions, params = self._stock_history("<", snapshot_date, snapshot_date)
+        self.cursor.execute(
+            f"""INSERT OR REPLACE INTO stock_snapshots (snapshot_date, product_id, quantity)
+                SELECT ?, p.id,
+                       COALESCE(s.quantity, p.opening_stock) + COALESCE(SUM({self._stock_delta()}), 0)
+                FROM products p
+                LEFT JOIN stock_snapshots s
+                       ON s.product_id = p.id
+                      AND s.snapshot_date = (SELECT MAX(snapshot_date) FROM stock_snapshots
+                                             WHERE snapshot_date < ?)
+                LEFT JOIN {transactions} t
+                       ON t.product_id = p.id
+                      AND t.transaction_date > COALESCE(s.snapshot_date, '')
+                      AND t.transaction_date <= ?
+                GROUP BY p.id""",
+            (snapshot_date, snapshot_date, *params, snapshot_date)
+        )
+        return self.cursor.rowcount
+    
+    def rebuild_stock_snapshots(self) -> int:
+        """Rewrite every existing snapshot from the stock ledger, oldest first; returns dates rewritten or -1"""
+        try:
+            transactions = self._history('stock_transactions')
+            self.cursor.execute("SELECT DISTINCT snapshot_date FROM stock_snapshots ORDER BY snapshot_date")
+            dates = [row[0] for row in self.cursor.fetchall()]
+            
+            self.cursor.execute("DELETE FROM stock_snapshots")
+            for snapshot_date in dates:
+                self._insert_stock_snapshot(snapshot_date, transactions)
+            self.conn.commit()
+            return len(dates)
+        except Exception as e:
+            print(f"Error rebuilding stock snapshots: {e}")
+            self.conn.rollback()
+            return -1
+    
+    def _stock_ledger_query(self) -> str:
+        """
+        SQL for products whose current_stock differs from opening_stock plus all their transactions
+        
+        The ledger is summed in one pass over the table; walking it through
+        idx_stock_product_date product by product is over twice as slow.
+        Archived years are included.
+        """
+        transactions = self._unindexed(self._history('stock_transactions'))
+        return f"""SELECT p.id AS product_id, p.product_code, p.product_name, p.current_stock,
+                          p.opening_stock + COALESCE(l.delta, 0) AS ledger_stock,
+                          p.current_stock - (p.opening_stock + COALESCE(l.delta, 0)) AS difference,
+                          COALESCE(l.transaction_count, 0) AS transaction_count
+                   FROM products p
+                   LEFT JOIN (SELECT product_id, SUM({self._stock_delta()}) AS delta,
+                                     COUNT(*) AS transaction_count
+                              FROM {transactions}
+                              GROUP BY product_id) l ON l.product_id = p.id
+                   WHERE ABS(p.current_stock - (p.opening_stock + COALESCE(l.delta, 0))) > 1e-6
+                   ORDER BY p.product_name"""
+    
+    def check_stock_ledger(self) -> List[Dict]:
+        """Products whose current_stock has drifted from the full stock ledger"""
+        return self.execute_query(self._stock_ledger_query())
+    
+    def check_stock_snapshots(self) -> int:
+        """Number of products whose latest snapshot differs from the ledger up to its date, or -1"""
+        transactions = self._unindexed(self._history('stock_transactions'))
+        query = f"""SELECT COUNT(*) AS stale
+                    FROM stock_snapshots s
+                    JOIN products p ON p.id = s.product_id
+                    LEFT JOIN (SELECT product_id, SUM({self._stock_delta()}) AS delta
+                               FROM {transactions}
+                               WHERE transaction_date <= (SELECT MAX(snapshot_date) FROM stock_snapshots)
+                               GROUP BY product_id) l ON l.product_id = s.product_id
+                    WHERE s.snapshot_date = (SELECT MAX(snapshot_date) FROM stock_snapshots)
+                      AND ABS(s.quantity - (p.opening_stock + COALESCE(l.delta, 0))) > 1e-6"""
+        result = self.execute_query(query)
+        return result[0]['stale'] if result else -1
+    
+    def repair_stock_ledger(self) -> Optional[List[Dict]]:
+        """
+        Set current_stock to the ledger value for every drifted product, in one transaction
+        
+        Writers are locked out between the check and the update, so nothing
+        recorded in the meantime is overwritten. Returns the repaired
+        products, or None if the transaction failed.
+        """
+        try:
+            query = self._stock_ledger_query()
+            if self.conn.in_transaction:
+                self.conn.commit()
+            self.cursor.execute("BEGIN IMMEDIATE")
+            self.cursor.execute(query)
+            mismatches = [dict(row) for row in self.cursor.fetchall()]
+            self.cursor.executemany(
+                "UPDATE products SET current_stock = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                ((row['ledger_stock'], row['product_id']) for row in mismatches)
+            )
+            self.conn.commit()
+            return mismatches
+        except Exception as e:
+            print(f"Error repairing stock ledger: {e}")
+            self.conn.rollback()
+            return None
+    
+    def get_stock_as_of(self, as_of: str = None, product_id: int = None) -> List[Dict]:
+        """
+        Each product's stock at the end of a day (today's stock if as_of is None)
+        
+        Starts from the latest snapshot on or before the date and applies
+        only the transactions after it.
+        """
+        as_of = as_of or "9999-12-31"
+        transactions, range_params = self._stock_history("<=", as_of, as_of)
+        query = f"""SELECT p.id AS product_id, p.product_code, p.product_name, p.unit,
+                           COALESCE(s.quantity, p.opening_stock) + COALESCE(SUM({self._stock_delta()}), 0)
+                               AS quantity
+                    FROM products p
+                    LEFT JOIN stock_snapshots s
+                           ON s.product_id = p.id
+                          AND s.snapshot_date = (SELECT MAX(snapshot_date) FROM stock_snapshots
+                                                 WHERE snapshot_date <= ?)
+                    LEFT JOIN {transactions} t
+                           ON t.product_id = p.id
+                          AND t.transaction_date > COALESCE(s.snapshot_date, '')
+                          AND t.transaction_date <= ?"""
+        params = [as_of, *range_params, as_of]
+        if product_id is not None:
+            query += " WHERE p.id = ?"
+            params.append(product_id)
+        query += " GROUP BY p.id ORDER BY p.product_name"
+        return self.execute_query(query, tuple(params))
+    
+    def get_latest_stock_snapshot_date(self) -> Optional[str]:
+        """Date of the most recent stock snapshot, or None"""
+        result = self.execute_query("SELECT MAX(snapshot_date) AS snapshot_date FROM stock_snapshots")
+        return result[0]['snapshot_date'] if result else None
+    
+    def prune_stock_snapshots(self, before: str) -> int:
+        """Delete snapshots older than a date except month-ends; returns rows deleted or -1"""
+        try:
+            self.cursor.execute(
+                """DELETE FROM stock_snapshots
+                   WHERE snapshot_date < ? AND strftime('%d', snapshot_date, '+1 day') != '01'""",
+                (before,)
+            )
+            count = self.cursor.rowcount
+            self.conn.commit()
+            return count
+        except Exception as e:
+            print(f"Error pruning stock snapshots: {e}")
+            self.conn.rollback()
+            return -1
+    
+    def verify_stock_snapshots(self) -> List[Dict]:
+        """Products whose current_stock differs from the latest snapshot plus later transactions"""
+        query = f"""SELECT product_id, product_code, product_name, current_stock, ledger_stock,
+                           current_stock - ledger_stock AS difference
+                    FROM (SELECT p.id AS product_id, p.product_code, p.product_name, p.current_stock,
+                                 COALESCE(s.quantity, p.opening_stock)
+                                     + COALESCE(SUM({self._stock_delta()}), 0) AS ledger_stock
+                          FROM products p
+                          LEFT JOIN stock_snapshots s
+                                 ON s.product_id = p.id
+                                AND s.snapshot_date = (SELECT MAX(snapshot_date) FROM stock_snapshots)
+                          LEFT JOIN stock_transactions t
+                                 ON t.product_id = p.id
+                                AND t.transaction_date > COALESCE(s.snapshot_date, '')
+                          GROUP BY p.id)
+                    WHERE ABS(current_stock - ledger_stock) > 1e-6
+                    ORDER BY product_name"""
+        return self.execute_query(query)
+    
+    def get_stock_movement(self, start_date: str, end_date: str) -> List[Dict]:
+        """Opening, inward, outward and closing stock per active product over a date range"""
+        query, params = self._report_query("stock_movement", start_date, end_date)
+        return self.execute_query(query, tuple(params))
+    
     def get_low_stock_products(self) -> List[Dict]:
         """Get products with stock below minimum level"""
         query = """SELECT p.*, c.name as category_name 
@@ -331,9 +708,10 @@ class DatabaseManager:
             # Insert invoice items and update stock
             item_query = """INSERT INTO invoice_items 
                            (invoice_id, product_id, product_code, product_name, quantity, unit,
-                            unit_price, discount_percent, discount_amount, taxable_amount,
+                            unit_price, unit_cost, discount_percent, discount_amount, taxable_amount,
                             gst_rate, gst_amount, total_amount)
-                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+                           VALUES (?, ?, ?, ?, ?, ?, ?, (SELECT purchase_price FROM products WHERE id = ?),
+                                   ?, ?, ?, ?, ?, ?)"""
             
             for item in items:
                 item_params = (
@@ -344,6 +722,7 @@ class DatabaseManager:
                     item['quantity'],
                     item.get('unit', 'PCS'),
                     item['unit_price'],
+                    item.get('product_id'),
                     item.get('discount_percent', 0),
                     item.get('discount_amount', 0),
                     item['taxable_amount'],
@@ -371,31 +750,37 @@ class DatabaseManager:
             return -1, ""
     
     def get_invoice_by_id(self, invoice_id: int) -> Optional[Dict]:
-        """Get invoice by ID"""
-        query = "SELECT * FROM invoices WHERE id = ?"
-        results = self.execute_query(query, (invoice_id,))
+        """Get invoice by ID, from the archives if it has been archived"""
+        query = "SELECT * FROM {source} WHERE id = ?"
+        results = self._query_with_archives('invoices', query, (invoice_id,))
         return results[0] if results else None
     
     def get_invoice_by_number(self, invoice_number: str) -> Optional[Dict]:
-        """Get invoice by number"""
-        query = "SELECT * FROM invoices WHERE invoice_number = ?"
-        results = self.execute_query(query, (invoice_number,))
+        """Get invoice by number, from the archives if it has been archived"""
+        query = "SELECT * FROM {source} WHERE invoice_number = ?"
+        results = self._query_with_archives('invoices', query, (invoice_number,))
         return results[0] if results else None
     
     def get_invoice_items(self, invoice_id: int) -> List[Dict]:
         """Get all items for an invoice"""
-        query = "SELECT * FROM invoice_items WHERE invoice_id = ? ORDER BY id"
-        return self.execute_query(query, (invoice_id,))
+        query = "SELECT * FROM {source} WHERE invoice_id = ? ORDER BY id"
+        return self._query_with_archives('invoice_items', query, (invoice_id,))
     
     def get_all_invoices(self, limit: int = 100) -> List[Dict]:
         """Get recent invoices"""
         query = "SELECT * FROM invoices ORDER BY invoice_date DESC, invoice_time DESC LIMIT ?"
         return self.execute_query(query, (limit,))
     
-    def search_invoices(self, search_term: str = "", start_date: str = "", end_date: str = "", 
-                       payment_status: str = "") -> List[Dict]:
-        """Search invoices with filters"""
-        query = "SELECT * FROM invoices WHERE 1=1"
+    def _invoice_source(self, start_date: str = "", payment_status: str = "") -> str:
+        """Table or archive view for an invoice search; invoices still owed money are never archived"""
+        if payment_status in ('unpaid', 'partially_paid'):
+            return "invoices"
+        return self._history('invoices', start_date)
+    
+    def _invoice_filters(self, search_term: str = "", start_date: str = "", end_date: str = "",
+                         payment_status: str = "") -> Tuple[str, List]:
+        """Build the WHERE clause shared by invoice searches"""
+        query = "WHERE 1=1"
         params = []
         
         if search_term:
@@ -415,10 +800,37 @@ class DatabaseManager:
             query += " AND payment_status = ?"
             params.append(payment_status)
         
-        query += " ORDER BY invoice_date DESC, invoice_time DESC"
+        return query, params
+    
+    def search_invoices(self, search_term: str = "", start_date: str = "", end_date: str = "", 
+                       payment_status: str = "") -> List[Dict]:
+        """Search invoices with filters"""
+        where, params = self._invoice_filters(search_term, start_date, end_date, payment_status)
+        source = self._invoice_source(start_date, payment_status)
+        query = f"SELECT * FROM {source} {where} ORDER BY invoice_date DESC, invoice_time DESC"
         return self.execute_query(query, tuple(params))
     
-    # ==================== PAYMENT OPERATIONS ====================
+    def get_invoices_with_items(self, search_term: str = "", start_date: str = "", end_date: str = "",
+                                payment_status: str = "") -> List[Tuple[Dict, List[Dict]]]:
+        """Invoices matching the search filters with their items, in two queries, oldest first"""
+        where, params = self._invoice_filters(search_term, start_date, end_date, payment_status)
+        source = self._invoice_source(start_date, payment_status)
+        items_source = "invoice_items" if source == "invoices" else self._history('invoice_items', start_date)
+        
+        invoices = self.execute_query(
+            f"SELECT * FROM {source} {where} ORDER BY invoice_date, invoice_time, id", tuple(params)
+        )
+        items = self.execute_query(
+            f"""SELECT * FROM {items_source}
+                WHERE invoice_id IN (SELECT id FROM {source} {where})
+                ORDER BY invoice_id, id""", tuple(params)
+        )
+        
+        items_by_invoice = {}
+        for item in items:
+            items_by_invoice.setdefault(item['invoice_id'], []).append(item)
+        
+        return [(invoice, items_by_invoice.get(invoice['id'], [])) for invoice in invoices]
     
     def add_payment(self, payment_data: Dict) -> int:
         """Add payment for an invoice"""
@@ -464,8 +876,62 @@ class DatabaseManager:
     
     def get_invoice_payments(self, invoice_id: int) -> List[Dict]:
         """Get all payments for an invoice"""
-        query = "SELECT * FROM payments WHERE invoice_id = ? ORDER BY payment_date DESC, payment_time DESC"
-        return self.execute_query(query, (invoice_id,))
+        query = "SELECT * FROM {source} WHERE invoice_id = ? ORDER BY payment_date DESC, payment_time DESC"
+        return self._query_with_archives('payments', query, (invoice_id,))
+    
+    # ==================== PRINT JOBS ====================
+    
+    def add_print_job(self, invoice_id: int) -> int:
+        """Queue an invoice for background PDF rendering"""
+        query = "INSERT INTO print_jobs (invoice_id, status) VALUES (?, 'queued')"
+        return self.execute_update(query, (invoice_id,))
+    
+    def get_print_job(self, job_id: int) -> Optional[Dict]:
+        """Get print job by ID, with its invoice number"""
+        query = """SELECT j.*, i.invoice_number FROM print_jobs j
+                   LEFT JOIN invoices i ON i.id = j.invoice_id
+                   WHERE j.id = ?"""
+        results = self.execute_query(query, (job_id,))
+        return results[0] if results else None
+    
+    def get_next_print_job(self) -> Optional[Dict]:
+        """Get the oldest queued print job"""
+        query = "SELECT * FROM print_jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+        results = self.execute_query(query)
+        return results[0] if results else None
+    
+    def get_print_jobs(self, status: str = "", limit: int = 100) -> List[Dict]:
+        """Get recent print jobs, optionally filtered by status"""
+        query = """SELECT j.*, i.invoice_number FROM print_jobs j
+                   LEFT JOIN invoices i ON i.id = j.invoice_id"""
+        params = []
+        if status:
+            query += " WHERE j.status = ?"
+            params.append(status)
+        query += " ORDER BY j.id DESC LIMIT ?"
+        params.append(limit)
+        return self.execute_query(query, tuple(params))
+    
+    def update_print_job(self, job_id: int, status: str, output_path: str = None,
+                         error: str = None, count_attempt: bool = False, reset_attempts: bool = False) -> bool:
+        """Update print job status; reset_attempts gives a manually requeued job its full set of retries"""
+        query = """UPDATE print_jobs SET 
+                   status = ?, output_path = COALESCE(?, output_path), error = ?,
+                   attempts = CASE WHEN ? THEN 0 ELSE attempts END + ?, updated_at = CURRENT_TIMESTAMP
+                   WHERE id = ?"""
+        params = (status, output_path, error, 1 if reset_attempts else 0, 1 if count_attempt else 0, job_id)
+        return self.execute_update(query, params) != -1
+    
+    def requeue_print_jobs(self, statuses: Tuple[str, ...] = ('rendering',)) -> int:
+        """Put interrupted (or failed) print jobs back in the queue; failed jobs start their attempts again"""
+        placeholders = ', '.join('?' for _ in statuses)
+        query = f"""UPDATE print_jobs SET status = 'queued',
+                           attempts = CASE WHEN status = 'failed' THEN 0 ELSE attempts END,
+                           updated_at = CURRENT_TIMESTAMP
+                    WHERE status IN ({placeholders})"""
+        if self.execute_update(query, tuple(statuses)) == -1:
+            return 0
+        return self.cursor.rowcount
     
     # ==================== COMPANY SETTINGS ====================
     
@@ -478,7 +944,7 @@ class DatabaseManager:
         """Update company settings"""
         query = """UPDATE company_settings SET 
                    company_name = ?, address = ?, phone = ?, email = ?, gstin = ?,
-                   logo_path = ?, invoice_prefix = ?, tax_enabled = ?,
+                   logo_path = ?, invoice_prefix = ?, tax_enabled = ?, invoice_renderer = ?,
                    updated_at = CURRENT_TIMESTAMP
                    WHERE id = 1"""
         params = (
@@ -489,7 +955,8 @@ class DatabaseManager:
             settings.get('gstin', ''),
             settings.get('logo_path', ''),
             settings.get('invoice_prefix', 'INV'),
-            settings.get('tax_enabled', 1)
+            settings.get('tax_enabled', 1),
+            settings.get('invoice_renderer', 'canvas')
         )
         return self.execute_update(query, params) != -1
     
@@ -526,21 +993,57 @@ class DatabaseManager:
             'unpaid_invoices': unpaid_count
         }
     
+    @staticmethod
+    def _aging_columns(age: str) -> str:
+        """SUM(CASE ...) per aging bucket for an age-in-days expression"""
+        columns = []
+        for column, low, high in AGING_BUCKETS:
+            condition = f"{age} >= {low}" if high is None else f"{age} BETWEEN {low} AND {high}"
+            columns.append(f"SUM(CASE WHEN {condition} THEN balance_amount ELSE 0 END) AS {column}")
+        return ",\n".join(columns)
+    
+    def get_aging_summary(self, as_of: str = None, overdue_days: int = 7) -> Dict:
+        """
+        Receivables totals per aging bucket, in one pass over unpaid and partially paid invoices
+        
+        ``overdue_count``/``overdue_total`` cover invoices older than ``overdue_days``.
+        """
+        as_of = as_of or datetime.now().strftime('%Y-%m-%d')
+        age = "CAST(julianday(?) - julianday(invoice_date) AS INTEGER)"
+        query = f"""SELECT COUNT(*) AS invoice_count,
+                           COUNT(DISTINCT COALESCE(customer_id, customer_name)) AS customer_count,
+                           COALESCE(SUM(balance_amount), 0) AS total_due,
+                           SUM(CASE WHEN age > ? THEN 1 ELSE 0 END) AS overdue_count,
+                           COALESCE(SUM(CASE WHEN age > ? THEN balance_amount ELSE 0 END), 0) AS overdue_total,
+                           {self._aging_columns("age")}
+                    FROM (SELECT customer_id, customer_name, balance_amount, {age} AS age
+                          FROM invoices
+                          WHERE payment_status IN ('unpaid', 'partially_paid')
+                            AND invoice_date <= ? AND balance_amount > 0)"""
+        result = self.execute_query(query, (overdue_days, overdue_days, as_of, as_of))
+        summary = result[0] if result else {}
+        return {key: value or 0 for key, value in summary.items()}
+    
+    def get_receivables_aging(self, as_of: str = None) -> List[Dict]:
+        """Outstanding balance per customer split into aging buckets, largest balance first"""
+        query, params = self._report_query("aging", end_date=as_of or "")
+        return self.execute_query(query, tuple(params))
+    
     def get_sales_report(self, start_date: str, end_date: str) -> List[Dict]:
         """Get sales report for date range"""
-        query = """SELECT invoice_date, COUNT(*) as invoice_count, 
+        query = f"""SELECT invoice_date, COUNT(*) as invoice_count, 
                    SUM(grand_total) as total_sales, SUM(amount_paid) as total_paid,
                    SUM(balance_amount) as total_due
-                   FROM invoices 
+                   FROM {self._history('invoices', start_date)} 
                    WHERE invoice_date BETWEEN ? AND ?
                    GROUP BY invoice_date
                    ORDER BY invoice_date DESC"""
         return self.execute_query(query, (start_date, end_date))
     
     def get_customer_ledger(self, customer_id: int) -> Dict:
-        """Get customer ledger with all transactions"""
+        """Get customer ledger with all transactions, archived years included"""
         invoices = self.execute_query(
-            "SELECT * FROM invoices WHERE customer_id = ? ORDER BY invoice_date DESC",
+            f"SELECT * FROM {self._history('invoices')} WHERE customer_id = ? ORDER BY invoice_date DESC",
             (customer_id,)
         )
         
@@ -555,25 +1058,786 @@ class DatabaseManager:
             'total_due': total_due
         }
     
+    def count_customers_with_balance(self, min_balance: float = 0.01) -> int:
+        """Number of customers whose invoices have an outstanding balance"""
+        # Archived invoices are settled but may be overpaid, so they count towards the balance
+        query = f"""SELECT COUNT(*) AS total FROM (
+                       SELECT customer_id FROM {self._history('invoices')} WHERE customer_id IS NOT NULL
+                       GROUP BY customer_id HAVING SUM(balance_amount) >= ?
+                   )"""
+        results = self.execute_query(query, (min_balance,))
+        return results[0]['total'] if results else 0
+    
+    def iter_statement_entries(self, min_balance: float = 0.01, chunk_size: int = 1000) -> Iterator[Dict]:
+        """
+        Stream invoices and payments of every customer with a balance, in one query
+        
+        Rows are ordered by customer, then date, so statements can be built in
+        a single pass. ``entry_type`` is 'invoice' or 'payment'.
+        """
+        invoices, payments = self._history('invoices'), self._history('payments')
+        query = f"""WITH due_customers AS (
+                       SELECT customer_id FROM {invoices} WHERE customer_id IS NOT NULL
+                       GROUP BY customer_id HAVING SUM(balance_amount) >= ?
+                   ),
+                   entries AS (
+                       SELECT i.customer_id, 'invoice' AS entry_type, i.invoice_date AS entry_date,
+                              i.invoice_time AS entry_time, i.id AS invoice_id, i.invoice_number,
+                              i.grand_total, i.amount_paid, i.balance_amount, i.payment_status,
+                              NULL AS amount, NULL AS payment_mode, NULL AS reference_number
+                       FROM {invoices} i
+                       WHERE i.customer_id IN (SELECT customer_id FROM due_customers)
+                       UNION ALL
+                       SELECT i.customer_id, 'payment', p.payment_date, p.payment_time, p.invoice_id,
+                              i.invoice_number, NULL, NULL, NULL, NULL,
+                              p.amount, p.payment_mode, p.reference_number
+                       FROM {payments} p
+                       JOIN {invoices} i ON i.id = p.invoice_id
+                       WHERE i.customer_id IN (SELECT customer_id FROM due_customers)
+                   )
+                   SELECT e.*, c.customer_name, c.phone, c.email, c.address
+                   FROM entries e
+                   JOIN customers c ON c.id = e.customer_id
+                   ORDER BY e.customer_id, e.entry_date, e.entry_time, e.entry_type"""
+        
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, (min_balance,))
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        except Exception as e:
+            print(f"Error streaming statement entries: {e}")
+        finally:
+            cursor.close()
+    
+    def _report_query(self, report_type: str, start_date: str = "", end_date: str = "") -> Tuple[str, List]:
+        """SQL and parameters behind each exportable report, one row per output line"""
+        if report_type in ("sales", "payments"):
+            where, params = self._invoice_filters(start_date=start_date, end_date=end_date)
+            query = f"""SELECT invoice_date, invoice_number, customer_name, grand_total,
+                               amount_paid, balance_amount, UPPER(payment_status) AS payment_status
+                        FROM {self._history('invoices', start_date)} {where}
+                        ORDER BY invoice_date, invoice_time, id"""
+            return query, params
+        
+        if report_type in ("stock", "low_stock", "products"):
+            query = """SELECT p.product_code, p.product_name, c.name AS category_name, p.unit,
+                              p.purchase_price, p.selling_price, p.gst_rate,
+                              p.current_stock, p.min_stock_level,
+                              p.current_stock * p.purchase_price AS stock_value,
+                              p.min_stock_level - p.current_stock AS shortage,
+                              p.min_stock_level * 2 AS reorder_qty,
+                              CASE WHEN p.current_stock <= p.min_stock_level THEN 'Low'
+                                   WHEN p.current_stock <= p.min_stock_level * 2 THEN 'Warning'
+                                   ELSE 'Good' END AS stock_status
+                       FROM products p
+                       LEFT JOIN categories c ON p.category_id = c.id
+                       WHERE p.is_active = 1"""
+            if report_type == "low_stock":
+                query += " AND p.current_stock <= p.min_stock_level ORDER BY p.current_stock"
+            else:
+                query += " ORDER BY p.product_name"
+            return query, []
+        
+        if report_type == "product_sales":
+            # Whole months come from the monthly rollup, the partial months at
+            # either end from the daily one
+            start_date = start_date or "0001-01-01"
+            end_date = end_date or "9999-12-31"
+            columns = "product_id, quantity, taxable_amount, gst_amount, total_amount, cost_amount, line_count"
+            months = self._full_months(start_date, end_date)
+            if months:
+                first_month, last_month, first_day, last_day = months
+                source = f"""SELECT {columns} FROM product_monthly_sales WHERE sale_month BETWEEN ? AND ?
+                             UNION ALL
+                             SELECT {columns} FROM product_daily_sales WHERE sale_date >= ? AND sale_date < ?
+                             UNION ALL
+                             SELECT {columns} FROM product_daily_sales WHERE sale_date > ? AND sale_date <= ?"""
+                params = [first_month, last_month, start_date, first_day, last_day, end_date]
+            else:
+                source = f"SELECT {columns} FROM product_daily_sales WHERE sale_date BETWEEN ? AND ?"
+                params = [start_date, end_date]
+            
+            # Lines added and removed again leave zero rows behind
+            query = f"""SELECT p.product_code, p.product_name, p.unit,
+                               s.quantity, s.revenue, s.tax_amount, s.total_amount, s.margin
+                        FROM (SELECT product_id,
+                                     SUM(quantity) AS quantity,
+                                     SUM(taxable_amount) AS revenue,
+                                     SUM(gst_amount) AS tax_amount,
+                                     SUM(total_amount) AS total_amount,
+                                     SUM(taxable_amount - cost_amount) AS margin
+                              FROM ({source})
+                              GROUP BY product_id
+                              HAVING SUM(line_count) > 0) s
+                        JOIN products p ON p.id = s.product_id
+                        ORDER BY s.revenue DESC"""
+            return query, params
+        
+        if report_type == "stock_movement":
+            # Opening stock starts from the last snapshot before the range, so only
+            # transactions after it are read, through idx_stock_product_date
+            start_date = start_date or "0001-01-01"
+            end_date = end_date or "9999-12-31"
+            delta = self._stock_delta()
+            transactions, range_params = self._stock_history("<", start_date, end_date)
+            query = f"""SELECT product_code, product_name, unit, opening_qty, inward_qty, outward_qty,
+                               opening_qty + inward_qty - outward_qty AS closing_qty
+                        FROM (SELECT p.product_code, p.product_name, p.unit,
+                                     COALESCE(s.quantity, p.opening_stock)
+                                         + COALESCE(SUM(CASE WHEN t.transaction_date < ? THEN {delta} END), 0)
+                                         AS opening_qty,
+                                     COALESCE(SUM(CASE WHEN t.transaction_date >= ? AND {delta} > 0
+                                                       THEN {delta} END), 0) AS inward_qty,
+                                     COALESCE(SUM(CASE WHEN t.transaction_date >= ? AND {delta} < 0
+                                                       THEN -({delta}) END), 0) AS outward_qty
+                              FROM products p
+                              LEFT JOIN stock_snapshots s
+                                     ON s.product_id = p.id
+                                    AND s.snapshot_date = (SELECT MAX(snapshot_date) FROM stock_snapshots
+                                                           WHERE snapshot_date < ?)
+                              LEFT JOIN {transactions} t
+                                     ON t.product_id = p.id
+                                    AND t.transaction_date > COALESCE(s.snapshot_date, '')
+                                    AND t.transaction_date <= ?
+                              WHERE p.is_active = 1
+                              GROUP BY p.id)
+                        ORDER BY product_name"""
+            return query, [start_date, start_date, start_date, start_date, *range_params, end_date]
+        
+        if report_type == "gst":
+            # The rollup is monthly, so the months containing both dates are taken whole.
+            # Intra-state supply is assumed: the tax splits evenly into CGST and SGST.
+            start_month = (start_date or "0001-01")[:7]
+            end_month = (end_date or "9999-12")[:7]
+            query = """SELECT tax_month, gst_rate, taxable_amount,
+                              ROUND(gst_amount / 2, 2) AS cgst_amount,
+                              ROUND(gst_amount - ROUND(gst_amount / 2, 2), 2) AS sgst_amount,
+                              gst_amount, total_amount, line_count
+                       FROM gst_monthly_summary
+                       WHERE tax_month BETWEEN ? AND ? AND line_count > 0
+                       ORDER BY tax_month, gst_rate"""
+            return query, [start_month, end_month]
+        
+        if report_type == "gst_invoices":
+            # One row per invoice and rate, in date order, for return filing
+            start_date = start_date or "0001-01-01"
+            end_date = end_date or "9999-12-31"
+            invoices, invoice_params = self._history_range('invoices', start_date, end_date)
+            items, item_params = self._history_range('invoice_items', start_date, end_date)
+            query = f"""SELECT i.invoice_date, i.invoice_number, i.customer_name, c.gstin,
+                              COALESCE(ii.gst_rate, 0) AS gst_rate,
+                              SUM(ii.taxable_amount) AS taxable_amount,
+                              ROUND(SUM(COALESCE(ii.gst_amount, 0)) / 2, 2) AS cgst_amount,
+                              ROUND(SUM(COALESCE(ii.gst_amount, 0))
+                                    - ROUND(SUM(COALESCE(ii.gst_amount, 0)) / 2, 2), 2) AS sgst_amount,
+                              SUM(ii.total_amount) AS total_amount
+                       FROM {invoices} i
+                       JOIN {items} ii ON ii.invoice_id = i.id
+                       LEFT JOIN customers c ON c.id = i.customer_id
+                       WHERE i.invoice_date BETWEEN ? AND ?
+                       GROUP BY i.invoice_date, i.id, COALESCE(ii.gst_rate, 0)
+                       ORDER BY i.invoice_date, i.id, COALESCE(ii.gst_rate, 0)"""
+            return query, [*invoice_params, *item_params, start_date, end_date]
+        
+        if report_type == "aging":
+            # end_date is the as-of date; walk-in invoices without a customer_id group by name
+            as_of = end_date or datetime.now().strftime('%Y-%m-%d')
+            age = "CAST(julianday(?) - julianday(invoice_date) AS INTEGER)"
+            query = f"""SELECT customer_id, customer_name,
+                               COUNT(*) AS invoice_count,
+                               MIN(invoice_date) AS oldest_invoice_date,
+                               {self._aging_columns("age")},
+                               SUM(balance_amount) AS total_due
+                        FROM (SELECT customer_id, customer_name, invoice_date, balance_amount, {age} AS age
+                              FROM invoices
+                              WHERE payment_status IN ('unpaid', 'partially_paid')
+                                AND invoice_date <= ? AND balance_amount > 0)
+                        GROUP BY COALESCE(customer_id, customer_name)
+                        ORDER BY total_due DESC"""
+            return query, [as_of, as_of]
+        
+        if report_type == "customers":
+            query = f"""SELECT c.customer_name, c.phone,
+                              COALESCE(SUM(i.grand_total), 0) AS total_purchases,
+                              COALESCE(SUM(i.amount_paid), 0) AS total_paid,
+                              COALESCE(SUM(i.balance_amount), 0) AS balance
+                       FROM customers c
+                       LEFT JOIN {self._history('invoices')} i ON i.customer_id = c.id
+                       GROUP BY c.id
+                       ORDER BY c.customer_name"""
+            return query, []
+        
+        raise ValueError(f"Unknown report type: {report_type}")
+    
+    def get_customer_summary(self) -> List[Dict]:
+        """Purchases, payments and balance for every customer, in one grouped query"""
+        query, params = self._report_query("customers")
+        return self.execute_query(query, tuple(params))
+    
+    def get_data_versions(self, tables) -> Dict[str, int]:
+        """Change counters for the given tables, maintained by triggers in schema.sql"""
+        tables = list(tables)
+        placeholders = ','.join('?' * len(tables))
+        rows = self.execute_query(
+            f"SELECT table_name, version FROM data_versions WHERE table_name IN ({placeholders})",
+            tuple(tables)
+        )
+        return {row['table_name']: row['version'] for row in rows}
+    
+    def get_product_sales(self, start_date: str = "", end_date: str = "") -> List[Dict]:
+        """Quantity, revenue, tax and margin per product over a date range, from the daily rollup"""
+        query, params = self._report_query("product_sales", start_date, end_date)
+        return self.execute_query(query, tuple(params))
+    
+    def rebuild_product_daily_sales(self) -> int:
+        """Recompute the product daily and monthly sales rollups from invoice_items; returns daily rows or -1"""
+        try:
+            invoices, items = self._history('invoices'), self._history('invoice_items')
+            self.cursor.execute("DELETE FROM product_daily_sales")
+            self.cursor.execute(
+                f"""INSERT INTO product_daily_sales
+                       (sale_date, product_id, quantity, taxable_amount, gst_amount, total_amount,
+                        cost_amount, line_count)
+                   SELECT i.invoice_date, ii.product_id, SUM(ii.quantity), SUM(ii.taxable_amount),
+                          SUM(ii.gst_amount), SUM(ii.total_amount),
+                          SUM(ii.quantity * COALESCE(ii.unit_cost, 0)), COUNT(*)
+                   FROM {items} ii
+                   JOIN {invoices} i ON i.id = ii.invoice_id
+                   WHERE ii.product_id IS NOT NULL
+                   GROUP BY i.invoice_date, ii.product_id"""
+            )
+            count = self.cursor.rowcount
+            
+            self.cursor.execute("DELETE FROM product_monthly_sales")
+            self.cursor.execute(
+                """INSERT INTO product_monthly_sales
+                       (sale_month, product_id, quantity, taxable_amount, gst_amount, total_amount,
+                        cost_amount, line_count)
+                   SELECT substr(sale_date, 1, 7), product_id, SUM(quantity), SUM(taxable_amount),
+                          SUM(gst_amount), SUM(total_amount), SUM(cost_amount), SUM(line_count)
+                   FROM product_daily_sales
+                   GROUP BY substr(sale_date, 1, 7), product_id"""
+            )
+            self.conn.commit()
+            return count
+        except Exception as e:
+            print(f"Error rebuilding product sales rollup: {e}")
+            self.conn.rollback()
+            return -1
+    
+    def get_gst_summary(self, start_date: str = "", end_date: str = "") -> List[Dict]:
+        """Taxable value and CGST/SGST per month and rate, from the monthly rollup"""
+        query, params = self._report_query("gst", start_date, end_date)
+        return self.execute_query(query, tuple(params))
+    
+    def rebuild_gst_monthly_summary(self) -> int:
+        """Recompute the GST monthly summary from invoice_items; returns rows written or -1"""
+        try:
+            invoices, items = self._history('invoices'), self._history('invoice_items')
+            self.cursor.execute("DELETE FROM gst_monthly_summary")
+            self.cursor.execute(
+                f"""INSERT INTO gst_monthly_summary
+                       (tax_month, gst_rate, taxable_amount, gst_amount, total_amount, line_count)
+                   SELECT substr(i.invoice_date, 1, 7), COALESCE(ii.gst_rate, 0), SUM(ii.taxable_amount),
+                          SUM(COALESCE(ii.gst_amount, 0)), SUM(ii.total_amount), COUNT(*)
+                   FROM {items} ii
+                   JOIN {invoices} i ON i.id = ii.invoice_id
+                   GROUP BY substr(i.invoice_date, 1, 7), COALESCE(ii.gst_rate, 0)"""
+            )
+            count = self.cursor.rowcount
+            self.conn.commit()
+            return count
+        except Exception as e:
+            print(f"Error rebuilding GST summary: {e}")
+            self.conn.rollback()
+            return -1
+    
+    @staticmethod
+    def _full_months(start_date: str, end_date: str) -> Optional[Tuple[str, str, str, str]]:
+        """
+        Whole calendar months inside a date range
+        
+        Returns (first_month, last_month, first_day, last_day) as 'YYYY-MM'
+        and 'YYYY-MM-DD', or None if the range covers no whole month.
+        """
+        start = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end = datetime.strptime(end_date, '%Y-%m-%d').date()
+        
+        first = (start.year, start.month)
+        if start.day != 1:
+            first = (first[0] + first[1] // 12, first[1] % 12 + 1)
+        last = (end.year, end.month)
+        if end.day != calendar.monthrange(*last)[1]:
+            last = (last[0] - (last[1] == 1), (last[1] - 2) % 12 + 1)
+        if first > last:
+            return None
+        
+        last_day = calendar.monthrange(*last)[1]
+        return (f"{first[0]:04d}-{first[1]:02d}", f"{last[0]:04d}-{last[1]:02d}",
+                f"{first[0]:04d}-{first[1]:02d}-01", f"{last[0]:04d}-{last[1]:02d}-{last_day:02d}")
+    
+    def count_report_rows(self, report_type: str, start_date: str = "", end_date: str = "") -> int:
+        """Number of rows an export of this report will write"""
+        query, params = self._report_query(report_type, start_date, end_date)
+        results = self.execute_query(f"SELECT COUNT(*) AS total FROM ({query})", tuple(params))
+        return results[0]['total'] if results else 0
+    
+    def iter_report_rows(self, report_type: str, start_date: str = "", end_date: str = "",
+                         chunk_size: int = 1000) -> Iterator[List[Dict]]:
+        """
+        Stream a report's rows in chunks from a dedicated cursor
+        
+        Errors propagate, so a failed export is not mistaken for a short one.
+        """
+        query, params = self._report_query(report_type, start_date, end_date)
+        
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, tuple(params))
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [dict(row) for row in rows]
+        finally:
+            cursor.close()
+    
+    # ==================== ARCHIVES ====================
+    
+    @staticmethod
+    def financial_year_bounds(year: int) -> Tuple[str, str]:
+        """First and last day of the financial year starting in ``year``"""
+        start = datetime(year, FINANCIAL_YEAR_START_MONTH, 1)
+        end = datetime(year + 1, FINANCIAL_YEAR_START_MONTH, 1) - timedelta(days=1)
+        return start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+    
+    @staticmethod
+    def financial_year_label(year: int) -> str:
+        """'2023-24' for the financial year starting in 2023"""
+        if FINANCIAL_YEAR_START_MONTH == 1:
+            return str(year)
+        return f"{year}-{(year + 1) % 100:02d}"
+    
+    @staticmethod
+    def financial_year_of(day: str) -> int:
+        """Starting year of the financial year a 'YYYY-MM-DD' date falls in"""
+        year, month = int(day[:4]), int(day[5:7])
+        return year if month >= FINANCIAL_YEAR_START_MONTH else year - 1
+    
+    def get_archives(self) -> List[Dict]:
+        """Archived financial years, oldest first"""
+        return self.execute_query("SELECT * FROM archives ORDER BY start_date")
+    
+    def get_archivable_years(self) -> List[int]:
+        """Closed financial years that still have live invoices or stock transactions and no archive yet"""
+        result = self.execute_query(
+            """SELECT MIN(first_date) AS first_date
+               FROM (SELECT MIN(invoice_date) AS first_date FROM invoices
+                     UNION ALL
+                     SELECT MIN(transaction_date) FROM stock_transactions)"""
+        )
+        if not result or not result[0]['first_date']:
+            return []
+        
+        archived = {archive['financial_year'] for archive in self.get_archives()}
+        current = self.financial_year_of(datetime.now().strftime('%Y-%m-%d'))
+        return [year for year in range(self.financial_year_of(result[0]['first_date']), current)
+                if self.financial_year_label(year) not in archived]
+    
+    def _archive_path(self, file_path: str) -> str:
+        """Archive paths are stored relative to the database's folder, so the two can move together"""
+        if os.path.isabs(file_path):
+            return file_path
+        return os.path.join(os.path.dirname(os.path.abspath(self.db_path)), file_path)
+    
+    def _attach_archives(self) -> List[Dict]:
+        """
+        Attach registered archives this connection hasn't attached yet; returns all archives
+        
+        The temp views invoices_all, invoice_items_all, payments_all and
+        stock_transactions_all read the live table and every attached
+        archive with UNION ALL. They are rebuilt whenever an archive is
+        attached. SQLite attaches at most ten databases per connection.
+        """
+        archives = self.get_archives()
+        pending = [a for a in archives if a['financial_year'] not in self._attached_archives]
+        if not pending:
+            return archives
+        
+        # ATTACH can't run inside a transaction
+        if self.conn.in_transaction:
+            self.conn.commit()
+        for archive in pending:
+            schema = f"archive_{archive['start_date'][:4]}"
+            path = self._archive_path(archive['file_path'])
+            if not os.path.exists(path):
+                print(f"Error attaching archive {archive['financial_year']}: {path} not found")
+                continue
+            try:
+                self.cursor.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+                self._attached_archives[archive['financial_year']] = schema
+            except sqlite3.Error as e:
+                print(f"Error attaching archive {archive['financial_year']}: {e}")
+        
+        for table in ARCHIVED_TABLES:
+            selects = [f"SELECT {self._archive_columns(table, schema)} FROM {schema}.{table}"
+                       for schema in ["main", *self._attached_archives.values()]]
+            self.cursor.execute(f"DROP VIEW IF EXISTS temp.{table}_all")
+            self.cursor.execute(f"CREATE TEMP VIEW {table}_all AS " + " UNION ALL ".join(selects))
+        return archives
+    
+    def _archive_columns(self, table: str, schema: str) -> str:
+        """Select list giving main's columns of a table; columns added after an archive was written read as NULL"""
+        columns = [row[1] for row in self.cursor.execute(f"PRAGMA main.table_info({table})").fetchall()]
+        if schema == "main":
+            return ", ".join(columns)
+        present = {row[1] for row in self.cursor.execute(f"PRAGMA {schema}.table_info({table})").fetchall()}
+        return ", ".join(c if c in present else f"NULL AS {c}" for c in columns)
+    
+    def _history(self, table: str, since: str = "") -> str:
+        """
+        Table name for a query reading rows dated ``since`` or later
+        
+        That is ``table`` itself unless archived years may hold matching rows,
+        in which case it is the ``{table}_all`` view over the live table and
+        its archives. An empty ``since`` means all time. Call it before
+        opening a transaction, since archives may need attaching.
+        """
+        archives = self._attach_archives()
+        if not self._attached_archives:
+            return table
+        if since and since > max(archive['end_date'] for archive in archives):
+            return table
+        return f"{table}_all"
+    
+    def _history_range(self, table: str, start_date: str, end_date: str) -> Tuple[str, List]:
+        """
+        Source and parameters for a query joining rows of ``table`` dated in a range
+        
+        Returns ``table`` itself when no archived year overlaps the range.
+        Otherwise returns a UNION ALL of the live table and the overlapping
+        archives, each filtered to the range first: SQLite materialises a
+        joined {table}_all view whole, reading every archive in full.
+        """
+        archives = self._attach_archives()
+        schemas = [self._attached_archives[a['financial_year']] for a in archives
+                   if a['financial_year'] in self._attached_archives
+                   and a['start_date'] <= end_date and a['end_date'] >= start_date]
+        if not schemas:
+            return table, []
+        
+        selects, params = [], []
+        for schema in ["main", *schemas]:
+            condition = ARCHIVE_DATE_FILTERS[table].format(schema=schema)
+            selects.append(f"SELECT {self._archive_columns(table, schema)} FROM {schema}.{table} WHERE {condition}")
+            params += [start_date, end_date]
+        return "(" + " UNION ALL ".join(selects) + ")", params
+    
+    def _stock_history(self, operator: str, base_date: str, end_date: str) -> Tuple[str, List]:
+        """
+        _history_range for stock transactions replayed on top of a snapshot
+        
+        The snapshot is the latest with ``snapshot_date {operator} base_date``.
+        Only transactions after it are read: products created after it have
+        no row there, but their transactions all come later too.
+        """
+        result = self.execute_query(
+            f"SELECT MAX(snapshot_date) AS snapshot_date FROM stock_snapshots WHERE snapshot_date {operator} ?",
+            (base_date,)
+        )
+        snapshot_date = result[0]['snapshot_date'] if result else None
+        start_date = "0001-01-01"
+        if snapshot_date:
+            start_date = (datetime.strptime(snapshot_date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+        return self._history_range('stock_transactions', start_date, end_date)
+    
+    def _query_with_archives(self, table: str, query: str, params: tuple) -> List[Dict]:
+        """Run query with {source} as the live table, then as the archive view if that found nothing"""
+        results = self.execute_query(query.format(source=table), params)
+        if not results:
+            source = self._history(table)
+            if source != table:
+                results = self.execute_query(query.format(source=source), params)
+        return results
+    
+    def _create_archive_schema(self, archive: sqlite3.Connection):
+        """Create the archived tables and their indexes in an archive database, as they are in main"""
+        existing = {row[0] for row in archive.execute("SELECT name FROM sqlite_master")}
+        placeholders = ', '.join('?' * len(ARCHIVED_TABLES))
+        self.cursor.execute(
+            f"""SELECT name, sql FROM main.sqlite_master
+                WHERE type IN ('table', 'index') AND tbl_name IN ({placeholders}) AND sql IS NOT NULL
+                ORDER BY type DESC""", ARCHIVED_TABLES
+        )
+        for name, sql in self.cursor.fetchall():
+            if name not in existing:
+                archive.execute(sql)
+        archive.commit()
+    
+    def _copy_to_archive(self, archive: sqlite3.Connection, table: str, where: str, params: tuple) -> int:
+        """Copy matching rows of a live table into an archive database in chunks; returns rows copied"""
+        present = {row[1] for row in archive.execute(f"PRAGMA table_info({table})")}
+        columns = [row[1] for row in self.cursor.execute(f"PRAGMA main.table_info({table})").fetchall()
+                   if row[1] in present]
+        column_list = ', '.join(columns)
+        insert = (f"INSERT OR REPLACE INTO {table} ({column_list}) "
+                  f"VALUES ({', '.join('?' * len(columns))})")
+        
+        cursor = self.conn.cursor()
+        copied = 0
+        try:
+            cursor.execute(f"SELECT {column_list} FROM main.{table} {where}", params)
+            while True:
+                rows = cursor.fetchmany(5000)
+                if not rows:
+                    break
+                archive.executemany(insert, (tuple(row) for row in rows))
+                copied += len(rows)
+        finally:
+            cursor.close()
+        return copied
+    
+    def archive_financial_year(self, year: int, progress: Callable[[str], None] = None) -> Optional[Dict]:
+        """
+        Move a closed financial year out of the live database into its own archive file
+        
+        Settled invoices dated in the year move with their items and
+        payments; invoices still owed money stay live. Every stock
+        transaction of the year moves too, after a stock snapshot is written
+        for the last day of the year, so later stock queries start from it.
+        The archive is committed before anything is deleted, and the delete
+        runs with writers locked out. Sales and GST rollups are left as
+        they are, so reports built on them still cover the archived year.
+        Running it again for the same year moves whatever has since been
+        settled. Returns rows moved per table, or None on error.
+        """
+        label = self.financial_year_label(year)
+        start_date, end_date = self.financial_year_bounds(year)
+        if year >= self.financial_year_of(datetime.now().strftime('%Y-%m-%d')):
+            print(f"Error archiving {label}: only closed financial years can be archived")
+            return None
+        
+        existing = [a for a in self.get_archives() if a['financial_year'] == label]
+        stem = os.path.splitext(os.path.basename(self.db_path))[0]
+        file_path = existing[0]['file_path'] if existing else os.path.join("archives", f"{stem}_fy{label}.db")
+        
+        archive = None
+        try:
+            archive_path = self._archive_path(file_path)
+            os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+            archive = sqlite3.connect(archive_path)
+            # WAL, so the archive can be written while this connection has it attached for reading
+            archive.execute("PRAGMA journal_mode=WAL").fetchone()
+            self._create_archive_schema(archive)
+            
+            # Earlier archives must be attached before the write lock is taken
+            self._attach_archives()
+            if self.conn.in_transaction:
+                self.conn.commit()
+            self.cursor.execute("BEGIN IMMEDIATE")
+            
+            if progress:
+                progress("Writing year-end stock snapshot")
+            self._insert_stock_snapshot(end_date)
+            
+            settled = f"invoice_date BETWEEN ? AND ? AND NOT ({OPEN_INVOICE_CONDITION})"
+            of_settled = f"WHERE invoice_id IN (SELECT id FROM main.invoices WHERE {settled})"
+            selections = (
+                ('invoices', f"WHERE {settled}"),
+                ('invoice_items', of_settled),
+                ('payments', of_settled),
+                ('stock_transactions', "WHERE transaction_date BETWEEN ? AND ?"),
+            )
+            moved = {}
+            for table, where in selections:
+                if progress:
+                    progress(f"Copying {table}")
+                moved[table] = self._copy_to_archive(archive, table, where, (start_date, end_date))
+            # The archive is durable before anything leaves the live database
+            archive.commit()
+            
+            if progress:
+                progress("Removing archived rows")
+            # Deleting must not take the archived year out of the rollups or bump counters per row
+            placeholders = ', '.join('?' * len(ARCHIVED_TABLES))
+            self.cursor.execute(
+                f"SELECT name, sql FROM main.sqlite_master WHERE type = 'trigger' AND tbl_name IN ({placeholders})",
+                ARCHIVED_TABLES
+            )
+            triggers = self.cursor.fetchall()
+            for name, _ in triggers:
+                self.cursor.execute(f"DROP TRIGGER main.{name}")
+            # Children first, while their invoices still identify them
+            for table, where in sorted(selections, key=lambda selection: selection[0] == 'invoices'):
+                self.cursor.execute(f"DELETE FROM main.{table} {where}", (start_date, end_date))
+            for _, sql in triggers:
+                self.cursor.execute(sql)
+            self.cursor.execute(
+                f"UPDATE data_versions SET version = version + 1 WHERE table_name IN ({placeholders})",
+                ARCHIVED_TABLES
+            )
+            
+            counts = [archive.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in ARCHIVED_TABLES]
+            self.cursor.execute(
+                """INSERT OR REPLACE INTO archives
+                       (financial_year, start_date, end_date, file_path, invoice_count, invoice_item_count,
+                        payment_count, stock_transaction_count)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (label, start_date, end_date, file_path, *counts)
+            )
+            self.conn.commit()
+            return moved
+        except Exception as e:
+            print(f"Error archiving financial year {label}: {e}")
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            if archive:
+                archive.rollback()
+            return None
+        finally:
+            if archive:
+                archive.close()
+    
+    def compact_database(self) -> bool:
+        """Return free pages to the file system with VACUUM, e.g. after archiving"""
+        try:
+            if self.conn.in_transaction:
+                self.conn.commit()
+            self.cursor.execute("VACUUM")
+            # In WAL mode the file only shrinks once the rewritten pages are checkpointed
+            self.cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            return True
+        except Exception as e:
+            print(f"Error compacting database: {e}")
+            return False
+    
     # ==================== BACKUP & RESTORE ====================
     
-    def backup_database(self, backup_path: str) -> bool:
-        """Create database backup"""
+    def backup_database(self, backup_path: str, pages: int = BACKUP_STEP_PAGES,
+                        progress: Callable[[int, int], None] = None,
+                        is_cancelled: Callable[[], bool] = None) -> bool:
+        """
+        Copy the live database to backup_path with the SQLite backup API
+        
+        Pages are copied in steps of ``pages`` inside one read transaction,
+        so other connections keep writing and the copy is a consistent
+        snapshot that never restarts. The copy is written to a .part file,
+        checked with PRAGMA integrity_check and only then moved into place.
+        progress is called as (pages_done, total_pages) after each step.
+        """
+        temp_path = backup_path + ".part"
+        dest = None
         try:
-            import shutil
-            shutil.copy2(self.db_path, backup_path)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            dest = sqlite3.connect(temp_path)
+            
+            def on_step(status, remaining, total):
+                if is_cancelled and is_cancelled():
+                    raise InterruptedError("Backup cancelled")
+                if progress:
+                    progress(total - remaining, total)
+            
+            if self.conn.in_transaction:
+                self.conn.commit()
+            # Pin one WAL snapshot for the whole copy
+            self.cursor.execute("BEGIN")
+            self.cursor.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            try:
+                self.conn.backup(dest, pages=pages, progress=on_step)
+            finally:
+                self.conn.rollback()
+            
+            # The backup is a single self-contained file
+            dest.execute("PRAGMA journal_mode=DELETE")
+            result = dest.execute("PRAGMA integrity_check").fetchone()[0]
+            dest.close()
+            dest = None
+            if result != "ok":
+                raise sqlite3.DatabaseError(f"Backup failed integrity check: {result}")
+            
+            os.replace(temp_path, backup_path)
             return True
+        except InterruptedError:
+            return False
         except Exception as e:
             print(f"Error creating backup: {e}")
             return False
+        finally:
+            if dest:
+                dest.close()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def validate_backup(self, backup_path: str) -> Optional[str]:
+        """Why backup_path can't be restored, or None if it can"""
+        if not os.path.isfile(backup_path):
+            return "Backup file not found"
+        
+        source = None
+        try:
+            source = sqlite3.connect(backup_path)
+            result = source.execute("PRAGMA integrity_check").fetchone()[0]
+            if result != "ok":
+                return f"Backup failed integrity check: {result}"
+            
+            tables = {row[0] for row in source.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            missing = [table for table in BACKUP_REQUIRED_TABLES if table not in tables]
+            if missing:
+                return f"Not a backup of this application (missing {', '.join(missing)})"
+            
+            # The backup API can't change the page size of a WAL database
+            page_size = source.execute("PRAGMA page_size").fetchone()[0]
+            live_page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+            if page_size != live_page_size:
+                return f"Backup page size {page_size} differs from the database's {live_page_size}"
+            return None
+        except sqlite3.DatabaseError as e:
+            return f"Not a readable database: {e}"
+        finally:
+            if source:
+                source.close()
     
     def restore_database(self, backup_path: str) -> bool:
-        """Restore database from backup"""
+        """
+        Restore the live database in place from a validated backup
+        
+        The backup is copied into the open database through the SQLite
+        backup API in one transaction, so other connections see either the
+        old or the restored data and nothing needs a restart. Afterwards
+        every data_versions counter moves past any value seen before the
+        restore, which makes caches keyed on them rebuild.
+        """
+        problem = self.validate_backup(backup_path)
+        if problem:
+            print(f"Error restoring backup: {problem}")
+            return False
+        
         try:
-            import shutil
+            if self.conn.in_transaction:
+                self.conn.commit()
+            seen = self.execute_query("SELECT MAX(version) AS version FROM data_versions")
+            seen_version = (seen[0]['version'] if seen else None) or 0
+            
+            # Copy through SQLite rather than over the file, which would leave
+            # the live WAL behind to be replayed onto the restored pages
+            source = sqlite3.connect(backup_path)
+            try:
+                source.backup(self.conn)
+            finally:
+                source.close()
+            
+            # Bring backups from older versions up to the current schema
             self.close()
-            shutil.copy2(backup_path, self.db_path)
             self.initialize_database()
+            
+            self.cursor.execute("UPDATE data_versions SET version = MAX(version, ?) + 1", (seen_version,))
+            self.conn.commit()
             return True
         except Exception as e:
             print(f"Error restoring backup: {e}")
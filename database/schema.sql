@@ -12,6 +12,7 @@ CREATE TABLE IF NOT EXISTS company_settings (
     invoice_prefix TEXT DEFAULT 'INV',
     invoice_counter INTEGER DEFAULT 1000,
     tax_enabled INTEGER DEFAULT 1,
+    invoice_renderer TEXT DEFAULT 'canvas',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -104,6 +105,7 @@ CREATE TABLE IF NOT EXISTS invoice_items (
     quantity REAL NOT NULL,
     unit TEXT,
     unit_price REAL NOT NULL,
+    unit_cost REAL,
     discount_percent REAL DEFAULT 0,
     discount_amount REAL DEFAULT 0,
     taxable_amount REAL NOT NULL,
@@ -163,14 +165,526 @@ CREATE TABLE IF NOT EXISTS price_update_history (
     FOREIGN KEY (updated_by) REFERENCES users(id)
 );
 
+-- Print Jobs Table (background invoice PDF rendering queue)
+CREATE TABLE IF NOT EXISTS print_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    invoice_id INTEGER NOT NULL,
+    status TEXT DEFAULT 'queued',
+    attempts INTEGER DEFAULT 0,
+    output_path TEXT,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (invoice_id) REFERENCES invoices(id)
+);
+
+-- Product Daily Sales Table (rollup of invoice_items, maintained by triggers below)
+CREATE TABLE IF NOT EXISTS product_daily_sales (
+    sale_date DATE NOT NULL,
+    product_id INTEGER NOT NULL,
+    quantity REAL NOT NULL DEFAULT 0,
+    taxable_amount REAL NOT NULL DEFAULT 0,
+    gst_amount REAL NOT NULL DEFAULT 0,
+    total_amount REAL NOT NULL DEFAULT 0,
+    cost_amount REAL NOT NULL DEFAULT 0,
+    line_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (sale_date, product_id)
+) WITHOUT ROWID;
+
+-- Product Monthly Sales Table (same rollup by 'YYYY-MM', for long date ranges)
+CREATE TABLE IF NOT EXISTS product_monthly_sales (
+    sale_month TEXT NOT NULL,
+    product_id INTEGER NOT NULL,
+    quantity REAL NOT NULL DEFAULT 0,
+    taxable_amount REAL NOT NULL DEFAULT 0,
+    gst_amount REAL NOT NULL DEFAULT 0,
+    total_amount REAL NOT NULL DEFAULT 0,
+    cost_amount REAL NOT NULL DEFAULT 0,
+    line_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (sale_month, product_id)
+) WITHOUT ROWID;
+
+-- Stock Snapshots Table (each product's stock at the end of snapshot_date, so stock
+-- queries replay only the transactions after the nearest snapshot)
+CREATE TABLE IF NOT EXISTS stock_snapshots (
+    snapshot_date DATE NOT NULL,
+    product_id INTEGER NOT NULL,
+    quantity REAL NOT NULL,
+    PRIMARY KEY (snapshot_date, product_id)
+) WITHOUT ROWID;
+
+-- GST Monthly Summary Table (invoice_items taxes by 'YYYY-MM' and rate, maintained by triggers below)
+CREATE TABLE IF NOT EXISTS gst_monthly_summary (
+    tax_month TEXT NOT NULL,
+    gst_rate REAL NOT NULL,
+    taxable_amount REAL NOT NULL DEFAULT 0,
+    gst_amount REAL NOT NULL DEFAULT 0,
+    total_amount REAL NOT NULL DEFAULT 0,
+    line_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (tax_month, gst_rate)
+) WITHOUT ROWID;
+
+-- Data Versions Table (per-table change counters, bumped by the triggers below)
+CREATE TABLE IF NOT EXISTS data_versions (
+    table_name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+-- Archives Table (closed financial years moved out of invoices, invoice_items, payments
+-- and stock_transactions into their own database files, attached when read)
+CREATE TABLE IF NOT EXISTS archives (
+    financial_year TEXT PRIMARY KEY,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    file_path TEXT NOT NULL,
+    invoice_count INTEGER NOT NULL DEFAULT 0,
+    invoice_item_count INTEGER NOT NULL DEFAULT 0,
+    payment_count INTEGER NOT NULL DEFAULT 0,
+    stock_transaction_count INTEGER NOT NULL DEFAULT 0,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_products_code ON products(product_code);
 CREATE INDEX IF NOT EXISTS idx_products_name ON products(product_name);
 CREATE INDEX IF NOT EXISTS idx_invoices_number ON invoices(invoice_number);
 CREATE INDEX IF NOT EXISTS idx_invoices_date ON invoices(invoice_date);
 CREATE INDEX IF NOT EXISTS idx_invoices_customer ON invoices(customer_id);
+CREATE INDEX IF NOT EXISTS idx_invoices_status_date ON invoices(payment_status, invoice_date);
+CREATE INDEX IF NOT EXISTS idx_invoice_items_invoice ON invoice_items(invoice_id);
+CREATE INDEX IF NOT EXISTS idx_invoice_items_product ON invoice_items(product_id);
 CREATE INDEX IF NOT EXISTS idx_payments_invoice ON payments(invoice_id);
-CREATE INDEX IF NOT EXISTS idx_stock_product ON stock_transactions(product_id);
+-- (product_id, transaction_date) serves per-product lookups as well, so the old single-column index goes
+DROP INDEX IF EXISTS idx_stock_product;
+CREATE INDEX IF NOT EXISTS idx_stock_product_date ON stock_transactions(product_id, transaction_date);
+CREATE INDEX IF NOT EXISTS idx_print_jobs_status ON print_jobs(status, id);
+
+-- Change counters for the report cache
+INSERT OR IGNORE INTO data_versions (table_name) VALUES
+    ('categories'),
+    ('products'),
+    ('customers'),
+    ('invoices'),
+    ('invoice_items'),
+    ('payments'),
+    ('stock_transactions');
+
+CREATE TRIGGER IF NOT EXISTS trg_categories_insert_version AFTER INSERT ON categories
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'categories';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_categories_update_version AFTER UPDATE ON categories
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'categories';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_categories_delete_version AFTER DELETE ON categories
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'categories';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_insert_version AFTER INSERT ON products
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_update_version AFTER UPDATE ON products
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_delete_version AFTER DELETE ON products
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_customers_insert_version AFTER INSERT ON customers
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'customers';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_customers_update_version AFTER UPDATE ON customers
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'customers';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_customers_delete_version AFTER DELETE ON customers
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'customers';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_invoices_insert_version AFTER INSERT ON invoices
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'invoices';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_invoices_update_version AFTER UPDATE ON invoices
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'invoices';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_invoices_delete_version AFTER DELETE ON invoices
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'invoices';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_invoice_items_insert_version AFTER INSERT ON invoice_items
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'invoice_items';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_invoice_items_update_version AFTER UPDATE ON invoice_items
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'invoice_items';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_invoice_items_delete_version AFTER DELETE ON invoice_items
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'invoice_items';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_payments_insert_version AFTER INSERT ON payments
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'payments';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_payments_update_version AFTER UPDATE ON payments
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'payments';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_payments_delete_version AFTER DELETE ON payments
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'payments';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stock_transactions_insert_version AFTER INSERT ON stock_transactions
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'stock_transactions';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stock_transactions_update_version AFTER UPDATE ON stock_transactions
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'stock_transactions';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stock_transactions_delete_version AFTER DELETE ON stock_transactions
+BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE table_name = 'stock_transactions';
+END;
+
+-- Product sales rollups; cost is the line's unit_cost, the product's purchase price when it was sold.
+-- Lines without a product_id are not rolled up, and rows whose last line goes are deleted.
+CREATE TRIGGER IF NOT EXISTS trg_invoice_items_insert_sales AFTER INSERT ON invoice_items
+BEGIN
+    INSERT INTO product_daily_sales
+        (sale_date, product_id, quantity, taxable_amount, gst_amount, total_amount, cost_amount, line_count)
+    SELECT (SELECT invoice_date FROM invoices WHERE id = NEW.invoice_id),
+           NEW.product_id,
+           NEW.quantity, NEW.taxable_amount, NEW.gst_amount, NEW.total_amount,
+           NEW.quantity * COALESCE(NEW.unit_cost, 0),
+           1
+    WHERE NEW.product_id IS NOT NULL
+    ON CONFLICT (sale_date, product_id) DO UPDATE SET
+        quantity = quantity + excluded.quantity,
+        taxable_amount = taxable_amount + excluded.taxable_amount,
+        gst_amount = gst_amount + excluded.gst_amount,
+        total_amount = total_amount + excluded.total_amount,
+        cost_amount = cost_amount + excluded.cost_amount,
+        line_count = line_count + excluded.line_count;
+    INSERT INTO product_monthly_sales
+        (sale_month, product_id, quantity, taxable_amount, gst_amount, total_amount, cost_amount, line_count)
+    SELECT (SELECT substr(invoice_date, 1, 7) FROM invoices WHERE id = NEW.invoice_id),
+           NEW.product_id,
+           NEW.quantity, NEW.taxable_amount, NEW.gst_amount, NEW.total_amount,
+           NEW.quantity * COALESCE(NEW.unit_cost, 0),
+           1
+    WHERE NEW.product_id IS NOT NULL
+    ON CONFLICT (sale_month, product_id) DO UPDATE SET
+        quantity = quantity + excluded.quantity,
+        taxable_amount = taxable_amount + excluded.taxable_amount,
+        gst_amount = gst_amount + excluded.gst_amount,
+        total_amount = total_amount + excluded.total_amount,
+        cost_amount = cost_amount + excluded.cost_amount,
+        line_count = line_count + excluded.line_count;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_invoice_items_delete_sales AFTER DELETE ON invoice_items
+BEGIN
+    INSERT INTO product_daily_sales
+        (sale_date, product_id, quantity, taxable_amount, gst_amount, total_amount, cost_amount, line_count)
+    SELECT (SELECT invoice_date FROM invoices WHERE id = OLD.invoice_id),
+           OLD.product_id,
+           -OLD.quantity, -OLD.taxable_amount, -OLD.gst_amount, -OLD.total_amount,
+           -OLD.quantity * COALESCE(OLD.unit_cost, 0),
+           -1
+    WHERE OLD.product_id IS NOT NULL
+    ON CONFLICT (sale_date, product_id) DO UPDATE SET
+        quantity = quantity + excluded.quantity,
+        taxable_amount = taxable_amount + excluded.taxable_amount,
+        gst_amount = gst_amount + excluded.gst_amount,
+        total_amount = total_amount + excluded.total_amount,
+        cost_amount = cost_amount + excluded.cost_amount,
+        line_count = line_count + excluded.line_count;
+    INSERT INTO product_monthly_sales
+        (sale_month, product_id, quantity, taxable_amount, gst_amount, total_amount, cost_amount, line_count)
+    SELECT (SELECT substr(invoice_date, 1, 7) FROM invoices WHERE id = OLD.invoice_id),
+           OLD.product_id,
+           -OLD.quantity, -OLD.taxable_amount, -OLD.gst_amount, -OLD.total_amount,
+           -OLD.quantity * COALESCE(OLD.unit_cost, 0),
+           -1
+    WHERE OLD.product_id IS NOT NULL
+    ON CONFLICT (sale_month, product_id) DO UPDATE SET
+        quantity = quantity + excluded.quantity,
+        taxable_amount = taxable_amount + excluded.taxable_amount,
+        gst_amount = gst_amount + excluded.gst_amount,
+        total_amount = total_amount + excluded.total_amount,
+        cost_amount = cost_amount + excluded.cost_amount,
+        line_count = line_count + excluded.line_count;
+    DELETE FROM product_daily_sales
+    WHERE sale_date = (SELECT invoice_date FROM invoices WHERE id = OLD.invoice_id)
+      AND product_id = OLD.product_id AND line_count <= 0;
+    DELETE FROM product_monthly_sales
+    WHERE sale_month = (SELECT substr(invoice_date, 1, 7) FROM invoices WHERE id = OLD.invoice_id)
+      AND product_id = OLD.product_id AND line_count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_invoice_items_update_sales AFTER UPDATE ON invoice_items
+BEGIN
+    INSERT INTO product_daily_sales
+        (sale_date, product_id, quantity, taxable_amount, gst_amount, total_amount, cost_amount, line_count)
+    SELECT (SELECT invoice_date FROM invoices WHERE id = OLD.invoice_id),
+           OLD.product_id,
+           -OLD.quantity, -OLD.taxable_amount, -OLD.gst_amount, -OLD.total_amount,
+           -OLD.quantity * COALESCE(OLD.unit_cost, 0),
+           -1
+    WHERE OLD.product_id IS NOT NULL
+    ON CONFLICT (sale_date, product_id) DO UPDATE SET
+        quantity = quantity + excluded.quantity,
+        taxable_amount = taxable_amount + excluded.taxable_amount,
+        gst_amount = gst_amount + excluded.gst_amount,
+        total_amount = total_amount + excluded.total_amount,
+        cost_amount = cost_amount + excluded.cost_amount,
+        line_count = line_count + excluded.line_count;
+    INSERT INTO product_monthly_sales
+        (sale_month, product_id, quantity, taxable_amount, gst_amount, total_amount, cost_amount, line_count)
+    SELECT (SELECT substr(invoice_date, 1, 7) FROM invoices WHERE id = OLD.invoice_id),
+           OLD.product_id,
+           -OLD.quantity, -OLD.taxable_amount, -OLD.gst_amount, -OLD.total_amount,
+           -OLD.quantity * COALESCE(OLD.unit_cost, 0),
+           -1
+    WHERE OLD.product_id IS NOT NULL
+    ON CONFLICT (sale_month, product_id) DO UPDATE SET
+        quantity = quantity + excluded.quantity,
+        taxable_amount = taxable_amount + excluded.taxable_amount,
+        gst_amount = gst_amount + excluded.gst_amount,
+        total_amount = total_amount + excluded.total_amount,
+        cost_amount = cost_amount + excluded.cost_amount,
+        line_count = line_count + excluded.line_count;
+    INSERT INTO product_daily_sales
+        (sale_date, product_id, quantity, taxable_amount, gst_amount, total_amount, cost_amount, line_count)
+    SELECT (SELECT invoice_date FROM invoices WHERE id = NEW.invoice_id),
+           NEW.product_id,
+           NEW.quantity, NEW.taxable_amount, NEW.gst_amount, NEW.total_amount,
+           NEW.quantity * COALESCE(NEW.unit_cost, 0),
+           1
+    WHERE NEW.product_id IS NOT NULL
+    ON CONFLICT (sale_date, product_id) DO UPDATE SET
+        quantity = quantity + excluded.quantity,
+        taxable_amount = taxable_amount + excluded.taxable_amount,
+        gst_amount = gst_amount + excluded.gst_amount,
+        total_amount = total_amount + excluded.total_amount,
+        cost_amount = cost_amount + excluded.cost_amount,
+        line_count = line_count + excluded.line_count;
+    INSERT INTO product_monthly_sales
+        (sale_month, product_id, quantity, taxable_amount, gst_amount, total_amount, cost_amount, line_count)
+    SELECT (SELECT substr(invoice_date, 1, 7) FROM invoices WHERE id = NEW.invoice_id),
+           NEW.product_id,
+           NEW.quantity, NEW.taxable_amount, NEW.gst_amount, NEW.total_amount,
+           NEW.quantity * COALESCE(NEW.unit_cost, 0),
+           1
+    WHERE NEW.product_id IS NOT NULL
+    ON CONFLICT (sale_month, product_id) DO UPDATE SET
+        quantity = quantity + excluded.quantity,
+        taxable_amount = taxable_amount + excluded.taxable_amount,
+        gst_amount = gst_amount + excluded.gst_amount,
+        total_amount = total_amount + excluded.total_amount,
+        cost_amount = cost_amount + excluded.cost_amount,
+        line_count = line_count + excluded.line_count;
+    DELETE FROM product_daily_sales
+    WHERE sale_date = (SELECT invoice_date FROM invoices WHERE id = OLD.invoice_id)
+      AND product_id = OLD.product_id AND line_count <= 0;
+    DELETE FROM product_monthly_sales
+    WHERE sale_month = (SELECT substr(invoice_date, 1, 7) FROM invoices WHERE id = OLD.invoice_id)
+      AND product_id = OLD.product_id AND line_count <= 0;
+END;
+
+-- Redating an invoice moves its lines to the rollup rows of the new date
+CREATE TRIGGER IF NOT EXISTS trg_invoices_date_sales AFTER UPDATE OF invoice_date ON invoices
+WHEN OLD.invoice_date IS NOT NEW.invoice_date
+BEGIN
+    INSERT INTO product_daily_sales
+        (sale_date, product_id, quantity, taxable_amount, gst_amount, total_amount, cost_amount, line_count)
+    SELECT OLD.invoice_date, product_id,
+           -SUM(quantity), -SUM(taxable_amount), -SUM(gst_amount), -SUM(total_amount),
+           -SUM(quantity * COALESCE(unit_cost, 0)),
+           -COUNT(*)
+    FROM invoice_items
+    WHERE invoice_id = NEW.id AND product_id IS NOT NULL
+    GROUP BY product_id
+    ON CONFLICT (sale_date, product_id) DO UPDATE SET
+        quantity = quantity + excluded.quantity,
+        taxable_amount = taxable_amount + excluded.taxable_amount,
+        gst_amount = gst_amount + excluded.gst_amount,
+        total_amount = total_amount + excluded.total_amount,
+        cost_amount = cost_amount + excluded.cost_amount,
+        line_count = line_count + excluded.line_count;
+    INSERT INTO product_monthly_sales
+        (sale_month, product_id, quantity, taxable_amount, gst_amount, total_amount, cost_amount, line_count)
+    SELECT substr(OLD.invoice_date, 1, 7), product_id,
+           -SUM(quantity), -SUM(taxable_amount), -SUM(gst_amount), -SUM(total_amount),
+           -SUM(quantity * COALESCE(unit_cost, 0)),
+           -COUNT(*)
+    FROM invoice_items
+    WHERE invoice_id = NEW.id AND product_id IS NOT NULL
+    GROUP BY product_id
+    ON CONFLICT (sale_month, product_id) DO UPDATE SET
+        quantity = quantity + excluded.quantity,
+        taxable_amount = taxable_amount + excluded.taxable_amount,
+        gst_amount = gst_amount + excluded.gst_amount,
+        total_amount = total_amount + excluded.total_amount,
+        cost_amount = cost_amount + excluded.cost_amount,
+        line_count = line_count + excluded.line_count;
+    INSERT INTO product_daily_sales
+        (sale_date, product_id, quantity, taxable_amount, gst_amount, total_amount, cost_amount, line_count)
+    SELECT NEW.invoice_date, product_id,
+           SUM(quantity), SUM(taxable_amount), SUM(gst_amount), SUM(total_amount),
+           SUM(quantity * COALESCE(unit_cost, 0)),
+           COUNT(*)
+    FROM invoice_items
+    WHERE invoice_id = NEW.id AND product_id IS NOT NULL
+    GROUP BY product_id
+    ON CONFLICT (sale_date, product_id) DO UPDATE SET
+        quantity = quantity + excluded.quantity,
+        taxable_amount = taxable_amount + excluded.taxable_amount,
+        gst_amount = gst_amount + excluded.gst_amount,
+        total_amount = total_amount + excluded.total_amount,
+        cost_amount = cost_amount + excluded.cost_amount,
+        line_count = line_count + excluded.line_count;
+    INSERT INTO product_monthly_sales
+        (sale_month, product_id, quantity, taxable_amount, gst_amount, total_amount, cost_amount, line_count)
+    SELECT substr(NEW.invoice_date, 1, 7), product_id,
+           SUM(quantity), SUM(taxable_amount), SUM(gst_amount), SUM(total_amount),
+           SUM(quantity * COALESCE(unit_cost, 0)),
+           COUNT(*)
+    FROM invoice_items
+    WHERE invoice_id = NEW.id AND product_id IS NOT NULL
+    GROUP BY product_id
+    ON CONFLICT (sale_month, product_id) DO UPDATE SET
+        quantity = quantity + excluded.quantity,
+        taxable_amount = taxable_amount + excluded.taxable_amount,
+        gst_amount = gst_amount + excluded.gst_amount,
+        total_amount = total_amount + excluded.total_amount,
+        cost_amount = cost_amount + excluded.cost_amount,
+        line_count = line_count + excluded.line_count;
+    DELETE FROM product_daily_sales
+    WHERE sale_date = OLD.invoice_date AND line_count <= 0
+      AND product_id IN (SELECT product_id FROM invoice_items WHERE invoice_id = NEW.id);
+    DELETE FROM product_monthly_sales
+    WHERE sale_month = substr(OLD.invoice_date, 1, 7) AND line_count <= 0
+      AND product_id IN (SELECT product_id FROM invoice_items WHERE invoice_id = NEW.id);
+END;
+
+-- GST monthly summary; unlike the product rollups every line counts, with or without a product
+CREATE TRIGGER IF NOT EXISTS trg_invoice_items_insert_gst AFTER INSERT ON invoice_items
+BEGIN
+    INSERT INTO gst_monthly_summary
+        (tax_month, gst_rate, taxable_amount, gst_amount, total_amount, line_count)
+    SELECT substr(invoice_date, 1, 7),
+           COALESCE(NEW.gst_rate, 0),
+           NEW.taxable_amount, COALESCE(NEW.gst_amount, 0), NEW.total_amount, 1
+    FROM invoices WHERE id = NEW.invoice_id
+    ON CONFLICT (tax_month, gst_rate) DO UPDATE SET
+        taxable_amount = taxable_amount + excluded.taxable_amount,
+        gst_amount = gst_amount + excluded.gst_amount,
+        total_amount = total_amount + excluded.total_amount,
+        line_count = line_count + excluded.line_count;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_invoice_items_delete_gst AFTER DELETE ON invoice_items
+BEGIN
+    INSERT INTO gst_monthly_summary
+        (tax_month, gst_rate, taxable_amount, gst_amount, total_amount, line_count)
+    SELECT substr(invoice_date, 1, 7),
+           COALESCE(OLD.gst_rate, 0),
+           -OLD.taxable_amount, -COALESCE(OLD.gst_amount, 0), -OLD.total_amount, -1
+    FROM invoices WHERE id = OLD.invoice_id
+    ON CONFLICT (tax_month, gst_rate) DO UPDATE SET
+        taxable_amount = taxable_amount + excluded.taxable_amount,
+        gst_amount = gst_amount + excluded.gst_amount,
+        total_amount = total_amount + excluded.total_amount,
+        line_count = line_count + excluded.line_count;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_invoice_items_update_gst AFTER UPDATE ON invoice_items
+BEGIN
+    INSERT INTO gst_monthly_summary
+        (tax_month, gst_rate, taxable_amount, gst_amount, total_amount, line_count)
+    SELECT substr(invoice_date, 1, 7),
+           COALESCE(OLD.gst_rate, 0),
+           -OLD.taxable_amount, -COALESCE(OLD.gst_amount, 0), -OLD.total_amount, -1
+    FROM invoices WHERE id = OLD.invoice_id
+    ON CONFLICT (tax_month, gst_rate) DO UPDATE SET
+        taxable_amount = taxable_amount + excluded.taxable_amount,
+        gst_amount = gst_amount + excluded.gst_amount,
+        total_amount = total_amount + excluded.total_amount,
+        line_count = line_count + excluded.line_count;
+    INSERT INTO gst_monthly_summary
+        (tax_month, gst_rate, taxable_amount, gst_amount, total_amount, line_count)
+    SELECT substr(invoice_date, 1, 7),
+           COALESCE(NEW.gst_rate, 0),
+           NEW.taxable_amount, COALESCE(NEW.gst_amount, 0), NEW.total_amount, 1
+    FROM invoices WHERE id = NEW.invoice_id
+    ON CONFLICT (tax_month, gst_rate) DO UPDATE SET
+        taxable_amount = taxable_amount + excluded.taxable_amount,
+        gst_amount = gst_amount + excluded.gst_amount,
+        total_amount = total_amount + excluded.total_amount,
+        line_count = line_count + excluded.line_count;
+END;
+
+-- A redated invoice moves its lines between months; a change within the month leaves the summary alone
+CREATE TRIGGER IF NOT EXISTS trg_invoices_date_gst AFTER UPDATE OF invoice_date ON invoices
+WHEN substr(OLD.invoice_date, 1, 7) IS NOT substr(NEW.invoice_date, 1, 7)
+BEGIN
+    INSERT INTO gst_monthly_summary
+        (tax_month, gst_rate, taxable_amount, gst_amount, total_amount, line_count)
+    SELECT substr(OLD.invoice_date, 1, 7), COALESCE(gst_rate, 0),
+           -SUM(taxable_amount), -SUM(COALESCE(gst_amount, 0)), -SUM(total_amount), -COUNT(*)
+    FROM invoice_items
+    WHERE invoice_id = NEW.id
+    GROUP BY COALESCE(gst_rate, 0)
+    ON CONFLICT (tax_month, gst_rate) DO UPDATE SET
+        taxable_amount = taxable_amount + excluded.taxable_amount,
+        gst_amount = gst_amount + excluded.gst_amount,
+        total_amount = total_amount + excluded.total_amount,
+        line_count = line_count + excluded.line_count;
+    INSERT INTO gst_monthly_summary
+        (tax_month, gst_rate, taxable_amount, gst_amount, total_amount, line_count)
+    SELECT substr(NEW.invoice_date, 1, 7), COALESCE(gst_rate, 0),
+           SUM(taxable_amount), SUM(COALESCE(gst_amount, 0)), SUM(total_amount), COUNT(*)
+    FROM invoice_items
+    WHERE invoice_id = NEW.id
+    GROUP BY COALESCE(gst_rate, 0)
+    ON CONFLICT (tax_month, gst_rate) DO UPDATE SET
+        taxable_amount = taxable_amount + excluded.taxable_amount,
+        gst_amount = gst_amount + excluded.gst_amount,
+        total_amount = total_amount + excluded.total_amount,
+        line_count = line_count + excluded.line_count;
+    DELETE FROM gst_monthly_summary
+    WHERE tax_month = substr(OLD.invoice_date, 1, 7) AND line_count <= 0
+      AND gst_rate IN (SELECT COALESCE(gst_rate, 0) FROM invoice_items WHERE invoice_id = NEW.id);
+END;
 
 -- Insert default admin user (password: admin123)
 INSERT OR IGNORE INTO users (username, password_hash, full_name, role)
@@ -4,6 +4,7 @@ Desktop Billing & Inventory Management System
 """
 import sys
 import os
+import multiprocessing
 from PyQt6.QtWidgets import QApplication, QSplashScreen
 from PyQt6.QtGui import QPixmap, QIcon
 from PyQt6.QtCore import Qt, QTimer
@@ -59,5 +60,7 @@ class BillingApp:
 
 
 if __name__ == "__main__":
+    # Batch invoice export uses worker processes; required for frozen builds
+    multiprocessing.freeze_support()
     app = BillingApp()
     sys.exit(app.run())
@@ -15,7 +15,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/mukula27/desktop-billing-inventory",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks"]),
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: End Users/Desktop",
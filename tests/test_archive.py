@@ -0,0 +1,120 @@
+"""
+Financial year archive tests
+
+Archiving a closed year moves its settled invoices and its stock
+transactions into an archive file. Lookups and reports must read the
+same before and after, and again once a backup has been restored.
+"""
+import pytest
+
+from database.db_manager import DatabaseManager
+
+YEAR = 2023
+YEAR_START, YEAR_END = DatabaseManager.financial_year_bounds(YEAR)
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'shop.db'))
+    yield manager
+    manager.close()
+
+
+def add_product(db, code):
+    return db.execute_update(
+        """INSERT INTO products (product_code, product_name, unit, purchase_price, selling_price,
+                                 opening_stock, current_stock)
+           VALUES (?, ?, 'PCS', 60, 100, 50, 50)""",
+        (code, f"Product {code}")
+    )
+
+
+def sell(db, customer_id, invoice_date, product_id, quantity, paid):
+    """One-line invoice, with its stock transaction dated like the invoice"""
+    total = quantity * 100.0
+    invoice_id, _ = db.create_invoice(
+        {'customer_id': customer_id, 'customer_name': 'Mehta Traders', 'invoice_date': invoice_date,
+         'invoice_time': '11:00:00', 'subtotal': total, 'tax_amount': 0, 'grand_total': total,
+         'rounded_total': total},
+        [{'product_id': product_id, 'product_code': str(product_id), 'product_name': 'Item',
+          'quantity': quantity, 'unit_price': 100.0, 'taxable_amount': total, 'total_amount': total}]
+    )
+    assert invoice_id > 0
+    db.execute_update("UPDATE stock_transactions SET transaction_date = ? WHERE reference_id = ?",
+                      (invoice_date, invoice_id))
+    if paid:
+        db.add_payment({'invoice_id': invoice_id, 'amount': paid, 'payment_mode': 'cash',
+                        'payment_date': invoice_date, 'payment_time': '12:00:00'})
+    return invoice_id
+
+
+def purchase(db, product_id, quantity, transaction_date):
+    db.execute_update(
+        """INSERT INTO stock_transactions (product_id, transaction_type, quantity, transaction_date)
+           VALUES (?, 'purchase', ?, ?)""",
+        (product_id, quantity, transaction_date)
+    )
+
+
+@pytest.fixture
+def shop(db):
+    """Two financial years of sales and purchases; returns (settled, open) invoice ids of YEAR"""
+    customer_id = db.add_customer({'customer_name': 'Mehta Traders', 'phone': '9822012345'})
+    wire, bulb = add_product(db, 'WIRE'), add_product(db, 'BULB')
+    settled, still_open = [], []
+    for month, day in ((5, 3), (8, 17), (11, 30), (2, 14)):
+        year = YEAR if month >= 4 else YEAR + 1
+        invoice_date = f"{year}-{month:02d}-{day:02d}"
+        settled.append(sell(db, customer_id, invoice_date, wire, 2, 200.0))
+        still_open.append(sell(db, customer_id, invoice_date, bulb, 3, 100.0 if month == 8 else 0))
+        purchase(db, bulb, 5, invoice_date)
+    db.write_stock_snapshot(f"{YEAR}-09-30")
+    for invoice_date in ('2024-06-10', '2025-01-20'):
+        sell(db, customer_id, invoice_date, wire, 1, 100.0)
+        purchase(db, wire, 4, invoice_date)
+    return settled, still_open
+
+
+def by_id(rows, key='id'):
+    return sorted(rows, key=lambda row: row[key])
+
+
+def reads(db, invoice_ids):
+    """Everything that must not change when a year is archived"""
+    return {
+        'search': by_id(db.search_invoices()),
+        'search_range': by_id(db.search_invoices(start_date='2023-07-01', end_date='2024-06-30')),
+        'search_term': by_id(db.search_invoices(search_term='Mehta', payment_status='paid')),
+        'by_id': [db.get_invoice_by_id(invoice_id) for invoice_id in invoice_ids],
+        'movement': [db.get_stock_movement(start, end) for start, end in (
+            (YEAR_START, YEAR_END), ('2023-10-01', '2024-06-30'), ('2024-04-01', '2025-03-31'))],
+        'as_of': [by_id(db.get_stock_as_of(day), 'product_id') for day in (
+            '2023-06-30', '2023-12-31', YEAR_END, '2024-08-01', None)],
+        'statements': sorted(db.iter_statement_entries(),
+                             key=lambda row: (row['entry_type'], row['invoice_id'])),
+    }
+
+
+def test_archive_round_trip(db, shop, tmp_path):
+    settled, still_open = shop
+    invoice_ids = [row['id'] for row in db.execute_query("SELECT id FROM invoices")]
+    before = reads(db, invoice_ids)
+
+    assert YEAR in db.get_archivable_years()
+    moved = db.archive_financial_year(YEAR)
+    assert moved['invoices'] == len(settled)
+
+    live = {row['id'] for row in db.execute_query("SELECT id FROM main.invoices")}
+    assert live.isdisjoint(settled)
+    assert live.issuperset(still_open)
+    paid_live = {row['invoice_id'] for row in db.execute_query("SELECT invoice_id FROM main.payments")}
+    assert paid_live.isdisjoint(settled)
+    assert not db.execute_query(
+        "SELECT 1 FROM main.stock_transactions WHERE transaction_date BETWEEN ? AND ?", (YEAR_START, YEAR_END))
+    assert reads(db, invoice_ids) == before
+
+    backup_path = str(tmp_path / 'backup.db')
+    assert db.backup_database(backup_path)
+    assert db.restore_database(backup_path)
+    assert db._history('invoices') == 'invoices_all'
+    assert reads(db, invoice_ids) == before
@@ -0,0 +1,58 @@
+"""
+Pattern engine tests
+
+A pack scanned as one combined alternation must find the same matches as
+the same pack scanned pattern by pattern, when each line matches only one
+of its patterns.
+"""
+import pytest
+
+from utils.pattern_engine import PatternEngine, PRICE
+
+PACK = [
+    # Named groups of its own, as a supplier pack might write them
+    r'ITEM\s+(?P<code>\S+)\s+(?P<name>.+?)\s+' + PRICE + r'$',
+    # Plain groups
+    r'^SKU:(\S+)\s+(.+?)\s+' + PRICE + r'$',
+    # A backreference to a named group; the marker is captured as the code
+    r'^(?P<tag>\*+)\s*([A-Za-z][A-Za-z ]+?)\s*(?P=tag)\s+' + PRICE,
+]
+
+TEXT = "\n".join([
+    "ITEM AC-100 Copper Wire 1.5mm Rs. 1,250.00",
+    "SKU:MCB-32 Miniature Breaker 32A 415",
+    "** LED Bulb Nine Watt ** ₹95.50",
+    "ITEM PVC-20 Conduit Pipe 20mm 64.00",
+    "nothing to see here",
+])
+
+
+@pytest.fixture
+def engines():
+    PatternEngine.register_pack('test_combined', PACK, combine=True)
+    PatternEngine.register_pack('test_sequential', PACK)
+    yield PatternEngine.get('test_combined'), PatternEngine.get('test_sequential')
+    for name in ('test_combined', 'test_sequential'):
+        PatternEngine._pack_sources.pop(name, None)
+        PatternEngine._engines.pop(name, None)
+
+
+def test_combined_matches_sequential(engines):
+    combined, sequential = engines
+    expected = [
+        ('AC-100', 'Copper Wire 1.5mm', '1,250.00'),
+        ('MCB-32', 'Miniature Breaker 32A', '415'),
+        ('PVC-20', 'Conduit Pipe 20mm', '64.00'),
+        ('**', 'LED Bulb Nine Watt', '95.50'),
+    ]
+    assert sorted(combined.scan(TEXT)) == sorted(sequential.scan(TEXT)) == sorted(expected)
+
+
+def test_default_pack_scans():
+    matches = list(PatternEngine.get().scan("ABC-123 | Solar Panel Mono | Rs. 9,999.00"))
+    assert ('ABC-123', 'Solar Panel Mono', '9,999.00') in matches
+
+
+def test_register_pack_rejects_wrong_group_count():
+    with pytest.raises(ValueError):
+        PatternEngine.register_pack('test_bad', [r'(\S+) only one group'])
@@ -0,0 +1,81 @@
+"""
+Receipt renderer golden tests
+
+A fixed invoice is rendered at both paper widths and compared byte for
+byte with the files in tests/golden. After an intended layout change,
+regenerate them from the project root with:
+    python -m tests.test_receipt_renderer
+"""
+import os
+
+import pytest
+
+from utils.receipt_renderer import ReceiptRenderer
+
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), 'golden')
+
+COMPANY = {
+    'company_name': 'Sharma General Store',
+    'address': '12 Station Road, Near Clock Tower, Pune 411001',
+    'phone': '+91-9876543210',
+    'gstin': '27ABCDE1234F1Z5',
+}
+
+INVOICE = {
+    'invoice_number': 'INV00042',
+    'invoice_date': '2026-04-01',
+    'invoice_time': '10:15:42',
+    'customer_name': 'Walk-in Customer',
+    'customer_phone': '9812345678',
+    'subtotal': 1250.0,
+    'discount_amount': 50.0,
+    'tax_amount': 144.0,
+    'grand_total': 1344.0,
+    'rounded_total': 1344.0,
+    'amount_paid': 1400.0,
+    'balance_amount': -56.0,
+}
+
+ITEMS = [
+    {'product_name': 'Basmati Rice Premium Long Grain 5kg Bag', 'quantity': 1, 'unit': 'BAG',
+     'unit_price': 650.0, 'gst_rate': 5, 'total_amount': 682.5},
+    {'product_name': 'Notebook', 'quantity': 12, 'unit': 'PCS',
+     'unit_price': 45.0, 'gst_rate': 18, 'total_amount': 637.2},
+    {'product_name': 'Loose Sugar', 'quantity': 0.5, 'unit': 'KG',
+     'unit_price': 50.0, 'gst_rate': 0, 'total_amount': 25.0},
+]
+
+GOLDENS = {
+    'receipt_58mm.bin': lambda: ReceiptRenderer(COMPANY, '58mm').render_escpos(INVOICE, ITEMS),
+    'receipt_80mm.bin': lambda: ReceiptRenderer(COMPANY, '80mm').render_escpos(INVOICE, ITEMS),
+    'receipt_80mm.txt': lambda: ReceiptRenderer(COMPANY, '80mm').render_text(INVOICE, ITEMS).encode('utf-8'),
+}
+
+
+def read_golden(name: str) -> bytes:
+    with open(os.path.join(GOLDEN_DIR, name), 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('name', sorted(GOLDENS))
+def test_matches_golden(name):
+    assert GOLDENS[name]() == read_golden(name)
+
+
+def test_null_amounts_are_skipped():
+    invoice = dict(INVOICE, discount_amount=None, tax_amount=None, amount_paid=None)
+    text = ReceiptRenderer(COMPANY, '58mm').render_text(invoice, ITEMS)
+    assert 'Discount' not in text and 'GST ' not in text and 'Paid' not in text
+
+
+def test_unsupported_paper():
+    with pytest.raises(ValueError):
+        ReceiptRenderer(COMPANY, '110mm')
+
+
+if __name__ == "__main__":
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    for name, render in GOLDENS.items():
+        with open(os.path.join(GOLDEN_DIR, name), 'wb') as f:
+            f.write(render())
+        print(f"Wrote {name}")
@@ -0,0 +1,166 @@
+"""
+Sales rollup tests
+
+The triggers on invoices and invoice_items keep product_daily_sales,
+product_monthly_sales and gst_monthly_summary current. After every edit
+the tables must hold what a rebuild from invoice_items would write.
+"""
+import pytest
+
+from database.db_manager import DatabaseManager
+
+ROLLUPS = {
+    'product_daily_sales': 'sale_date, product_id',
+    'product_monthly_sales': 'sale_month, product_id',
+    'gst_monthly_summary': 'tax_month, gst_rate',
+}
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'shop.db'))
+    yield manager
+    manager.close()
+
+
+def add_product(db, code, purchase_price, selling_price):
+    return db.execute_update(
+        """INSERT INTO products (product_code, product_name, unit, purchase_price, selling_price,
+                                 opening_stock, current_stock)
+           VALUES (?, ?, 'PCS', ?, ?, 100, 100)""",
+        (code, f"Product {code}", purchase_price, selling_price)
+    )
+
+
+def sell(db, invoice_date, lines):
+    """Bill (product_id, quantity, unit_price, gst_rate) lines on one invoice"""
+    items = []
+    for product_id, quantity, unit_price, gst_rate in lines:
+        taxable = quantity * unit_price
+        gst = round(taxable * gst_rate / 100, 2)
+        items.append({'product_id': product_id, 'product_code': str(product_id), 'product_name': 'Item',
+                      'quantity': quantity, 'unit_price': unit_price, 'taxable_amount': taxable,
+                      'gst_rate': gst_rate, 'gst_amount': gst, 'total_amount': taxable + gst})
+    subtotal = sum(item['taxable_amount'] for item in items)
+    total = sum(item['total_amount'] for item in items)
+    invoice_id, _ = db.create_invoice({'customer_name': 'Walk-in Customer', 'invoice_date': invoice_date,
+                                       'subtotal': subtotal, 'tax_amount': total - subtotal,
+                                       'grand_total': total, 'rounded_total': total}, items)
+    assert invoice_id > 0
+    return invoice_id
+
+
+def rollup(db, table):
+    return db.execute_query(f"SELECT * FROM {table} ORDER BY {ROLLUPS[table]}")
+
+
+def assert_matches_rebuild(db):
+    """The trigger-maintained rollups equal a rebuild, ignoring rows emptied by deletes"""
+    kept = {table: [row for row in rollup(db, table) if row['line_count'] > 0] for table in ROLLUPS}
+    db.rebuild_product_daily_sales()
+    db.rebuild_gst_monthly_summary()
+    for table in ROLLUPS:
+        assert kept[table] == rollup(db, table), table
+
+
+def daily(db, product_id):
+    return db.execute_query(
+        """SELECT sale_date, quantity, taxable_amount, cost_amount, line_count
+           FROM product_daily_sales WHERE product_id = ? ORDER BY sale_date""", (product_id,))
+
+
+def test_item_insert_edit_delete(db):
+    wire = add_product(db, 'WIRE', 60, 100)
+    bulb = add_product(db, 'BULB', 30, 50)
+    invoice_id = sell(db, '2026-01-10', [(wire, 1, 100, 18), (bulb, 2, 50, 12)])
+    assert daily(db, wire) == [{'sale_date': '2026-01-10', 'quantity': 1, 'taxable_amount': 100,
+                                'cost_amount': 60, 'line_count': 1}]
+    assert_matches_rebuild(db)
+
+    # Lines keep the cost they were billed at when the purchase price changes later
+    db.bulk_update_prices([{'product_id': bulb, 'purchase_price': 45}])
+    db.execute_update("UPDATE invoice_items SET quantity = 3, taxable_amount = 150 WHERE product_id = ?", (bulb,))
+    assert daily(db, bulb) == [{'sale_date': '2026-01-10', 'quantity': 3, 'taxable_amount': 150,
+                                'cost_amount': 90, 'line_count': 1}]
+    assert_matches_rebuild(db)
+
+    db.execute_update("DELETE FROM invoice_items WHERE invoice_id = ? AND product_id = ?", (invoice_id, wire))
+    assert daily(db, wire) == []
+    assert not db.execute_query("SELECT 1 FROM product_monthly_sales WHERE product_id = ?", (wire,))
+    assert_matches_rebuild(db)
+
+
+def test_redating_an_invoice_moves_its_sales(db):
+    wire = add_product(db, 'WIRE', 60, 100)
+    sell(db, '2026-01-05', [(wire, 1, 100, 18)])
+    invoice_id = sell(db, '2026-01-31', [(wire, 2, 100, 18)])
+
+    db.execute_update("UPDATE invoices SET invoice_date = '2026-02-01' WHERE id = ?", (invoice_id,))
+    assert [(row['sale_date'], row['quantity']) for row in daily(db, wire)] == [('2026-01-05', 1),
+                                                                                 ('2026-02-01', 2)]
+    months = db.execute_query("SELECT sale_month, quantity FROM product_monthly_sales ORDER BY sale_month")
+    assert months == [{'sale_month': '2026-01', 'quantity': 1}, {'sale_month': '2026-02', 'quantity': 2}]
+    assert_matches_rebuild(db)
+
+
+def test_redating_an_invoice_moves_its_gst(db):
+    wire = add_product(db, 'WIRE', 60, 100)
+    bulb = add_product(db, 'BULB', 30, 50)
+    sell(db, '2026-01-05', [(wire, 1, 100, 18)])
+    invoice_id = sell(db, '2026-01-31', [(wire, 2, 100, 18), (bulb, 2, 50, 5), (bulb, 1, 50, 5)])
+
+    db.execute_update("UPDATE invoices SET invoice_date = '2026-02-01' WHERE id = ?", (invoice_id,))
+    summary = [(row['tax_month'], row['gst_rate'], row['taxable_amount'], row['line_count'])
+               for row in db.get_gst_summary('2026-01-01', '2026-02-28')]
+    assert summary == [('2026-01', 18, 100, 1), ('2026-02', 5, 150, 2), ('2026-02', 18, 200, 1)]
+    assert_matches_rebuild(db)
+
+    # Moving within the month leaves the summary as it is
+    db.execute_update("UPDATE invoices SET invoice_date = '2026-02-14' WHERE id = ?", (invoice_id,))
+    assert_matches_rebuild(db)
+
+
+@pytest.mark.parametrize('start_date, end_date', [
+    ('2026-01-20', '2026-03-10'),
+    ('2026-02-01', '2026-02-28'),
+    ('2026-01-01', '2026-03-31'),
+    ('2026-02-11', '2026-02-20'),
+    ('', ''),
+])
+def test_product_sales_over_partial_months(db, start_date, end_date):
+    wire = add_product(db, 'WIRE', 60, 100)
+    sales = {'2026-01-15': 1, '2026-02-10': 2, '2026-02-28': 4, '2026-03-05': 8, '2026-03-20': 16}
+    for sale_date, quantity in sales.items():
+        sell(db, sale_date, [(wire, quantity, 100, 18)])
+
+    expected = sum(quantity for sale_date, quantity in sales.items()
+                   if (start_date or '0001') <= sale_date <= (end_date or '9999'))
+    rows = db.get_product_sales(start_date, end_date)
+    if not expected:
+        assert rows == []
+        return
+    assert len(rows) == 1
+    assert rows[0]['quantity'] == expected
+    assert rows[0]['revenue'] == expected * 100
+    assert rows[0]['margin'] == expected * 40
+
+
+def test_backfill_of_a_database_without_rollups(tmp_path):
+    path = str(tmp_path / 'shop.db')
+    db = DatabaseManager(path)
+    wire = add_product(db, 'WIRE', 60, 100)
+    bulb = add_product(db, 'BULB', 30, 50)
+    sell(db, '2025-12-30', [(wire, 1, 100, 18), (bulb, 4, 50, 5)])
+    sell(db, '2026-01-02', [(bulb, 2, 50, 5)])
+    expected = {table: rollup(db, table) for table in ROLLUPS}
+
+    # A database from before the rollups has the tables (schema.sql creates them) but no rows
+    for table in ROLLUPS:
+        db.execute_update(f"DELETE FROM {table}")
+    db.close()
+
+    db = DatabaseManager(path)
+    try:
+        assert {table: rollup(db, table) for table in ROLLUPS} == expected
+    finally:
+        db.close()
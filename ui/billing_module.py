@@ -5,11 +5,25 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QLineEdit, QTableWidget, QTableWidgetItem,
                              QHeaderView, QDialog, QFormLayout, QComboBox, 
                              QDoubleSpinBox, QMessageBox, QTextEdit, QFrame,
-                             QSpinBox, QDateEdit, QGroupBox, QGridLayout, QScrollArea)
-from PyQt6.QtCore import Qt, QDate
+                             QSpinBox, QDateEdit, QGroupBox, QGridLayout, QScrollArea,
+                             QProgressBar, QFileDialog)
+from PyQt6.QtCore import Qt, QDate, QObject, QThread, pyqtSignal
 from PyQt6.QtGui import QColor
 from datetime import datetime
-from utils.pdf_generator import PDFGenerator
+import os
+from utils.print_queue import InvoicePrintQueue
+from utils.batch_invoice_export import BatchInvoiceExporter
+from utils.receipt_renderer import ReceiptRenderer
+
+# Thermal printer device or share (e.g. /dev/usb/lp0, \\SHOP-PC\POS80); empty writes to receipts/
+RECEIPT_PRINTER = os.environ.get("BILLING_RECEIPT_PRINTER", "")
+RECEIPT_PAPER = os.environ.get("BILLING_RECEIPT_PAPER", "80mm")
+
+STATUS_FILTERS = {
+    "Paid": "paid",
+    "Unpaid": "unpaid",
+    "Partially Paid": "partially_paid"
+}
 
 
 class ProductSelectionDialog(QDialog):
@@ -232,13 +246,222 @@ class ProductSelectionDialog(QDialog):
         self.accept()
 
 
+class BatchExportThread(QThread):
+    """Prefetch and render a batch of invoices without blocking the UI"""
+    progress = pyqtSignal(int, str)
+    finished = pyqtSignal(dict)
+    error = pyqtSignal(str)
+    
+    def __init__(self, db_path, filters, output_dir=None, merged_path=None):
+        super().__init__()
+        self.db_path = db_path
+        self.filters = filters
+        self.output_dir = output_dir
+        self.merged_path = merged_path
+    
+    def run(self):
+        """Run batch export in background"""
+        from database.db_manager import DatabaseManager
+        
+        try:
+            self.progress.emit(0, "Loading invoices...")
+            
+            # SQLite connections are bound to the thread that opened them
+            db = DatabaseManager(self.db_path)
+            try:
+                invoices = db.get_invoices_with_items(**self.filters)
+                company = db.get_company_settings()
+            finally:
+                db.close()
+            
+            if not invoices:
+                self.error.emit("No invoices match the selected filters")
+                return
+            
+            def on_progress(done, total, invoice_number):
+                self.progress.emit(int(done * 100 / total), f"Rendered {invoice_number} ({done} of {total})")
+            
+            result = BatchInvoiceExporter(company).export(
+                invoices, output_dir=self.output_dir, merged_path=self.merged_path,
+                progress=on_progress, is_cancelled=self.isInterruptionRequested
+            )
+            self.finished.emit(result)
+        
+        except Exception as e:
+            self.error.emit(f"Error: {str(e)}")
+
+
+class BatchExportDialog(QDialog):
+    """Re-render invoice PDFs for a date range into a folder or one merged PDF"""
+    def __init__(self, db_manager, search_term="", status="All Status", parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.export_thread = None
+        self.init_ui(search_term, status)
+    
+    def init_ui(self, search_term, status):
+        """Initialize dialog UI"""
+        self.setWindowTitle("Batch Export Invoices")
+        self.setModal(True)
+        self.setMinimumWidth(450)
+        
+        layout = QVBoxLayout()
+        form = QFormLayout()
+        
+        today = QDate.currentDate()
+        self.from_date = QDateEdit(QDate(today.year(), today.month(), 1))
+        self.from_date.setCalendarPopup(True)
+        form.addRow("From:", self.from_date)
+        
+        self.to_date = QDateEdit(today)
+        self.to_date.setCalendarPopup(True)
+        form.addRow("To:", self.to_date)
+        
+        self.search_input = QLineEdit(search_term)
+        self.search_input.setPlaceholderText("Invoice number or customer (optional)")
+        form.addRow("Search:", self.search_input)
+        
+        self.status_combo = QComboBox()
+        self.status_combo.addItems(["All Status"] + list(STATUS_FILTERS))
+        self.status_combo.setCurrentText(status)
+        form.addRow("Status:", self.status_combo)
+        
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(["Separate PDFs in a folder", "One merged PDF"])
+        form.addRow("Output:", self.mode_combo)
+        
+        layout.addLayout(form)
+        
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+        
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        layout.addWidget(self.progress_bar)
+        
+        # Buttons
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.cancel_export)
+        button_layout.addWidget(self.cancel_btn)
+        
+        self.export_btn = QPushButton("📦 Export")
+        self.export_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #27ae60;
+                color: white;
+                padding: 8px 20px;
+                border-radius: 5px;
+                font-weight: bold;
+            }
+        """)
+        self.export_btn.clicked.connect(self.start_export)
+        button_layout.addWidget(self.export_btn)
+        
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+    
+    def start_export(self):
+        """Ask for the destination and start rendering"""
+        start = self.from_date.date().toString("yyyy-MM-dd")
+        end = self.to_date.date().toString("yyyy-MM-dd")
+        
+        output_dir = merged_path = None
+        if self.mode_combo.currentIndex() == 0:
+            output_dir = QFileDialog.getExistingDirectory(self, "Select Output Folder")
+            if not output_dir:
+                return
+        else:
+            merged_path, _ = QFileDialog.getSaveFileName(
+                self, "Save Merged PDF", f"invoices_{start}_to_{end}.pdf", "PDF Files (*.pdf)"
+            )
+            if not merged_path:
+                return
+        
+        filters = {
+            'search_term': self.search_input.text().strip(),
+            'start_date': start,
+            'end_date': end,
+            'payment_status': STATUS_FILTERS.get(self.status_combo.currentText(), ""),
+        }
+        
+        self.export_thread = BatchExportThread(self.db_manager.db_path, filters, output_dir, merged_path)
+        self.export_thread.progress.connect(self.update_progress)
+        self.export_thread.finished.connect(self.export_finished)
+        self.export_thread.error.connect(self.export_failed)
+        
+        self.export_btn.setEnabled(False)
+        self.export_thread.start()
+    
+    def update_progress(self, value, message):
+        """Update export progress"""
+        self.progress_bar.setValue(value)
+        self.status_label.setText(message)
+    
+    def cancel_export(self):
+        """Stop a running export, or close the dialog"""
+        if self.export_thread and self.export_thread.isRunning():
+            self.status_label.setText("Cancelling after the invoices in progress...")
+            self.cancel_btn.setEnabled(False)
+            self.export_thread.requestInterruption()
+        else:
+            self.reject()
+    
+    def export_finished(self, result):
+        """Report the batch result"""
+        self.export_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(True)
+        
+        if result['cancelled']:
+            QMessageBox.information(self, "Cancelled",
+                                    f"Export cancelled after {result['rendered']} of {result['total']} invoices")
+            return
+        
+        message = f"{result['rendered']} of {result['total']} invoices exported to:\n{result['output']}"
+        if result['failed']:
+            message += f"\n\nFailed: {', '.join(result['failed'][:20])}"
+            QMessageBox.warning(self, "Export Finished", message)
+        else:
+            QMessageBox.information(self, "Export Finished", message)
+        self.accept()
+    
+    def export_failed(self, message):
+        """Show export errors"""
+        self.export_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(True)
+        self.status_label.setText("")
+        QMessageBox.warning(self, "Batch Export", message)
+    
+    def reject(self):
+        """Don't leave a render running behind a closed dialog"""
+        if self.export_thread and self.export_thread.isRunning():
+            self.export_thread.requestInterruption()
+            self.export_thread.wait()
+        super().reject()
+
+
+class PrintQueueSignals(QObject):
+    """Carries print queue updates from the worker thread to the UI thread"""
+    job_updated = pyqtSignal(dict)
+
+
 class BillingModule(QWidget):
     """Billing and invoicing module"""
     def __init__(self, db_manager, parent=None):
         super().__init__(parent)
         self.db_manager = db_manager
         self.invoice_items = []
+        self.failed_print_job = None
         self.init_ui()
+        
+        # Render PDFs in the background so saving an invoice never waits on reportlab
+        self.print_signals = PrintQueueSignals()
+        self.print_signals.job_updated.connect(self.on_print_job_updated)
+        self.print_queue = InvoicePrintQueue(db_manager)
+        self.print_queue.add_listener(self.print_signals.job_updated.emit)
+        self.print_queue.start()
     
     def init_ui(self):
         """Initialize UI"""
@@ -254,6 +477,16 @@ class BillingModule(QWidget):
         
         header_layout.addStretch()
         
+        # Background print status
+        self.print_status_label = QLabel("")
+        self.print_status_label.setStyleSheet("color: #7f8c8d; font-size: 12px;")
+        header_layout.addWidget(self.print_status_label)
+        
+        self.retry_print_btn = QPushButton("🔁 Retry Print")
+        self.retry_print_btn.clicked.connect(self.retry_failed_print)
+        self.retry_print_btn.setVisible(False)
+        header_layout.addWidget(self.retry_print_btn)
+        
         # New Invoice button
         new_invoice_btn = QPushButton("➕ New Invoice")
         new_invoice_btn.setStyleSheet("""
@@ -471,6 +704,10 @@ class BillingModule(QWidget):
         self.status_filter.currentTextChanged.connect(self.filter_invoices)
         filter_layout.addWidget(self.status_filter)
         
+        batch_export_btn = QPushButton("📦 Batch Export")
+        batch_export_btn.clicked.connect(self.batch_export)
+        filter_layout.addWidget(batch_export_btn)
+        
         layout.addLayout(filter_layout)
         
         # Invoices table
@@ -682,18 +919,18 @@ class BillingModule(QWidget):
             invoice_id, invoice_number = self.db_manager.create_invoice(invoice_data, items)
             
             if invoice_id:
-                QMessageBox.information(self, "Success", 
-                                      f"Invoice {invoice_number} created successfully!")
-                
-                # Ask to print
-                reply = QMessageBox.question(
-                    self, "Print Invoice",
-                    "Do you want to print the invoice?",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-                )
+                msg = QMessageBox(self)
+                msg.setWindowTitle("Success")
+                msg.setText(f"Invoice {invoice_number} created successfully!\n\nDo you want to print the invoice?")
+                pdf_btn = msg.addButton("📄 A4 PDF", QMessageBox.ButtonRole.AcceptRole)
+                receipt_btn = msg.addButton("🧾 Receipt", QMessageBox.ButtonRole.AcceptRole)
+                msg.addButton(QMessageBox.StandardButton.No)
+                msg.exec()
                 
-                if reply == QMessageBox.StandardButton.Yes:
+                if msg.clickedButton() == pdf_btn:
                     self.print_invoice(invoice_id)
+                elif msg.clickedButton() == receipt_btn:
+                    self.print_receipt(invoice_id)
                 
                 # Reset form
                 self.cancel_invoice()
@@ -705,22 +942,59 @@ class BillingModule(QWidget):
             QMessageBox.critical(self, "Error", f"Error creating invoice: {str(e)}")
     
     def print_invoice(self, invoice_id):
-        """Print invoice"""
+        """Queue invoice PDF generation; progress shows in the header"""
+        job_id = self.print_queue.enqueue(invoice_id)
+        if job_id == -1:
+            QMessageBox.critical(self, "Error", "Failed to queue invoice for printing")
+            return
+        self.print_status_label.setText("🖨 Invoice queued for printing...")
+    
+    def print_receipt(self, invoice_id):
+        """Send a thermal receipt to the counter printer, or to receipts/ if none is set"""
         try:
             invoice = self.db_manager.get_invoice_by_id(invoice_id)
             items = self.db_manager.get_invoice_items(invoice_id)
-            company = self.db_manager.get_company_settings()
+            renderer = ReceiptRenderer(self.db_manager.get_company_settings(), RECEIPT_PAPER)
             
-            pdf_gen = PDFGenerator()
-            filename = f"invoice_{invoice['invoice_number']}.pdf"
+            output_path = RECEIPT_PRINTER
+            if not output_path:
+                os.makedirs("receipts", exist_ok=True)
+                output_path = os.path.join("receipts", f"{invoice['invoice_number']}.escpos")
             
-            if pdf_gen.generate_invoice(invoice, items, company, filename):
-                QMessageBox.information(self, "Success", f"Invoice saved as {filename}")
-            else:
-                QMessageBox.critical(self, "Error", "Failed to generate PDF")
+            renderer.write(renderer.render_escpos(invoice, items), output_path)
+            self.print_status_label.setText(f"🧾 Receipt for {invoice['invoice_number']} sent to {output_path}")
         
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error generating PDF: {str(e)}")
+            QMessageBox.critical(self, "Error", f"Error printing receipt: {str(e)}")
+    
+    def on_print_job_updated(self, job):
+        """Show background print progress"""
+        number = job.get('invoice_number') or f"#{job['invoice_id']}"
+        status = job['status']
+        
+        if status == 'rendering':
+            self.print_status_label.setText(f"🖨 Generating PDF for {number}...")
+        elif status == 'done':
+            self.print_status_label.setText(f"✅ {number} saved as {job['output_path']}")
+        elif status == 'queued':
+            self.print_status_label.setText(f"⏳ Retrying {number}: {job.get('error') or ''}")
+        elif status == 'failed':
+            self.failed_print_job = job['id']
+            self.print_status_label.setText(f"❌ PDF for {number} failed: {job.get('error') or ''}")
+            self.retry_print_btn.setVisible(True)
+    
+    def retry_failed_print(self):
+        """Put the last failed print job back in the queue"""
+        if self.failed_print_job and self.print_queue.retry(self.failed_print_job):
+            self.print_status_label.setText("🖨 Invoice queued for printing...")
+        self.failed_print_job = None
+        self.retry_print_btn.setVisible(False)
+    
+    def batch_export(self):
+        """Re-render invoice PDFs for a date range"""
+        dialog = BatchExportDialog(self.db_manager, self.search_input.text().strip(),
+                                   self.status_filter.currentText(), self)
+        dialog.exec()
     
     def load_invoices(self):
         """Load invoices into table"""
@@ -745,12 +1019,7 @@ class BillingModule(QWidget):
         if status == "All Status":
             invoices = self.db_manager.get_all_invoices()
         else:
-            status_map = {
-                "Paid": "paid",
-                "Unpaid": "unpaid",
-                "Partially Paid": "partially_paid"
-            }
-            invoices = self.db_manager.search_invoices(payment_status=status_map[status])
+            invoices = self.db_manager.search_invoices(payment_status=STATUS_FILTERS[status])
         
         self.populate_invoices_table(invoices)
     
@@ -806,9 +1075,14 @@ class BillingModule(QWidget):
         invoices = self.db_manager.search_invoices(search_term=invoice_number)
         if invoices:
             invoice = invoices[0]
-            QMessageBox.information(self, "Invoice Details", 
-                                  f"Invoice: {invoice['invoice_number']}\n"
-                                  f"Customer: {invoice['customer_name']}\n"
-                                  f"Date: {invoice['invoice_date']}\n"
-                                  f"Amount: ₹{invoice['grand_total']:,.2f}\n"
-                                  f"Status: {invoice['payment_status'].upper()}")
+            reply = QMessageBox.question(self, "Invoice Details", 
+                                       f"Invoice: {invoice['invoice_number']}\n"
+                                       f"Customer: {invoice['customer_name']}\n"
+                                       f"Date: {invoice['invoice_date']}\n"
+                                       f"Amount: ₹{invoice['grand_total']:,.2f}\n"
+                                       f"Status: {invoice['payment_status'].upper()}\n\n"
+                                       f"Reprint this invoice?",
+                                       QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            
+            if reply == QMessageBox.StandardButton.Yes:
+                self.print_invoice(invoice['id'])
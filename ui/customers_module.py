@@ -4,10 +4,13 @@ Customers Module - Customer management and ledger
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QPushButton, QLineEdit, QTableWidget, QTableWidgetItem,
                              QHeaderView, QDialog, QFormLayout, QTextEdit,
-                             QMessageBox, QFrame, QTabWidget, QGroupBox, QGridLayout)
-from PyQt6.QtCore import Qt
+                             QMessageBox, QFrame, QTabWidget, QGroupBox, QGridLayout,
+                             QComboBox, QProgressBar, QFileDialog)
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QColor
+from datetime import datetime
 from utils.pdf_generator import PDFGenerator
+from utils.customer_statements import CustomerStatementBatch
 
 
 class CustomerDialog(QDialog):
@@ -340,6 +343,175 @@ class CustomerLedgerDialog(QDialog):
             QMessageBox.critical(self, "Error", f"Error exporting ledger: {str(e)}")
 
 
+class BulkStatementThread(QThread):
+    """Stream statement data and render statements in worker processes"""
+    progress = pyqtSignal(int, str)
+    finished = pyqtSignal(dict)
+    error = pyqtSignal(str)
+    
+    def __init__(self, db_path, output_dir=None, merged_path=None):
+        super().__init__()
+        self.db_path = db_path
+        self.output_dir = output_dir
+        self.merged_path = merged_path
+    
+    def run(self):
+        """Run bulk statements in background"""
+        from database.db_manager import DatabaseManager
+        
+        try:
+            self.progress.emit(0, "Loading customers with a balance...")
+            
+            # SQLite connections are bound to the thread that opened them
+            db = DatabaseManager(self.db_path)
+            try:
+                def on_progress(done, total, customer_name):
+                    self.progress.emit(int(done * 100 / total), f"{customer_name} ({done} of {total})")
+                
+                result = CustomerStatementBatch(db).export(
+                    output_dir=self.output_dir, merged_path=self.merged_path,
+                    progress=on_progress, is_cancelled=self.isInterruptionRequested
+                )
+            finally:
+                db.close()
+            
+            if not result['total']:
+                self.error.emit("No customers have an outstanding balance")
+                return
+            
+            self.finished.emit(result)
+        
+        except Exception as e:
+            self.error.emit(f"Error: {str(e)}")
+
+
+class BulkStatementDialog(QDialog):
+    """Statements for every customer with an outstanding balance"""
+    def __init__(self, db_manager, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.statement_thread = None
+        self.init_ui()
+    
+    def init_ui(self):
+        """Initialize dialog UI"""
+        self.setWindowTitle("Customer Statements")
+        self.setModal(True)
+        self.setMinimumWidth(450)
+        
+        layout = QVBoxLayout()
+        
+        count = self.db_manager.count_customers_with_balance()
+        layout.addWidget(QLabel(f"{count} customer(s) have an outstanding balance."))
+        
+        form = QFormLayout()
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(["One PDF per customer", "One combined PDF"])
+        form.addRow("Output:", self.mode_combo)
+        layout.addLayout(form)
+        
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+        
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        layout.addWidget(self.progress_bar)
+        
+        # Buttons
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.cancel_statements)
+        button_layout.addWidget(self.cancel_btn)
+        
+        self.generate_btn = QPushButton("📑 Generate")
+        self.generate_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #27ae60;
+                color: white;
+                padding: 8px 20px;
+                border-radius: 5px;
+                font-weight: bold;
+            }
+        """)
+        self.generate_btn.setEnabled(count > 0)
+        self.generate_btn.clicked.connect(self.start_statements)
+        button_layout.addWidget(self.generate_btn)
+        
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+    
+    def start_statements(self):
+        """Ask for the destination and start rendering"""
+        output_dir = merged_path = None
+        if self.mode_combo.currentIndex() == 0:
+            output_dir = QFileDialog.getExistingDirectory(self, "Select Output Folder")
+            if not output_dir:
+                return
+        else:
+            merged_path, _ = QFileDialog.getSaveFileName(
+                self, "Save Statements", f"statements_{datetime.now().strftime('%Y-%m-%d')}.pdf",
+                "PDF Files (*.pdf)"
+            )
+            if not merged_path:
+                return
+        
+        self.statement_thread = BulkStatementThread(self.db_manager.db_path, output_dir, merged_path)
+        self.statement_thread.progress.connect(self.update_progress)
+        self.statement_thread.finished.connect(self.statements_finished)
+        self.statement_thread.error.connect(self.statements_failed)
+        
+        self.generate_btn.setEnabled(False)
+        self.statement_thread.start()
+    
+    def update_progress(self, value, message):
+        """Update progress"""
+        self.progress_bar.setValue(value)
+        self.status_label.setText(message)
+    
+    def cancel_statements(self):
+        """Stop a running job, or close the dialog"""
+        if self.statement_thread and self.statement_thread.isRunning():
+            self.status_label.setText("Cancelling after the statements in progress...")
+            self.cancel_btn.setEnabled(False)
+            self.statement_thread.requestInterruption()
+        else:
+            self.reject()
+    
+    def statements_finished(self, result):
+        """Report the result"""
+        self.generate_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(True)
+        
+        if result['cancelled']:
+            QMessageBox.information(self, "Cancelled",
+                                    f"Stopped after {result['rendered']} statements")
+            return
+        
+        message = f"{result['rendered']} of {result['total']} statements saved to:\n{result['output']}"
+        if result['failed']:
+            message += f"\n\nFailed: {', '.join(result['failed'][:20])}"
+            QMessageBox.warning(self, "Statements", message)
+        else:
+            QMessageBox.information(self, "Statements", message)
+        self.accept()
+    
+    def statements_failed(self, message):
+        """Show errors"""
+        self.generate_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(True)
+        self.status_label.setText("")
+        QMessageBox.warning(self, "Statements", message)
+    
+    def reject(self):
+        """Don't leave a render running behind a closed dialog"""
+        if self.statement_thread and self.statement_thread.isRunning():
+            self.statement_thread.requestInterruption()
+            self.statement_thread.wait()
+        super().reject()
+
+
 class CustomersModule(QWidget):
     """Customers management module"""
     def __init__(self, db_manager, parent=None):
@@ -386,6 +558,11 @@ class CustomersModule(QWidget):
         add_btn.clicked.connect(self.add_customer)
         header_layout.addWidget(add_btn)
         
+        # Bulk statements button
+        statements_btn = QPushButton("📑 Statements")
+        statements_btn.clicked.connect(self.bulk_statements)
+        header_layout.addWidget(statements_btn)
+        
         layout.addLayout(header_layout)
         
         # Statistics cards
@@ -584,6 +761,11 @@ class CustomersModule(QWidget):
         if dialog.exec() == QDialog.DialogCode.Accepted:
             self.load_customers()
     
+    def bulk_statements(self):
+        """Generate statements for every customer with a balance"""
+        dialog = BulkStatementDialog(self.db_manager, self)
+        dialog.exec()
+    
     def view_ledger(self, customer):
         """View customer ledger"""
         dialog = CustomerLedgerDialog(self.db_manager, customer, parent=self)
@@ -3,11 +3,58 @@ Dashboard Module - Main overview with statistics and quick actions
 """
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
                              QLabel, QPushButton, QFrame, QTableWidget, 
-                             QTableWidgetItem, QHeaderView, QScrollArea)
+                             QTableWidgetItem, QHeaderView, QScrollArea, QDialog)
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont, QColor
 from datetime import datetime, timedelta
 
+# Unpaid and partially paid invoices older than this count as overdue
+OVERDUE_DAYS = 7
+
+AGING_HEADERS = [("0-30 days", 'days_0_30'), ("31-60 days", 'days_31_60'),
+                 ("61-90 days", 'days_61_90'), ("90+ days", 'days_90_plus')]
+
+
+class AgingDialog(QDialog):
+    """Receivables aging per customer, loaded when opened"""
+    def __init__(self, db_manager, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Receivables Aging")
+        self.setMinimumSize(800, 450)
+        
+        layout = QVBoxLayout()
+        
+        rows = db_manager.get_receivables_aging()
+        
+        table = QTableWidget()
+        table.setColumnCount(7)
+        table.setHorizontalHeaderLabels(["Customer", "Invoices", "Oldest"]
+                                        + [header for header, _ in AGING_HEADERS])
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.setAlternatingRowColors(True)
+        table.setRowCount(len(rows))
+        
+        for row, data in enumerate(rows):
+            table.setItem(row, 0, QTableWidgetItem(data['customer_name']))
+            table.setItem(row, 1, QTableWidgetItem(str(data['invoice_count'])))
+            table.setItem(row, 2, QTableWidgetItem(data['oldest_invoice_date']))
+            
+            for col, (_, key) in enumerate(AGING_HEADERS, 3):
+                amount_item = QTableWidgetItem(f"₹{data[key]:,.2f}" if data[key] else "-")
+                amount_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                if key == 'days_90_plus' and data[key]:
+                    amount_item.setForeground(QColor("#e74c3c"))
+                table.setItem(row, col, amount_item)
+        
+        layout.addWidget(table)
+        
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        layout.addWidget(close_btn, alignment=Qt.AlignmentFlag.AlignRight)
+        
+        self.setLayout(layout)
+
 
 class StatCard(QFrame):
     """Statistics card widget"""
@@ -332,6 +379,11 @@ class DashboardModule(QWidget):
         self.overdue_list.setWordWrap(True)
         layout.addWidget(self.overdue_list)
         
+        self.aging_btn = QPushButton("View aging by customer")
+        self.aging_btn.setStyleSheet("color: #721c24; text-decoration: underline; border: none; text-align: left;")
+        self.aging_btn.clicked.connect(self.view_aging)
+        layout.addWidget(self.aging_btn)
+        
         panel.setLayout(layout)
         return panel
     
@@ -414,28 +466,26 @@ class DashboardModule(QWidget):
             self.low_stock_list.setText(text)
     
     def load_overdue_payments(self):
-        """Load overdue payments"""
-        # Get unpaid invoices older than 7 days
-        seven_days_ago = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
-        overdue = self.db_manager.search_invoices(
-            end_date=seven_days_ago,
-            payment_status='unpaid'
-        )
-        
-        if not overdue:
+        """Load overdue totals from the receivables aging summary"""
+        aging = self.db_manager.get_aging_summary(overdue_days=OVERDUE_DAYS)
+        
+        if not aging.get('overdue_count'):
             self.overdue_list.setText("✅ No overdue payments!")
         else:
-            total_overdue = sum(inv['balance_amount'] for inv in overdue)
-            text = f"{len(overdue)} invoice(s) overdue\n"
-            text += f"Total: ₹{total_overdue:,.2f}\n\n"
-            
-            for inv in overdue[:3]:  # Show top 3
-                text += f"• {inv['customer_name']}: ₹{inv['balance_amount']:,.2f}\n"
+            text = f"{aging['overdue_count']} invoice(s) overdue\n"
+            text += f"Total: ₹{aging['overdue_total']:,.2f}\n\n"
             
-            if len(overdue) > 3:
-                text += f"\n... and {len(overdue) - 3} more"
+            for header, key in AGING_HEADERS:
+                text += f"• {header}: ₹{aging[key]:,.2f}\n"
             
-            self.overdue_list.setText(text)
+            self.overdue_list.setText(text.rstrip())
+        
+        self.aging_btn.setVisible(bool(aging.get('invoice_count')))
+    
+    def view_aging(self):
+        """Drill down into receivables aging per customer"""
+        dialog = AgingDialog(self.db_manager, self)
+        dialog.exec()
     
     # Quick action callbacks
     def new_invoice(self):
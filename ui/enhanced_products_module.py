@@ -10,45 +10,209 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QSplitter, QToolButton, QMenu)
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QSize
 from PyQt6.QtGui import QColor, QFont, QIcon
-from utils.pdf_price_extractor import EnhancedPDFPriceExtractor
+from utils.price_list_importer import get_price_list_extractor
+from ui.reports_module import export_report
 from datetime import datetime
 
 
 class PDFImportThread(QThread):
-    """Background thread for PDF import"""
+    """Background thread for price-list import (PDF, XLSX or CSV), streaming matches"""
     progress = pyqtSignal(int, str)
-    finished = pyqtSignal(list)
+    batch_ready = pyqtSignal(list)
+    finished = pyqtSignal(int)
     error = pyqtSignal(str)
     
     def __init__(self, pdf_path, existing_products):
         super().__init__()
         self.pdf_path = pdf_path
         self.existing_products = existing_products
+        self.extractor = get_price_list_extractor(pdf_path)
     
     def run(self):
         """Run PDF import in background"""
         try:
-            self.progress.emit(10, "Opening PDF file...")
+            self.progress.emit(0, "Opening price list...")
             
-            extractor = EnhancedPDFPriceExtractor()
+            extractor = self.extractor
+            is_pdf = self.pdf_path.lower().endswith('.pdf')
+            total_found = 0
             
-            self.progress.emit(30, "Extracting products from PDF...")
-            extracted = extractor.extract_from_pdf(self.pdf_path)
+            for page_num, total_pages, products in extractor.iter_pages(self.pdf_path):
+                if self.isInterruptionRequested():
+                    return
+                
+                if products:
+                    matches = list(extractor.iter_matches(products, self.existing_products))
+                    total_found += len(matches)
+                    self.batch_ready.emit(matches)
+                
+                if is_pdf:
+                    message = f"Page {page_num} of {total_pages} - {total_found} products found"
+                else:
+                    message = f"Reading rows - {total_found} products found"
+                self.progress.emit(int(page_num * 100 / total_pages), message)
             
-            if not extracted:
-                self.error.emit("No products found in PDF")
+            if not total_found:
+                self.error.emit("No products found in price list")
                 return
             
-            self.progress.emit(60, f"Found {len(extracted)} products. Matching...")
+            self.finished.emit(total_found)
+            
+        except Exception as e:
+            self.error.emit(f"Error: {str(e)}")
+
+
+class PDFImportResultsDialog(QDialog):
+    """Review dialog that fills in while the PDF import is still running"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.matched_products = []
+        self.init_ui()
+    
+    def init_ui(self):
+        """Initialize dialog UI"""
+        self.setWindowTitle("PDF Import Results")
+        self.setModal(True)
+        self.setMinimumSize(900, 600)
+        
+        layout = QVBoxLayout()
+        layout.setSpacing(15)
+        
+        # Summary
+        self.summary = QLabel("Starting import...")
+        self.summary.setStyleSheet("""
+            background-color: #ecf0f1;
+            padding: 15px;
+            border-radius: 8px;
+            font-size: 14px;
+            font-weight: bold;
+        """)
+        layout.addWidget(self.summary)
+        
+        # Progress
+        self.status_label = QLabel("Opening price list...")
+        layout.addWidget(self.status_label)
+        
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        layout.addWidget(self.progress_bar)
+        
+        # Results table
+        self.results_table = QTableWidget()
+        self.results_table.setColumnCount(6)
+        self.results_table.setHorizontalHeaderLabels([
+            "Status", "Code", "Name", "New Price", "Current Price", "Confidence"
+        ])
+        self.results_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.results_table.setAlternatingRowColors(True)
+        layout.addWidget(self.results_table)
+        
+        # Buttons
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_btn)
+        
+        self.apply_btn = QPushButton("Apply Updates")
+        self.apply_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #27ae60;
+                color: white;
+                padding: 10px 20px;
+                border-radius: 6px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #229954;
+            }
+        """)
+        self.apply_btn.setEnabled(False)
+        button_layout.addWidget(self.apply_btn)
+        
+        layout.addLayout(button_layout)
+        
+        self.setLayout(layout)
+    
+    def update_progress(self, value, message):
+        """Update import progress"""
+        self.progress_bar.setValue(value)
+        self.status_label.setText(message)
+    
+    def add_matches(self, matches):
+        """Append a streamed batch of matches to the table"""
+        start_row = self.results_table.rowCount()
+        self.results_table.setRowCount(start_row + len(matches))
+        
+        for row, match in enumerate(matches, start_row):
+            extracted = match['extracted']
+            matched_prod = match['matched']
+            confidence = match['confidence']
+            
+            # Status
+            if match['status'] == 'matched':
+                status_item = QTableWidgetItem("✅ Matched")
+                status_item.setForeground(QColor("#27ae60"))
+            else:
+                status_item = QTableWidgetItem("❌ New")
+                status_item.setForeground(QColor("#e74c3c"))
+            status_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.results_table.setItem(row, 0, status_item)
             
-            matched = extractor.match_with_existing_products(self.existing_products)
+            # Code
+            self.results_table.setItem(row, 1, QTableWidgetItem(extracted['product_code']))
             
-            self.progress.emit(90, "Finalizing results...")
+            # Name
+            self.results_table.setItem(row, 2, QTableWidgetItem(extracted['product_name']))
             
-            self.finished.emit(matched)
+            # New Price
+            new_price_item = QTableWidgetItem(f"₹{extracted['price']:,.2f}")
+            new_price_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            new_price_item.setForeground(QColor("#3498db"))
+            self.results_table.setItem(row, 3, new_price_item)
             
-        except Exception as e:
-            self.error.emit(f"Error: {str(e)}")
+            # Current Price
+            if matched_prod:
+                current_price = f"₹{matched_prod['selling_price']:,.2f}"
+            else:
+                current_price = "-"
+            current_price_item = QTableWidgetItem(current_price)
+            current_price_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.results_table.setItem(row, 4, current_price_item)
+            
+            # Confidence
+            conf_item = QTableWidgetItem(f"{confidence:.0f}%")
+            conf_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            
+            if confidence >= 90:
+                conf_item.setForeground(QColor("#27ae60"))
+            elif confidence >= 70:
+                conf_item.setForeground(QColor("#f39c12"))
+            else:
+                conf_item.setForeground(QColor("#e74c3c"))
+            
+            self.results_table.setItem(row, 5, conf_item)
+        
+        self.matched_products.extend(matches)
+        self.update_summary()
+    
+    def update_summary(self):
+        """Refresh the matched/new counters"""
+        matched_count = sum(1 for m in self.matched_products if m['status'] == 'matched')
+        no_match_count = len(self.matched_products) - matched_count
+        
+        self.summary.setText(
+            f"📊 Found {len(self.matched_products)} products | "
+            f"✅ {matched_count} matched | "
+            f"❌ {no_match_count} new"
+        )
+    
+    def import_finished(self, total):
+        """Enable applying updates once the whole PDF has been read"""
+        self.progress_bar.setValue(100)
+        self.status_label.setText(f"Import complete - {total} products found")
+        self.apply_btn.setEnabled(True)
 
 
 class EnhancedProductDialog(QDialog):
@@ -532,7 +696,7 @@ class EnhancedProductsModule(QWidget):
         add_btn.clicked.connect(self.add_product)
         header_layout.addWidget(add_btn)
         
-        import_btn = QPushButton("📄 Import PDF")
+        import_btn = QPushButton("📄 Import Price List")
         import_btn.setStyleSheet("""
             QPushButton {
                 background-color: #3498db;
@@ -933,195 +1097,64 @@ class EnhancedProductsModule(QWidget):
     def import_from_pdf(self):
         """Import products from PDF with enhanced UI"""
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "Select PDF File", "", "PDF Files (*.pdf)"
+            self, "Select Price List", "",
+            "Price Lists (*.pdf *.xlsx *.xlsm *.csv);;PDF Files (*.pdf);;"
+            "Excel Files (*.xlsx *.xlsm);;CSV Files (*.csv)"
         )
         
         if not file_path:
             return
         
-        # Show progress dialog
-        progress_dialog = QDialog(self)
-        progress_dialog.setWindowTitle("Importing from PDF")
-        progress_dialog.setModal(True)
-        progress_dialog.setMinimumWidth(500)
-        
-        layout = QVBoxLayout()
-        layout.setSpacing(15)
-        
-        status_label = QLabel("Starting import...")
-        layout.addWidget(status_label)
-        
-        progress_bar = QProgressBar()
-        progress_bar.setRange(0, 100)
-        layout.addWidget(progress_bar)
-        
-        progress_dialog.setLayout(layout)
-        progress_dialog.show()
-        
-        # Start import thread
         existing_products = self.db_manager.get_all_products()
         self.pdf_import_thread = PDFImportThread(file_path, existing_products)
         
-        self.pdf_import_thread.progress.connect(
-            lambda value, msg: (progress_bar.setValue(value), status_label.setText(msg))
+        # Results dialog doubles as the progress dialog while pages stream in
+        dialog = PDFImportResultsDialog(self)
+        update_source = self.pdf_import_thread.extractor.update_source
+        dialog.apply_btn.clicked.connect(
+            lambda: self.apply_price_updates(dialog.matched_products, dialog, update_source)
         )
         
-        self.pdf_import_thread.finished.connect(
-            lambda results: self.show_import_results(results, progress_dialog)
-        )
+        # Start import thread
         
+        self.pdf_import_thread.progress.connect(dialog.update_progress)
+        self.pdf_import_thread.batch_ready.connect(dialog.add_matches)
+        self.pdf_import_thread.finished.connect(dialog.import_finished)
         self.pdf_import_thread.error.connect(
-            lambda error: (QMessageBox.critical(self, "Error", error), progress_dialog.close())
+            lambda error: (QMessageBox.critical(self, "Error", error), dialog.reject())
         )
         
         self.pdf_import_thread.start()
-    
-    def show_import_results(self, matched_products, progress_dialog):
-        """Show import results with enhanced UI"""
-        progress_dialog.close()
-        
-        if not matched_products:
-            QMessageBox.information(self, "No Results", "No products found in PDF")
-            return
-        
-        # Create results dialog
-        dialog = QDialog(self)
-        dialog.setWindowTitle("PDF Import Results")
-        dialog.setModal(True)
-        dialog.setMinimumSize(900, 600)
-        
-        layout = QVBoxLayout()
-        layout.setSpacing(15)
-        
-        # Summary
-        matched_count = sum(1 for m in matched_products if m['status'] == 'matched')
-        no_match_count = len(matched_products) - matched_count
-        
-        summary = QLabel(
-            f"📊 Found {len(matched_products)} products | "
-            f"✅ {matched_count} matched | "
-            f"❌ {no_match_count} new"
-        )
-        summary.setStyleSheet("""
-            background-color: #ecf0f1;
-            padding: 15px;
-            border-radius: 8px;
-            font-size: 14px;
-            font-weight: bold;
-        """)
-        layout.addWidget(summary)
-        
-        # Results table
-        results_table = QTableWidget()
-        results_table.setColumnCount(6)
-        results_table.setHorizontalHeaderLabels([
-            "Status", "Code", "Name", "New Price", "Current Price", "Confidence"
-        ])
-        results_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        results_table.setAlternatingRowColors(True)
-        results_table.setRowCount(len(matched_products))
-        
-        for row, match in enumerate(matched_products):
-            extracted = match['extracted']
-            matched_prod = match['matched']
-            confidence = match['confidence']
-            
-            # Status
-            if match['status'] == 'matched':
-                status_item = QTableWidgetItem("✅ Matched")
-                status_item.setForeground(QColor("#27ae60"))
-            else:
-                status_item.setForeground(QColor("#e74c3c"))
-                status_item = QTableWidgetItem("❌ New")
-            status_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            results_table.setItem(row, 0, status_item)
-            
-            # Code
-            results_table.setItem(row, 1, QTableWidgetItem(extracted['product_code']))
-            
-            # Name
-            results_table.setItem(row, 2, QTableWidgetItem(extracted['product_name']))
-            
-            # New Price
-            new_price_item = QTableWidgetItem(f"₹{extracted['price']:,.2f}")
-            new_price_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-            new_price_item.setForeground(QColor("#3498db"))
-            results_table.setItem(row, 3, new_price_item)
-            
-            # Current Price
-            if matched_prod:
-                current_price = f"₹{matched_prod['selling_price']:,.2f}"
-            else:
-                current_price = "-"
-            current_price_item = QTableWidgetItem(current_price)
-            current_price_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-            results_table.setItem(row, 4, current_price_item)
-            
-            # Confidence
-            conf_item = QTableWidgetItem(f"{confidence:.0f}%")
-            conf_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            
-            if confidence >= 90:
-                conf_item.setForeground(QColor("#27ae60"))
-            elif confidence >= 70:
-                conf_item.setForeground(QColor("#f39c12"))
-            else:
-                conf_item.setForeground(QColor("#e74c3c"))
-            
-            results_table.setItem(row, 5, conf_item)
-        
-        layout.addWidget(results_table)
-        
-        # Buttons
-        button_layout = QHBoxLayout()
-        button_layout.addStretch()
-        
-        cancel_btn = QPushButton("Cancel")
-        cancel_btn.clicked.connect(dialog.reject)
-        button_layout.addWidget(cancel_btn)
-        
-        apply_btn = QPushButton("Apply Updates")
-        apply_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #27ae60;
-                color: white;
-                padding: 10px 20px;
-                border-radius: 6px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #229954;
-            }
-        """)
-        apply_btn.clicked.connect(lambda: self.apply_price_updates(matched_products, dialog))
-        button_layout.addWidget(apply_btn)
-        
-        layout.addLayout(button_layout)
-        
-        dialog.setLayout(layout)
         dialog.exec()
+        
+        # Stop reading pages if the dialog was closed before the import finished
+        if self.pdf_import_thread.isRunning():
+            self.pdf_import_thread.requestInterruption()
     
-    def apply_price_updates(self, matched_products, dialog):
-        """Apply price updates from PDF import"""
-        updated_count = 0
-        
-        for match in matched_products:
-            if match['status'] == 'matched' and match['matched']:
-                product_id = match['matched']['id']
-                new_price = match['extracted']['price']
-                
-                if self.db_manager.update_product(product_id, {'selling_price': new_price}):
-                    updated_count += 1
+    def apply_price_updates(self, matched_products, dialog, update_source='pdf_import'):
+        """Apply price updates from a PDF or spreadsheet import"""
+        changes = [
+            {'product_id': match['matched']['id'], 'selling_price': match['extracted']['price']}
+            for match in matched_products
+            if match['status'] == 'matched' and match['matched']
+        ]
+        
+        summary = self.db_manager.bulk_update_prices(changes, update_source=update_source)
+        
+        if not summary:
+            QMessageBox.critical(self, "Error", "Failed to apply price updates. No prices were changed.")
+            return
         
         dialog.accept()
         QMessageBox.information(self, "Success", 
-                              f"Updated prices for {updated_count} products!")
+                              f"Updated prices for {summary['updated']} products!\n"
+                              f"{summary['unchanged']} already up to date.")
         self.load_products()
     
     def export_to_excel(self):
         """Export products to Excel"""
-        QMessageBox.information(self, "Coming Soon", "Excel export feature coming soon!")
+        export_report(self, self.db_manager, 'products', file_filter="Excel Files (*.xlsx);;CSV Files (*.csv)")
     
     def export_to_pdf(self):
         """Export products to PDF"""
-        QMessageBox.information(self, "Coming Soon", "PDF export feature coming soon!")
+        export_report(self, self.db_manager, 'products', file_filter="PDF Files (*.pdf)")
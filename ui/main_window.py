@@ -4,7 +4,7 @@ Main Application Window
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QStackedWidget, QPushButton, QLabel, QFrame,
                              QMessageBox, QMenuBar, QMenu, QToolBar, QStatusBar)
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtCore import Qt, QSize, QObject, pyqtSignal
 from PyQt6.QtGui import QAction, QIcon, QFont
 from ui.dashboard import DashboardModule
 from ui.products_module import ProductsModule
@@ -12,6 +12,12 @@ from ui.billing_module import BillingModule
 from ui.customers_module import CustomersModule
 from ui.reports_module import ReportsModule
 from ui.settings_module import SettingsModule
+from utils.stock_snapshots import StockSnapshotScheduler
+
+
+class StockSnapshotSignals(QObject):
+    """Carries stock snapshot passes from the scheduler thread to the UI thread"""
+    pass_finished = pyqtSignal(dict)
 
 
 class MainWindow(QMainWindow):
@@ -22,6 +28,12 @@ class MainWindow(QMainWindow):
         self.current_module = None
         self.modules = {}
         self.init_ui()
+        
+        self.snapshot_signals = StockSnapshotSignals()
+        self.snapshot_signals.pass_finished.connect(self.on_stock_snapshots)
+        self.snapshot_scheduler = StockSnapshotScheduler(db_manager)
+        self.snapshot_scheduler.add_listener(self.snapshot_signals.pass_finished.emit)
+        self.snapshot_scheduler.start()
     
     def init_ui(self):
         """Initialize main window UI"""
@@ -235,6 +247,13 @@ class MainWindow(QMainWindow):
         """Create status bar"""
         self.statusBar().showMessage("Ready")
     
+    def on_stock_snapshots(self, result):
+        """Point out products whose stock has drifted from the stock ledger"""
+        if result['mismatches']:
+            self.statusBar().showMessage(
+                f"⚠️ Stock check: {len(result['mismatches'])} product(s) differ from the stock ledger"
+            )
+    
     def load_modules(self):
         """Load all modules"""
         # Dashboard
@@ -264,6 +283,7 @@ class MainWindow(QMainWindow):
         
         # Settings
         settings = SettingsModule(self.db_manager)
+        settings.database_restored.connect(self.on_database_restored)
         self.modules['settings'] = settings
         self.content_stack.addWidget(settings)
     
@@ -336,42 +356,37 @@ class MainWindow(QMainWindow):
         self.statusBar().showMessage("Refreshed", 2000)
     
     def backup_database(self):
-        """Backup database"""
-        from PyQt6.QtWidgets import QFileDialog
-        from datetime import datetime
-        
-        default_name = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "Backup Database", default_name, "Database Files (*.db)"
-        )
-        
-        if file_path:
-            if self.db_manager.backup_database(file_path):
-                QMessageBox.information(self, "Success", "Database backed up successfully!")
-            else:
-                QMessageBox.critical(self, "Error", "Failed to backup database")
+        """Backup database from the Settings backup tab, which shows its progress"""
+        self.show_settings()
+        self.modules['settings'].show_backup_tab()
+        self.modules['settings'].backup_database()
     
     def restore_database(self):
-        """Restore database"""
-        from PyQt6.QtWidgets import QFileDialog
-        
-        file_path, _ = QFileDialog.getOpenFileName(
-            self, "Restore Database", "", "Database Files (*.db)"
-        )
-        
-        if file_path:
-            reply = QMessageBox.question(
-                self, "Confirm Restore",
-                "This will replace the current database. Continue?",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-            )
-            
-            if reply == QMessageBox.StandardButton.Yes:
-                if self.db_manager.restore_database(file_path):
-                    QMessageBox.information(self, "Success", 
-                                          "Database restored successfully!\nPlease restart the application.")
-                else:
-                    QMessageBox.critical(self, "Error", "Failed to restore database")
+        """Restore database from the Settings backup tab"""
+        self.show_settings()
+        self.modules['settings'].show_backup_tab()
+        self.modules['settings'].restore_database()
+    
+    def on_database_restored(self):
+        """Reload every module from the restored database"""
+        self.modules['dashboard'].load_data()
+        self.modules['products'].load_products()
+        
+        billing = self.modules['billing']
+        # A draft may reference products the restored data doesn't have
+        billing.cancel_invoice()
+        billing.load_customers()
+        billing.load_invoices()
+        
+        self.modules['customers'].load_customers()
+        self.modules['reports'].reload_after_restore()
+        self.modules['settings'].load_settings()
+        self.modules['settings'].load_incremental_backups()
+        self.modules['settings'].load_archives()
+        
+        # The restored database may be missing recent stock snapshots
+        self.snapshot_scheduler.run_now()
+        self.statusBar().showMessage("Database restored", 5000)
     
     def show_about(self):
         """Show about dialog"""
@@ -406,6 +421,18 @@ class MainWindow(QMainWindow):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
+            if 'billing' in self.modules:
+                self.modules['billing'].print_queue.stop()
+            if 'reports' in self.modules:
+                self.modules['reports'].report_cache.stop()
+            self.snapshot_scheduler.stop()
+            if 'settings' in self.modules:
+                settings = self.modules['settings']
+                settings.backup_scheduler.stop()
+                for thread in (settings.backup_thread, settings.incremental_thread, settings.archive_thread):
+                    if thread and thread.isRunning():
+                        thread.requestInterruption()
+                        thread.wait()
             self.db_manager.close()
             event.accept()
         else:
@@ -1,14 +1,164 @@
 """
 Reports Module - Generate and export various reports
 """
+import os
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QPushButton, QTableWidget, QTableWidgetItem,
                              QHeaderView, QMessageBox, QFrame, QComboBox,
-                             QDateEdit, QGroupBox, QGridLayout, QTextEdit)
-from PyQt6.QtCore import Qt, QDate
+                             QDateEdit, QGroupBox, QGridLayout, QTextEdit,
+                             QDialog, QProgressBar, QFileDialog)
+from PyQt6.QtCore import Qt, QDate, QThread, QObject, pyqtSignal
 from PyQt6.QtGui import QColor
 from datetime import datetime, timedelta
-from utils.pdf_generator import PDFGenerator
+from utils.report_export import ReportExporter, REPORTS
+from utils.report_cache import ReportCache
+
+# Report combo entries and the report_export types behind them
+REPORT_TYPES = {
+    "Sales Report": 'sales',
+    "Product Sales": 'product_sales',
+    "Stock Report": 'stock',
+    "Low Stock Report": 'low_stock',
+    "Stock Movement": 'stock_movement',
+    "Payment Report": 'payments',
+    "GST Summary": 'gst',
+    "Receivables Aging": 'aging',
+    "Customer Summary": 'customers',
+}
+
+EXPORT_FILTERS = "PDF Files (*.pdf);;Excel Files (*.xlsx);;CSV Files (*.csv)"
+FILTER_EXTENSIONS = {'PDF': '.pdf', 'Excel': '.xlsx', 'CSV': '.csv'}
+
+
+class ReportExportThread(QThread):
+    """Stream a report from its query into a file"""
+    progress = pyqtSignal(int, str)
+    finished = pyqtSignal(dict)
+    error = pyqtSignal(str)
+    
+    def __init__(self, db_path, report_type, output_path, start_date="", end_date=""):
+        super().__init__()
+        self.db_path = db_path
+        self.report_type = report_type
+        self.output_path = output_path
+        self.start_date = start_date
+        self.end_date = end_date
+    
+    def run(self):
+        """Run export in background"""
+        from database.db_manager import DatabaseManager
+        
+        try:
+            self.progress.emit(0, "Counting rows...")
+            
+            # SQLite connections are bound to the thread that opened them
+            db = DatabaseManager(self.db_path)
+            try:
+                def on_progress(done, total):
+                    self.progress.emit(int(done * 100 / total), f"{done:,} of {total:,} rows")
+                
+                result = ReportExporter(db).export(
+                    self.report_type, self.output_path,
+                    start_date=self.start_date, end_date=self.end_date,
+                    progress=on_progress, is_cancelled=self.isInterruptionRequested
+                )
+            finally:
+                db.close()
+            
+            self.finished.emit(result)
+        
+        except Exception as e:
+            self.error.emit(f"Error: {str(e)}")
+
+
+class ReportExportDialog(QDialog):
+    """Progress for one report export; the export starts when the dialog opens"""
+    def __init__(self, db_manager, report_type, output_path, start_date="", end_date="", parent=None):
+        super().__init__(parent)
+        self.export_thread = ReportExportThread(db_manager.db_path, report_type, output_path,
+                                                start_date, end_date)
+        self.init_ui(REPORTS[report_type][0])
+        
+        self.export_thread.progress.connect(self.update_progress)
+        self.export_thread.finished.connect(self.export_finished)
+        self.export_thread.error.connect(self.export_failed)
+        self.export_thread.start()
+    
+    def init_ui(self, title):
+        """Initialize dialog UI"""
+        self.setWindowTitle(f"Exporting {title}")
+        self.setModal(True)
+        self.setMinimumWidth(400)
+        
+        layout = QVBoxLayout()
+        
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+        
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        layout.addWidget(self.progress_bar)
+        
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.reject)
+        button_layout.addWidget(self.cancel_btn)
+        
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+    
+    def update_progress(self, value, message):
+        """Update progress"""
+        self.progress_bar.setValue(value)
+        self.status_label.setText(message)
+    
+    def export_finished(self, result):
+        """Report the result"""
+        if not result['cancelled']:
+            QMessageBox.information(self, "Export",
+                                    f"Exported {result['rows']:,} rows to:\n{result['output']}")
+        self.accept()
+    
+    def export_failed(self, message):
+        """Show errors"""
+        QMessageBox.critical(self, "Export", message)
+        super().reject()
+    
+    def reject(self):
+        """Cancel a running export; the partial file is discarded"""
+        if self.export_thread.isRunning():
+            self.status_label.setText("Cancelling...")
+            self.cancel_btn.setEnabled(False)
+            self.export_thread.requestInterruption()
+            self.export_thread.wait()
+        super().reject()
+
+
+def export_report(parent, db_manager, report_type, start_date="", end_date="", file_filter=EXPORT_FILTERS):
+    """Ask for a destination and export a report with a progress dialog"""
+    title = REPORTS[report_type][0]
+    default_name = f"{title.replace(' ', '_').lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    extension = FILTER_EXTENSIONS[file_filter.split()[0]]
+    
+    output_path, selected_filter = QFileDialog.getSaveFileName(
+        parent, f"Export {title}", default_name + extension, file_filter
+    )
+    if not output_path:
+        return
+    
+    # Add the extension for the chosen filter if the user typed a bare name
+    if not os.path.splitext(output_path)[1]:
+        output_path += FILTER_EXTENSIONS[selected_filter.split()[0]]
+    
+    dialog = ReportExportDialog(db_manager, report_type, output_path, start_date, end_date, parent)
+    dialog.exec()
+
+
+class ReportCacheSignals(QObject):
+    """Carries report cache refreshes from the worker thread to the UI thread"""
+    report_updated = pyqtSignal(str, dict)
 
 
 class ReportsModule(QWidget):
@@ -16,7 +166,15 @@ class ReportsModule(QWidget):
     def __init__(self, db_manager, parent=None):
         super().__init__(parent)
         self.db_manager = db_manager
+        # (combo entry, cache report_type, params) of the report on screen, for background refreshes
+        self.current_report = None
         self.init_ui()
+        
+        self.cache_signals = ReportCacheSignals()
+        self.cache_signals.report_updated.connect(self.on_report_refreshed)
+        self.report_cache = ReportCache(db_manager)
+        self.report_cache.add_listener(self.cache_signals.report_updated.emit)
+        self.report_cache.start()
     
     def init_ui(self):
         """Initialize UI"""
@@ -52,9 +210,13 @@ class ReportsModule(QWidget):
         self.report_type_combo = QComboBox()
         self.report_type_combo.addItems([
             "Sales Report",
+            "Product Sales",
             "Stock Report",
             "Low Stock Report",
+            "Stock Movement",
             "Payment Report",
+            "GST Summary",
+            "Receivables Aging",
             "Customer Summary"
         ])
         self.report_type_combo.currentTextChanged.connect(self.on_report_type_changed)
@@ -105,7 +267,7 @@ class ReportsModule(QWidget):
         self.generate_btn.clicked.connect(self.generate_report)
         generate_layout.addWidget(self.generate_btn)
         
-        self.export_pdf_btn = QPushButton("📄 Export PDF")
+        self.export_pdf_btn = QPushButton("📄 Export")
         self.export_pdf_btn.setStyleSheet("""
             QPushButton {
                 background-color: #27ae60;
@@ -120,9 +282,27 @@ class ReportsModule(QWidget):
             }
         """)
         self.export_pdf_btn.clicked.connect(self.export_pdf)
-        self.export_pdf_btn.setEnabled(False)
         generate_layout.addWidget(self.export_pdf_btn)
         
+        self.export_gst_btn = QPushButton("🧾 Export GST Register")
+        self.export_gst_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #8e44ad;
+                color: white;
+                padding: 10px 20px;
+                border-radius: 5px;
+                font-weight: bold;
+                font-size: 14px;
+            }
+            QPushButton:hover {
+                background-color: #7d3c98;
+            }
+        """)
+        self.export_gst_btn.setToolTip("Invoice-wise taxable value and CGST/SGST by rate, for return filing")
+        self.export_gst_btn.clicked.connect(self.export_gst_register)
+        self.export_gst_btn.setVisible(False)
+        generate_layout.addWidget(self.export_gst_btn)
+        
         selection_layout.addLayout(generate_layout)
         
         selection_frame.setLayout(selection_layout)
@@ -170,10 +350,11 @@ class ReportsModule(QWidget):
     def on_report_type_changed(self, report_type):
         """Handle report type change"""
         # Show/hide date range based on report type
-        if report_type in ["Sales Report", "Payment Report"]:
+        if report_type in ["Sales Report", "Product Sales", "Stock Movement", "Payment Report", "GST Summary"]:
             self.date_range_group.setVisible(True)
         else:
             self.date_range_group.setVisible(False)
+        self.export_gst_btn.setVisible(report_type == "GST Summary")
     
     def generate_report(self):
         """Generate selected report"""
@@ -181,23 +362,30 @@ class ReportsModule(QWidget):
         
         if report_type == "Sales Report":
             self.generate_sales_report()
+        elif report_type == "Product Sales":
+            self.generate_product_sales_report()
         elif report_type == "Stock Report":
             self.generate_stock_report()
         elif report_type == "Low Stock Report":
             self.generate_low_stock_report()
+        elif report_type == "Stock Movement":
+            self.generate_stock_movement_report()
         elif report_type == "Payment Report":
             self.generate_payment_report()
+        elif report_type == "GST Summary":
+            self.generate_gst_report()
+        elif report_type == "Receivables Aging":
+            self.generate_aging_report()
         elif report_type == "Customer Summary":
             self.generate_customer_summary()
-        
-        self.export_pdf_btn.setEnabled(True)
     
     def generate_sales_report(self):
         """Generate sales report"""
         from_date = self.from_date.date().toString("yyyy-MM-dd")
         to_date = self.to_date.date().toString("yyyy-MM-dd")
         
-        invoices = self.db_manager.search_invoices(start_date=from_date, end_date=to_date)
+        invoices = self.report_cache.get('sales', start_date=from_date, end_date=to_date)
+        self.current_report = ("Sales Report", 'sales', {'start_date': from_date, 'end_date': to_date})
         
         # Calculate summary
         total_sales = sum(inv['grand_total'] for inv in invoices)
@@ -246,9 +434,56 @@ class ReportsModule(QWidget):
             
             self.report_table.setItem(row, 5, status_item)
     
+    def generate_product_sales_report(self):
+        """Generate product-wise sales report"""
+        from_date = self.from_date.date().toString("yyyy-MM-dd")
+        to_date = self.to_date.date().toString("yyyy-MM-dd")
+        
+        products = self.report_cache.get('product_sales', start_date=from_date, end_date=to_date)
+        self.current_report = ("Product Sales", 'product_sales', {'start_date': from_date, 'end_date': to_date})
+        
+        total_revenue = sum(p['revenue'] for p in products)
+        total_margin = sum(p['margin'] for p in products)
+        
+        # Update summary
+        self.update_summary([
+            ("Products Sold", str(len(products)), "#3498db"),
+            ("Revenue", f"₹{total_revenue:,.2f}", "#27ae60"),
+            ("Tax", f"₹{sum(p['tax_amount'] for p in products):,.2f}", "#9b59b6"),
+            ("Margin", f"₹{total_margin:,.2f}", "#e74c3c" if total_margin < 0 else "#27ae60")
+        ])
+        
+        # Populate table
+        self.report_table.setColumnCount(7)
+        self.report_table.setHorizontalHeaderLabels([
+            "Code", "Product", "Qty", "Revenue", "Tax", "Margin", "Margin %"
+        ])
+        self.report_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.report_table.setRowCount(len(products))
+        
+        for row, product in enumerate(products):
+            self.report_table.setItem(row, 0, QTableWidgetItem(product['product_code']))
+            self.report_table.setItem(row, 1, QTableWidgetItem(product['product_name']))
+            
+            qty_item = QTableWidgetItem(f"{product['quantity']:g} {product['unit'] or ''}")
+            qty_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.report_table.setItem(row, 2, qty_item)
+            
+            for col, value in ((3, product['revenue']), (4, product['tax_amount']), (5, product['margin'])):
+                amount_item = QTableWidgetItem(f"₹{value:,.2f}")
+                amount_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.report_table.setItem(row, col, amount_item)
+            
+            margin_pct = product['margin'] * 100 / product['revenue'] if product['revenue'] else 0
+            pct_item = QTableWidgetItem(f"{margin_pct:.1f}%")
+            pct_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            pct_item.setForeground(QColor("#e74c3c") if margin_pct < 0 else QColor("#27ae60"))
+            self.report_table.setItem(row, 6, pct_item)
+    
     def generate_stock_report(self):
         """Generate stock report"""
-        products = self.db_manager.get_all_products()
+        products = self.report_cache.get('stock')
+        self.current_report = ("Stock Report", 'stock', {})
         
         # Calculate summary
         total_products = len(products)
@@ -313,7 +548,8 @@ class ReportsModule(QWidget):
     
     def generate_low_stock_report(self):
         """Generate low stock report"""
-        products = self.db_manager.get_low_stock_products()
+        products = self.report_cache.get('low_stock')
+        self.current_report = ("Low Stock Report", 'low_stock', {})
         
         # Update summary
         self.update_summary([
@@ -354,13 +590,50 @@ class ReportsModule(QWidget):
             reorder_item.setForeground(QColor("#27ae60"))
             self.report_table.setItem(row, 5, reorder_item)
     
+    def generate_stock_movement_report(self):
+        """Generate opening, inward, outward and closing stock per product"""
+        from_date = self.from_date.date().toString("yyyy-MM-dd")
+        to_date = self.to_date.date().toString("yyyy-MM-dd")
+        
+        movement = self.report_cache.get('stock_movement', start_date=from_date, end_date=to_date)
+        self.current_report = ("Stock Movement", 'stock_movement', {'start_date': from_date, 'end_date': to_date})
+        
+        # Update summary
+        self.update_summary([
+            ("Products", str(len(movement)), "#3498db"),
+            ("Moved", str(sum(1 for m in movement if m['inward_qty'] or m['outward_qty'])), "#9b59b6"),
+            ("Inward", f"{sum(m['inward_qty'] for m in movement):,.0f}", "#27ae60"),
+            ("Outward", f"{sum(m['outward_qty'] for m in movement):,.0f}", "#e74c3c")
+        ])
+        
+        # Populate table
+        self.report_table.setColumnCount(6)
+        self.report_table.setHorizontalHeaderLabels([
+            "Code", "Product", "Opening", "Inward", "Outward", "Closing"
+        ])
+        self.report_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.report_table.setRowCount(len(movement))
+        
+        for row, data in enumerate(movement):
+            self.report_table.setItem(row, 0, QTableWidgetItem(data['product_code']))
+            self.report_table.setItem(row, 1, QTableWidgetItem(data['product_name']))
+            
+            for col, key in enumerate(('opening_qty', 'inward_qty', 'outward_qty', 'closing_qty'), 2):
+                qty_item = QTableWidgetItem(f"{data[key]:g}")
+                qty_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                self.report_table.setItem(row, col, qty_item)
+            
+            if data['closing_qty'] < 0:
+                self.report_table.item(row, 5).setForeground(QColor("#e74c3c"))
+    
     def generate_payment_report(self):
         """Generate payment report"""
         from_date = self.from_date.date().toString("yyyy-MM-dd")
         to_date = self.to_date.date().toString("yyyy-MM-dd")
         
         # Get all invoices in date range
-        invoices = self.db_manager.search_invoices(start_date=from_date, end_date=to_date)
+        invoices = self.report_cache.get('sales', start_date=from_date, end_date=to_date)
+        self.current_report = ("Payment Report", 'sales', {'start_date': from_date, 'end_date': to_date})
         
         # Separate by status
         paid_invoices = [inv for inv in invoices if inv['payment_status'] == 'paid']
@@ -417,36 +690,104 @@ class ReportsModule(QWidget):
             
             self.report_table.setItem(row, 6, status_item)
     
-    def generate_customer_summary(self):
-        """Generate customer summary report"""
-        customers = self.db_manager.get_all_customers()
+    def gst_period(self):
+        """Selected date range widened to whole months, the granularity of the GST rollup"""
+        start = self.from_date.date()
+        end = self.to_date.date()
+        start = QDate(start.year(), start.month(), 1)
+        end = QDate(end.year(), end.month(), end.daysInMonth())
+        return start.toString("yyyy-MM-dd"), end.toString("yyyy-MM-dd")
+    
+    def generate_gst_report(self):
+        """Generate GST summary by month and rate"""
+        from_date, to_date = self.gst_period()
+        
+        summary = self.report_cache.get('gst', start_date=from_date, end_date=to_date)
+        self.current_report = ("GST Summary", 'gst', {'start_date': from_date, 'end_date': to_date})
+        
+        # Update summary
+        self.update_summary([
+            ("Taxable Value", f"₹{sum(r['taxable_amount'] for r in summary):,.2f}", "#3498db"),
+            ("CGST", f"₹{sum(r['cgst_amount'] for r in summary):,.2f}", "#9b59b6"),
+            ("SGST", f"₹{sum(r['sgst_amount'] for r in summary):,.2f}", "#9b59b6"),
+            ("Total Tax", f"₹{sum(r['gst_amount'] for r in summary):,.2f}", "#e74c3c")
+        ])
         
-        customer_data = []
-        total_sales = 0
-        total_due = 0
+        # Populate table
+        self.report_table.setColumnCount(7)
+        self.report_table.setHorizontalHeaderLabels([
+            "Month", "GST %", "Taxable Value", "CGST", "SGST", "Total Tax", "Invoice Value"
+        ])
+        self.report_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.report_table.setRowCount(len(summary))
         
-        for customer in customers:
-            ledger = self.db_manager.get_customer_ledger(customer['id'])
+        for row, data in enumerate(summary):
+            self.report_table.setItem(row, 0, QTableWidgetItem(data['tax_month']))
             
-            if ledger:
-                purchases = sum(t['debit'] for t in ledger)
-                paid = sum(t['credit'] for t in ledger)
-                balance = purchases - paid
-                
-                customer_data.append({
-                    'name': customer['customer_name'],
-                    'phone': customer.get('phone', '-'),
-                    'purchases': purchases,
-                    'paid': paid,
-                    'balance': balance
-                })
-                
-                total_sales += purchases
-                total_due += balance
+            rate_item = QTableWidgetItem(f"{data['gst_rate']:g}%")
+            rate_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.report_table.setItem(row, 1, rate_item)
+            
+            for col, key in enumerate(('taxable_amount', 'cgst_amount', 'sgst_amount',
+                                       'gst_amount', 'total_amount'), 2):
+                amount_item = QTableWidgetItem(f"₹{data[key]:,.2f}")
+                amount_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.report_table.setItem(row, col, amount_item)
+    
+    def generate_aging_report(self):
+        """Generate receivables aging report as of today"""
+        as_of = datetime.now().strftime('%Y-%m-%d')
+        aging = self.report_cache.get('aging', as_of=as_of)
+        self.current_report = ("Receivables Aging", 'aging', {'as_of': as_of})
+        
+        buckets = [("0-30 days", 'days_0_30'), ("31-60 days", 'days_31_60'),
+                   ("61-90 days", 'days_61_90'), ("90+ days", 'days_90_plus')]
+        colors = ["#27ae60", "#f39c12", "#e67e22", "#e74c3c"]
+        
+        # Update summary
+        self.update_summary([
+            (label, f"₹{sum(row[key] for row in aging):,.2f}", color)
+            for (label, key), color in zip(buckets, colors)
+        ] + [("Total Due", f"₹{sum(row['total_due'] for row in aging):,.2f}", "#2c3e50")])
+        
+        # Populate table
+        self.report_table.setColumnCount(8)
+        self.report_table.setHorizontalHeaderLabels(
+            ["Customer", "Invoices", "Oldest"] + [label for label, _ in buckets] + ["Total Due"]
+        )
+        self.report_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.report_table.setRowCount(len(aging))
+        
+        for row, data in enumerate(aging):
+            self.report_table.setItem(row, 0, QTableWidgetItem(data['customer_name']))
+            
+            count_item = QTableWidgetItem(str(data['invoice_count']))
+            count_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.report_table.setItem(row, 1, count_item)
+            self.report_table.setItem(row, 2, QTableWidgetItem(data['oldest_invoice_date']))
+            
+            for col, ((_, key), color) in enumerate(zip(buckets, colors), 3):
+                amount_item = QTableWidgetItem(f"₹{data[key]:,.2f}" if data[key] else "-")
+                amount_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                if data[key]:
+                    amount_item.setForeground(QColor(color))
+                self.report_table.setItem(row, col, amount_item)
+            
+            total_item = QTableWidgetItem(f"₹{data['total_due']:,.2f}")
+            total_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.report_table.setItem(row, 7, total_item)
+    
+    def generate_customer_summary(self):
+        """Generate customer summary report"""
+        customer_data = self.report_cache.get('customers')
+        self.current_report = ("Customer Summary", 'customers', {})
+        
+        total_sales = sum(data['total_purchases'] for data in customer_data)
+        total_due = sum(data['balance'] for data in customer_data)
         
         # Update summary
         self.update_summary([
-            ("Total Customers", str(len(customers)), "#3498db"),
+            ("Total Customers", str(len(customer_data)), "#3498db"),
             ("Total Sales", f"₹{total_sales:,.2f}", "#27ae60"),
             ("Total Outstanding", f"₹{total_due:,.2f}", "#e74c3c")
         ])
@@ -460,14 +801,14 @@ class ReportsModule(QWidget):
         self.report_table.setRowCount(len(customer_data))
         
         for row, data in enumerate(customer_data):
-            self.report_table.setItem(row, 0, QTableWidgetItem(data['name']))
-            self.report_table.setItem(row, 1, QTableWidgetItem(data['phone']))
+            self.report_table.setItem(row, 0, QTableWidgetItem(data['customer_name']))
+            self.report_table.setItem(row, 1, QTableWidgetItem(data['phone'] or '-'))
             
-            purchases_item = QTableWidgetItem(f"₹{data['purchases']:,.2f}")
+            purchases_item = QTableWidgetItem(f"₹{data['total_purchases']:,.2f}")
             purchases_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
             self.report_table.setItem(row, 2, purchases_item)
             
-            paid_item = QTableWidgetItem(f"₹{data['paid']:,.2f}")
+            paid_item = QTableWidgetItem(f"₹{data['total_paid']:,.2f}")
             paid_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
             paid_item.setForeground(QColor("#27ae60"))
             self.report_table.setItem(row, 3, paid_item)
@@ -477,6 +818,17 @@ class ReportsModule(QWidget):
             balance_item.setForeground(QColor("#e74c3c") if data['balance'] > 0 else QColor("#27ae60"))
             self.report_table.setItem(row, 4, balance_item)
     
+    def reload_after_restore(self):
+        """Drop every cached report and redraw the one on screen from the restored data"""
+        self.report_cache.invalidate()
+        if self.current_report:
+            self.generate_report()
+    
+    def on_report_refreshed(self, report_type, params):
+        """Redraw the report on screen when the cache rebuilt it in the background"""
+        if self.current_report == (self.report_type_combo.currentText(), report_type, params):
+            self.generate_report()
+    
     def update_summary(self, items):
         """Update summary display"""
         # Clear existing
@@ -503,18 +855,19 @@ class ReportsModule(QWidget):
         self.summary_frame.setVisible(True)
     
     def export_pdf(self):
-        """Export report to PDF"""
-        report_type = self.report_type_combo.currentText()
+        """Export the selected report to PDF, Excel or CSV straight from its query"""
+        report_type = REPORT_TYPES[self.report_type_combo.currentText()]
         
-        try:
-            pdf_gen = PDFGenerator()
-            filename = f"{report_type.replace(' ', '_').lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            
-            # For now, show success message
-            # Actual PDF generation would require implementing report-specific PDF methods
-            QMessageBox.information(self, "Export", 
-                                  f"Report export functionality will generate:\n{filename}\n\n"
-                                  "This feature requires implementing report-specific PDF templates.")
+        start_date = end_date = ""
+        if report_type in ('sales', 'product_sales', 'stock_movement', 'payments'):
+            start_date = self.from_date.date().toString("yyyy-MM-dd")
+            end_date = self.to_date.date().toString("yyyy-MM-dd")
+        elif report_type == 'gst':
+            start_date, end_date = self.gst_period()
         
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error exporting report: {str(e)}")
+        export_report(self, self.db_manager, report_type, start_date, end_date)
+    
+    def export_gst_register(self):
+        """Export invoice-wise GST for the selected months, streamed from invoice_items"""
+        start_date, end_date = self.gst_period()
+        export_report(self, self.db_manager, 'gst_invoices', start_date, end_date)
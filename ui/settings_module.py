@@ -5,11 +5,62 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QLineEdit, QMessageBox, QFrame,
                              QTabWidget, QFormLayout, QTextEdit, QFileDialog,
                              QGroupBox, QGridLayout, QTableWidget, QTableWidgetItem,
-                             QHeaderView, QDialog, QCheckBox)
-from PyQt6.QtCore import Qt
+                             QHeaderView, QDialog, QCheckBox, QProgressBar, QSpinBox,
+                             QComboBox)
+from PyQt6.QtCore import Qt, QObject, QThread, pyqtSignal
 from PyQt6.QtGui import QColor
 from datetime import datetime
 import hashlib
+import os
+
+from utils.incremental_backup import IncrementalBackupStore, BackupScheduler
+
+
+class BackupThread(QThread):
+    """Copy the live database with the SQLite backup API, then verify the copy"""
+    progress = pyqtSignal(int, str)
+    finished = pyqtSignal(dict)
+    error = pyqtSignal(str)
+    
+    def __init__(self, db_path, backup_path):
+        super().__init__()
+        self.db_path = db_path
+        self.backup_path = backup_path
+    
+    def run(self):
+        """Run backup in background"""
+        from database.db_manager import DatabaseManager
+        
+        try:
+            self.progress.emit(0, "Starting backup...")
+            
+            # SQLite connections are bound to the thread that opened them
+            db = DatabaseManager(self.db_path)
+            try:
+                def on_progress(done, total):
+                    if done == total:
+                        self.progress.emit(100, "Verifying backup...")
+                    else:
+                        self.progress.emit(int(done * 100 / total), f"Copied {done:,} of {total:,} pages")
+                
+                success = db.backup_database(self.backup_path, progress=on_progress,
+                                             is_cancelled=self.isInterruptionRequested)
+            finally:
+                db.close()
+            
+            if self.isInterruptionRequested():
+                self.finished.emit({'cancelled': True, 'output': self.backup_path})
+            elif success:
+                self.finished.emit({
+                    'cancelled': False,
+                    'output': self.backup_path,
+                    'size': os.path.getsize(self.backup_path)
+                })
+            else:
+                self.error.emit("Backup failed. The database was not changed; see the log for details.")
+        
+        except Exception as e:
+            self.error.emit(f"Error: {str(e)}")
 
 
 class UserDialog(QDialog):
@@ -181,13 +232,126 @@ class UserDialog(QDialog):
             QMessageBox.critical(self, "Error", f"Error saving user: {str(e)}")
 
 
+class IncrementalBackupThread(QThread):
+    """Take an incremental backup and apply retention, or restore one backup"""
+    progress = pyqtSignal(int, str)
+    finished = pyqtSignal(dict)
+    error = pyqtSignal(str)
+    
+    def __init__(self, db_path, store, restore_id=None):
+        super().__init__()
+        self.db_path = db_path
+        self.store = store
+        self.restore_id = restore_id
+    
+    def run(self):
+        """Run backup or restore in background"""
+        from database.db_manager import DatabaseManager
+        
+        try:
+            db = DatabaseManager(self.db_path)
+            try:
+                if self.restore_id:
+                    self.progress.emit(0, "Rebuilding backup...")
+                    if not self.store.restore(db, self.restore_id):
+                        self.error.emit("Restore failed. The database was not changed; see the log for details.")
+                        return
+                    self.finished.emit({'restored': self.restore_id})
+                    return
+                
+                def on_progress(stage, done, total):
+                    self.progress.emit(int(done * 100 / total) if total else 0, f"{stage} {done:,} of {total:,} pages")
+                
+                manifest = self.store.create(db, progress=on_progress, is_cancelled=self.isInterruptionRequested)
+            finally:
+                db.close()
+            
+            if manifest is None:
+                self.finished.emit({'cancelled': True})
+                return
+            self.progress.emit(100, "Applying retention...")
+            removed = self.store.prune()
+            self.finished.emit({'cancelled': False, 'manifest': manifest, 'removed': removed})
+        
+        except Exception as e:
+            self.error.emit(f"Error: {str(e)}")
+
+
+class ArchiveThread(QThread):
+    """Move a closed financial year into its archive database, then compact the live one"""
+    progress = pyqtSignal(int, str)
+    finished = pyqtSignal(dict)
+    error = pyqtSignal(str)
+    
+    # Progress messages from archive_financial_year, plus compaction
+    STEPS = 7
+    
+    def __init__(self, db_path, year):
+        super().__init__()
+        self.db_path = db_path
+        self.year = year
+        self.step = 0
+    
+    def on_progress(self, message):
+        """Forward a step of the archive run as a percentage"""
+        self.progress.emit(int(self.step * 100 / self.STEPS), f"{message}...")
+        self.step += 1
+    
+    def run(self):
+        """Run archiving in background"""
+        from database.db_manager import DatabaseManager
+        
+        try:
+            db = DatabaseManager(self.db_path)
+            try:
+                moved = db.archive_financial_year(self.year, progress=self.on_progress)
+                if moved is None:
+                    self.error.emit("Archiving failed. The database was not changed; see the log for details.")
+                    return
+                self.on_progress("Compacting database")
+                compacted = db.compact_database()
+            finally:
+                db.close()
+            
+            self.finished.emit({
+                'year': self.year,
+                'moved': moved,
+                'compacted': compacted,
+                'size': os.path.getsize(self.db_path)
+            })
+        
+        except Exception as e:
+            self.error.emit(f"Error: {str(e)}")
+
+
+class BackupSchedulerSignals(QObject):
+    """Carries scheduled backups from the scheduler thread to the UI thread"""
+    backup_finished = pyqtSignal(dict)
+
+
 class SettingsModule(QWidget):
     """Settings and configuration module"""
+    # Emitted after the live database has been replaced by a backup
+    database_restored = pyqtSignal()
+    
     def __init__(self, db_manager, parent=None):
         super().__init__(parent)
         self.db_manager = db_manager
+        self.backup_thread = None
+        self.incremental_thread = None
+        self.archive_thread = None
+        self.backup_store = IncrementalBackupStore()
         self.init_ui()
         self.load_settings()
+        self.load_incremental_backups()
+        self.load_archives()
+        
+        # Incremental backups run on their own once the database goes idle
+        self.backup_signals = BackupSchedulerSignals()
+        self.backup_signals.backup_finished.connect(self.on_scheduled_backup)
+        self.backup_scheduler = BackupScheduler(db_manager, self.backup_store)
+        self.backup_scheduler.add_listener(self.backup_signals.backup_finished.emit)
+        self.backup_scheduler.start()
     
     def init_ui(self):
         """Initialize UI"""
@@ -235,8 +399,9 @@ class SettingsModule(QWidget):
         tabs.addTab(users_tab, "👥 Users")
         
         # Backup & Restore Tab
-        backup_tab = self.create_backup_tab()
-        tabs.addTab(backup_tab, "💾 Backup")
+        self.backup_tab = self.create_backup_tab()
+        tabs.addTab(self.backup_tab, "💾 Backup")
+        self.tabs = tabs
         
         # About Tab
         about_tab = self.create_about_tab()
@@ -291,6 +456,13 @@ class SettingsModule(QWidget):
         self.tax_enabled_check.setChecked(True)
         form_layout.addRow("", self.tax_enabled_check)
         
+        # Invoice Renderer
+        self.invoice_renderer_combo = QComboBox()
+        self.invoice_renderer_combo.addItem("Fast (single-page invoices drawn directly)", 'canvas')
+        self.invoice_renderer_combo.addItem("Flowing layout (platypus)", 'platypus')
+        self.invoice_renderer_combo.setToolTip("Invoices that don't fit one page always use the flowing layout")
+        form_layout.addRow("Invoice PDF Layout:", self.invoice_renderer_combo)
+        
         form_group.setLayout(form_layout)
         layout.addWidget(form_group)
         
@@ -399,8 +571,8 @@ class SettingsModule(QWidget):
         backup_btn_layout = QHBoxLayout()
         backup_btn_layout.addStretch()
         
-        backup_btn = QPushButton("📥 Create Backup")
-        backup_btn.setStyleSheet("""
+        self.backup_btn = QPushButton("📥 Create Backup")
+        self.backup_btn.setStyleSheet("""
             QPushButton {
                 background-color: #3498db;
                 color: white;
@@ -412,14 +584,147 @@ class SettingsModule(QWidget):
                 background-color: #2980b9;
             }
         """)
-        backup_btn.clicked.connect(self.backup_database)
-        backup_btn_layout.addWidget(backup_btn)
+        self.backup_btn.clicked.connect(self.backup_database)
+        backup_btn_layout.addWidget(self.backup_btn)
+        
+        self.cancel_backup_btn = QPushButton("Cancel")
+        self.cancel_backup_btn.clicked.connect(self.cancel_backup)
+        self.cancel_backup_btn.setVisible(False)
+        backup_btn_layout.addWidget(self.cancel_backup_btn)
         
         backup_layout.addLayout(backup_btn_layout)
         
+        self.backup_status_label = QLabel("")
+        self.backup_status_label.setStyleSheet("color: #7f8c8d;")
+        backup_layout.addWidget(self.backup_status_label)
+        
+        self.backup_progress = QProgressBar()
+        self.backup_progress.setRange(0, 100)
+        self.backup_progress.setVisible(False)
+        backup_layout.addWidget(self.backup_progress)
+        
         backup_group.setLayout(backup_layout)
         layout.addWidget(backup_group)
         
+        # Automatic incremental backups
+        auto_group = QGroupBox("🕒 Automatic Backups")
+        auto_layout = QVBoxLayout()
+        
+        auto_info = QLabel(
+            "Backs up only what changed since the last backup, compressed, "
+            "when the application has been idle for a few minutes.\n"
+            f"Backups are kept in: {os.path.abspath(self.backup_store.backup_dir)}"
+        )
+        auto_info.setWordWrap(True)
+        auto_info.setStyleSheet("color: #7f8c8d; padding: 10px;")
+        auto_layout.addWidget(auto_info)
+        
+        config = self.backup_store.load_config()
+        schedule_layout = QHBoxLayout()
+        
+        self.auto_backup_check = QCheckBox("Back up every")
+        self.auto_backup_check.setChecked(config['enabled'])
+        schedule_layout.addWidget(self.auto_backup_check)
+        
+        self.backup_interval_spin = QSpinBox()
+        self.backup_interval_spin.setRange(1, 168)
+        self.backup_interval_spin.setSuffix(" hours")
+        self.backup_interval_spin.setValue(config['interval_hours'])
+        schedule_layout.addWidget(self.backup_interval_spin)
+        
+        schedule_layout.addSpacing(20)
+        schedule_layout.addWidget(QLabel("Keep:"))
+        self.retention_spins = {}
+        for key, label in (('daily', "daily"), ('weekly', "weekly"), ('monthly', "monthly")):
+            spin = QSpinBox()
+            spin.setRange(0, 365)
+            spin.setSuffix(f" {label}")
+            spin.setValue(config[key])
+            schedule_layout.addWidget(spin)
+            self.retention_spins[key] = spin
+        
+        schedule_layout.addStretch()
+        
+        save_schedule_btn = QPushButton("Save Schedule")
+        save_schedule_btn.clicked.connect(self.save_backup_schedule)
+        schedule_layout.addWidget(save_schedule_btn)
+        
+        auto_layout.addLayout(schedule_layout)
+        
+        self.incremental_table = QTableWidget()
+        self.incremental_table.setColumnCount(4)
+        self.incremental_table.setHorizontalHeaderLabels(["Taken", "Type", "Pages Stored", "Size"])
+        self.incremental_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.incremental_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.incremental_table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        self.incremental_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.incremental_table.setMaximumHeight(200)
+        auto_layout.addWidget(self.incremental_table)
+        
+        auto_btn_layout = QHBoxLayout()
+        
+        self.incremental_status_label = QLabel("")
+        self.incremental_status_label.setStyleSheet("color: #7f8c8d;")
+        auto_btn_layout.addWidget(self.incremental_status_label)
+        
+        auto_btn_layout.addStretch()
+        
+        self.backup_now_btn = QPushButton("Back Up Now")
+        self.backup_now_btn.clicked.connect(self.run_incremental_backup)
+        auto_btn_layout.addWidget(self.backup_now_btn)
+        
+        self.restore_point_btn = QPushButton("Restore Selected")
+        self.restore_point_btn.clicked.connect(self.restore_incremental_backup)
+        auto_btn_layout.addWidget(self.restore_point_btn)
+        
+        auto_layout.addLayout(auto_btn_layout)
+        
+        auto_group.setLayout(auto_layout)
+        layout.addWidget(auto_group)
+        
+        # Yearly archives
+        archive_group = QGroupBox("🗄️ Yearly Archives")
+        archive_layout = QVBoxLayout()
+        
+        archive_info = QLabel(
+            "Move settled invoices and stock history of closed financial years into one "
+            "file per year, so the live database stays small and quick to back up.\n"
+            "Reports covering archived years still include them. Unpaid invoices stay live. "
+            "Back up the archives folder once after archiving; later backups leave it out."
+        )
+        archive_info.setWordWrap(True)
+        archive_info.setStyleSheet("color: #7f8c8d; padding: 10px;")
+        archive_layout.addWidget(archive_info)
+        
+        self.archives_table = QTableWidget()
+        self.archives_table.setColumnCount(5)
+        self.archives_table.setHorizontalHeaderLabels(
+            ["Financial Year", "Invoices", "Payments", "Stock Transactions", "File"])
+        self.archives_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.archives_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.archives_table.setMaximumHeight(150)
+        archive_layout.addWidget(self.archives_table)
+        
+        archive_btn_layout = QHBoxLayout()
+        
+        self.archive_status_label = QLabel("")
+        self.archive_status_label.setStyleSheet("color: #7f8c8d;")
+        archive_btn_layout.addWidget(self.archive_status_label)
+        
+        archive_btn_layout.addStretch()
+        
+        self.archive_year_combo = QComboBox()
+        archive_btn_layout.addWidget(self.archive_year_combo)
+        
+        self.archive_btn = QPushButton("Archive Year")
+        self.archive_btn.clicked.connect(self.archive_year)
+        archive_btn_layout.addWidget(self.archive_btn)
+        
+        archive_layout.addLayout(archive_btn_layout)
+        
+        archive_group.setLayout(archive_layout)
+        layout.addWidget(archive_group)
+        
         # Restore section
         restore_group = QGroupBox("📤 Restore Database")
         restore_layout = QVBoxLayout()
@@ -528,6 +833,8 @@ class SettingsModule(QWidget):
             self.company_gstin_input.setText(company.get('gstin', ''))
             self.invoice_prefix_input.setText(company.get('invoice_prefix', 'INV'))
             self.tax_enabled_check.setChecked(company.get('tax_enabled', 1) == 1)
+            renderer_index = self.invoice_renderer_combo.findData(company.get('invoice_renderer') or 'canvas')
+            self.invoice_renderer_combo.setCurrentIndex(max(renderer_index, 0))
         
         # Load users
         self.load_users()
@@ -581,7 +888,8 @@ class SettingsModule(QWidget):
             'email': self.company_email_input.text().strip(),
             'gstin': self.company_gstin_input.text().strip(),
             'invoice_prefix': self.invoice_prefix_input.text().strip() or 'INV',
-            'tax_enabled': 1 if self.tax_enabled_check.isChecked() else 0
+            'tax_enabled': 1 if self.tax_enabled_check.isChecked() else 0,
+            'invoice_renderer': self.invoice_renderer_combo.currentData()
         }
         
         try:
@@ -604,19 +912,243 @@ class SettingsModule(QWidget):
         if dialog.exec() == QDialog.DialogCode.Accepted:
             self.load_users()
     
+    def show_backup_tab(self):
+        """Bring the backup tab to the front"""
+        self.tabs.setCurrentWidget(self.backup_tab)
+    
     def backup_database(self):
-        """Backup database"""
+        """Backup database in the background; billing stays usable meanwhile"""
+        if self.backup_thread and self.backup_thread.isRunning():
+            return
+        
         default_name = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
         file_path, _ = QFileDialog.getSaveFileName(
             self, "Backup Database", default_name, "Database Files (*.db)"
         )
         
         if file_path:
-            if self.db_manager.backup_database(file_path):
-                QMessageBox.information(self, "Success", 
-                                      f"Database backed up successfully!\n\nSaved to:\n{file_path}")
-            else:
-                QMessageBox.critical(self, "Error", "Failed to backup database")
+            self.backup_btn.setEnabled(False)
+            self.cancel_backup_btn.setEnabled(True)
+            self.cancel_backup_btn.setVisible(True)
+            self.backup_progress.setValue(0)
+            self.backup_progress.setVisible(True)
+            
+            self.backup_thread = BackupThread(self.db_manager.db_path, file_path)
+            self.backup_thread.progress.connect(self.update_backup_progress)
+            self.backup_thread.finished.connect(self.backup_finished)
+            self.backup_thread.error.connect(self.backup_failed)
+            self.backup_thread.start()
+    
+    def update_backup_progress(self, value, message):
+        """Update backup progress"""
+        self.backup_progress.setValue(value)
+        self.backup_status_label.setText(message)
+    
+    def cancel_backup(self):
+        """Stop the backup after the step in progress; the partial copy is discarded"""
+        if self.backup_thread and self.backup_thread.isRunning():
+            self.backup_status_label.setText("Cancelling...")
+            self.cancel_backup_btn.setEnabled(False)
+            self.backup_thread.requestInterruption()
+    
+    def reset_backup_ui(self):
+        """Return the backup tab to idle"""
+        self.backup_btn.setEnabled(True)
+        self.cancel_backup_btn.setVisible(False)
+        self.backup_progress.setVisible(False)
+    
+    def backup_finished(self, result):
+        """Report the result"""
+        self.reset_backup_ui()
+        if result['cancelled']:
+            self.backup_status_label.setText("Backup cancelled")
+            return
+        
+        size_mb = result['size'] / (1024 * 1024)
+        self.backup_status_label.setText(
+            f"Last backup: {datetime.now().strftime('%Y-%m-%d %H:%M')} ({size_mb:,.1f} MB, integrity check passed)"
+        )
+        QMessageBox.information(self, "Success", 
+                              f"Database backed up successfully!\n\nSaved to:\n{result['output']}")
+    
+    def backup_failed(self, message):
+        """Show errors"""
+        self.reset_backup_ui()
+        self.backup_status_label.setText("Backup failed")
+        QMessageBox.critical(self, "Error", message)
+    
+    def save_backup_schedule(self):
+        """Save the automatic backup schedule and retention"""
+        config = self.backup_store.load_config()
+        config['enabled'] = self.auto_backup_check.isChecked()
+        config['interval_hours'] = self.backup_interval_spin.value()
+        for key, spin in self.retention_spins.items():
+            config[key] = spin.value()
+        
+        try:
+            self.backup_store.save_config(config)
+            QMessageBox.information(self, "Success", "Backup schedule saved!\n\n"
+                                    "Older backups outside the new retention are removed after the next backup.")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to save backup schedule: {str(e)}")
+    
+    def load_incremental_backups(self):
+        """List incremental backups, newest first"""
+        backups = list(reversed(self.backup_store.list_backups()))
+        self.incremental_table.setRowCount(len(backups))
+        
+        for row, backup in enumerate(backups):
+            taken = QTableWidgetItem(backup['created'].replace('T', ' '))
+            taken.setData(Qt.ItemDataRole.UserRole, backup['id'])
+            self.incremental_table.setItem(row, 0, taken)
+            self.incremental_table.setItem(row, 1, QTableWidgetItem(backup['kind'].title()))
+            self.incremental_table.setItem(row, 2, QTableWidgetItem(
+                f"{backup['pages_stored']:,} of {backup['page_count']:,}"))
+            self.incremental_table.setItem(row, 3, QTableWidgetItem(
+                f"{backup['stored_bytes'] / (1024 * 1024):,.1f} MB"))
+        
+        if backups:
+            total = sum(b['stored_bytes'] for b in backups) / (1024 * 1024)
+            self.incremental_status_label.setText(f"{len(backups)} backup(s), {total:,.1f} MB on disk")
+        else:
+            self.incremental_status_label.setText("No automatic backups yet")
+    
+    def on_scheduled_backup(self, manifest):
+        """Refresh the list after the scheduler has taken a backup"""
+        self.load_incremental_backups()
+    
+    def start_incremental_thread(self, restore_id=None):
+        """Run an incremental backup or restore in the background"""
+        self.backup_now_btn.setEnabled(False)
+        self.restore_point_btn.setEnabled(False)
+        
+        self.incremental_thread = IncrementalBackupThread(self.db_manager.db_path, self.backup_store, restore_id)
+        self.incremental_thread.progress.connect(
+            lambda value, message: self.incremental_status_label.setText(message))
+        self.incremental_thread.finished.connect(self.incremental_finished)
+        self.incremental_thread.error.connect(self.incremental_failed)
+        self.incremental_thread.start()
+    
+    def run_incremental_backup(self):
+        """Take an incremental backup now"""
+        if self.incremental_thread and self.incremental_thread.isRunning():
+            return
+        self.start_incremental_thread()
+    
+    def restore_incremental_backup(self):
+        """Restore the database to the selected backup"""
+        if self.incremental_thread and self.incremental_thread.isRunning():
+            return
+        
+        row = self.incremental_table.currentRow()
+        if row < 0:
+            QMessageBox.warning(self, "Warning", "Please select a backup to restore")
+            return
+        
+        item = self.incremental_table.item(row, 0)
+        reply = QMessageBox.warning(
+            self, "⚠️ Confirm Restore",
+            f"This will replace ALL current data with the backup taken {item.text()}!\n\n"
+            "Are you absolutely sure you want to continue?\n\n"
+            "Take a backup first if you may need today's data.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+        )
+        
+        if reply == QMessageBox.StandardButton.Yes:
+            self.start_incremental_thread(item.data(Qt.ItemDataRole.UserRole))
+    
+    def incremental_finished(self, result):
+        """Report the result"""
+        self.backup_now_btn.setEnabled(True)
+        self.restore_point_btn.setEnabled(True)
+        self.load_incremental_backups()
+        
+        if result.get('restored'):
+            self.database_restored.emit()
+            QMessageBox.information(self, "Success",
+                                    "Database restored successfully!\n\n"
+                                    "All screens now show the restored data.")
+        elif not result['cancelled']:
+            manifest = result['manifest']
+            QMessageBox.information(self, "Success",
+                                    f"{manifest['kind'].title()} backup taken: "
+                                    f"{manifest['pages_stored']:,} changed pages, "
+                                    f"{manifest['stored_bytes'] / (1024 * 1024):,.1f} MB.")
+    
+    def incremental_failed(self, message):
+        """Show errors"""
+        self.backup_now_btn.setEnabled(True)
+        self.restore_point_btn.setEnabled(True)
+        self.load_incremental_backups()
+        QMessageBox.critical(self, "Error", message)
+    
+    def load_archives(self):
+        """List archived financial years and offer the closed ones not archived yet"""
+        archives = self.db_manager.get_archives()
+        self.archives_table.setRowCount(len(archives))
+        
+        for row, archive in enumerate(archives):
+            self.archives_table.setItem(row, 0, QTableWidgetItem(archive['financial_year']))
+            self.archives_table.setItem(row, 1, QTableWidgetItem(f"{archive['invoice_count']:,}"))
+            self.archives_table.setItem(row, 2, QTableWidgetItem(f"{archive['payment_count']:,}"))
+            self.archives_table.setItem(row, 3, QTableWidgetItem(f"{archive['stock_transaction_count']:,}"))
+            self.archives_table.setItem(row, 4, QTableWidgetItem(archive['file_path']))
+        
+        self.archive_year_combo.clear()
+        for year in self.db_manager.get_archivable_years():
+            self.archive_year_combo.addItem(self.db_manager.financial_year_label(year), year)
+        self.archive_btn.setEnabled(self.archive_year_combo.count() > 0)
+        
+        if self.archive_year_combo.count() == 0:
+            self.archive_status_label.setText("No closed financial years left to archive")
+        else:
+            self.archive_status_label.setText(f"{len(archives)} year(s) archived")
+    
+    def archive_year(self):
+        """Archive the selected financial year in the background"""
+        if self.archive_thread and self.archive_thread.isRunning():
+            return
+        
+        year = self.archive_year_combo.currentData()
+        if year is None:
+            return
+        
+        label = self.archive_year_combo.currentText()
+        reply = QMessageBox.question(
+            self, "Confirm Archive",
+            f"Move the settled invoices and stock transactions of {label} into an archive file?\n\n"
+            "Billing is paused for a moment while the rows are removed from the live database.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        
+        if reply == QMessageBox.StandardButton.Yes:
+            self.archive_btn.setEnabled(False)
+            
+            self.archive_thread = ArchiveThread(self.db_manager.db_path, year)
+            self.archive_thread.progress.connect(
+                lambda value, message: self.archive_status_label.setText(message))
+            self.archive_thread.finished.connect(self.archive_finished)
+            self.archive_thread.error.connect(self.archive_failed)
+            self.archive_thread.start()
+    
+    def archive_finished(self, result):
+        """Report the result"""
+        self.load_archives()
+        moved = result['moved']
+        message = (f"Archived {self.db_manager.financial_year_label(result['year'])}: "
+                   f"{moved['invoices']:,} invoices, {moved['payments']:,} payments and "
+                   f"{moved['stock_transactions']:,} stock transactions.\n\n")
+        if result['compacted']:
+            message += f"The live database is now {result['size'] / (1024 * 1024):,.1f} MB."
+        else:
+            message += "The live database could not be compacted, so its file has not shrunk yet; see the log for details."
+        QMessageBox.information(self, "Success", message)
+    
+    def archive_failed(self, message):
+        """Show errors"""
+        self.load_archives()
+        QMessageBox.critical(self, "Error", message)
     
     def restore_database(self):
         """Restore database"""
@@ -625,6 +1157,11 @@ class SettingsModule(QWidget):
         )
         
         if file_path:
+            problem = self.db_manager.validate_backup(file_path)
+            if problem:
+                QMessageBox.critical(self, "Error", f"Cannot restore this file:\n\n{problem}")
+                return
+            
             reply = QMessageBox.warning(
                 self, "⚠️ Confirm Restore",
                 "This will replace ALL current data with the backup!\n\n"
@@ -636,8 +1173,9 @@ class SettingsModule(QWidget):
             
             if reply == QMessageBox.StandardButton.Yes:
                 if self.db_manager.restore_database(file_path):
+                    self.database_restored.emit()
                     QMessageBox.information(self, "Success", 
                                           "Database restored successfully!\n\n"
-                                          "Please restart the application for changes to take effect.")
+                                          "All screens now show the restored data.")
                 else:
                     QMessageBox.critical(self, "Error", "Failed to restore database")
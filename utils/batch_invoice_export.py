@@ -0,0 +1,38 @@
+"""
+Batch Invoice Export - Re-render many invoice PDFs in parallel worker processes
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.pdf_generator import PDFGenerator
+from utils.batch_render import ParallelPDFBatch
+
+
+def render_invoice(company_settings: Dict, invoice: Dict, items: List[Dict], output_path: str) -> bool:
+    """Worker entry point; each process keeps its own cached invoice template"""
+    return PDFGenerator(company_settings).generate_invoice_pdf(invoice, items, output_path)
+
+
+class BatchInvoiceExporter:
+    """Render a prefetched set of invoices to a folder or to one merged PDF"""
+
+    def __init__(self, company_settings: Dict, workers: Optional[int] = None):
+        self.company_settings = company_settings
+        self.batch = ParallelPDFBatch(workers)
+
+    def export(self, invoices: List[Tuple[Dict, List[Dict]]], output_dir: str = None,
+               merged_path: str = None,
+               progress: Optional[Callable[[int, int, str], None]] = None,
+               is_cancelled: Optional[Callable[[], bool]] = None) -> Dict:
+        """
+        Render invoices from ``DatabaseManager.get_invoices_with_items``
+
+        Writes ``<output_dir>/<invoice_number>.pdf`` per invoice, or, when
+        ``merged_path`` is given, one PDF in invoice order. See
+        ``ParallelPDFBatch.run`` for progress and cancellation.
+        """
+        jobs = (
+            (invoice['invoice_number'], f"{invoice['invoice_number']}.pdf", render_invoice,
+             (self.company_settings, invoice, items))
+            for invoice, items in invoices
+        )
+        return self.batch.run(jobs, len(invoices), output_dir, merged_path, progress, is_cancelled)
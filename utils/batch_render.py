@@ -0,0 +1,124 @@
+"""
+Batch Render - Run PDF render jobs in parallel worker processes
+Output goes to a folder, or to one merged PDF in job order
+"""
+import itertools
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterable, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Jobs in flight per worker; keeps cancellation quick and memory flat
+JOBS_PER_WORKER = 2
+
+# (label, file_name, render_function, args); render_function(*args, output_path) -> bool
+RenderJob = Tuple[str, str, Callable[..., bool], tuple]
+
+
+def default_workers() -> int:
+    """Leave one core for the UI"""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+class ParallelPDFBatch:
+    """Render a stream of PDF jobs with a bounded process pool"""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or default_workers()
+
+    def run(self, jobs: Iterable[RenderJob], total: int = 0, output_dir: str = None,
+            merged_path: str = None,
+            progress: Optional[Callable[[int, int, str], None]] = None,
+            is_cancelled: Optional[Callable[[], bool]] = None) -> Dict:
+        """
+        Render every job into ``output_dir``, or merge them into ``merged_path``
+
+        ``jobs`` is consumed lazily, so it can be a generator that is still
+        reading from the database. ``render_function`` must be a module-level
+        function so it can be sent to the worker processes.
+        ``progress(done, total, label)`` is called as each job finishes;
+        ``total`` is only passed through for display. ``is_cancelled()`` is
+        polled between jobs and stops the batch without starting new work.
+        """
+        if not output_dir and not merged_path:
+            raise ValueError("Either output_dir or merged_path is required")
+
+        work_dir = tempfile.mkdtemp(prefix="pdf_batch_") if merged_path else output_dir
+        os.makedirs(work_dir, exist_ok=True)
+
+        paths = []
+        rendered = []
+        failed = []
+        cancelled = False
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                queue = iter(jobs)
+                running = {}
+
+                def submit_more():
+                    for label, file_name, render, args in itertools.islice(
+                            queue, self.workers * JOBS_PER_WORKER - len(running)):
+                        path = os.path.join(work_dir, file_name)
+                        paths.append(path)
+                        rendered.append(False)
+                        future = executor.submit(render, *args, path)
+                        running[future] = (len(paths) - 1, label)
+
+                submit_more()
+                done_count = 0
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        idx, label = running.pop(future)
+                        try:
+                            rendered[idx] = future.result()
+                        except Exception as e:
+                            logger.warning(f"Rendering {label} failed: {e}")
+                        if not rendered[idx]:
+                            failed.append(label)
+
+                        done_count += 1
+                        if progress:
+                            progress(done_count, max(total, done_count), label)
+
+                    if is_cancelled and is_cancelled():
+                        cancelled = True
+                        for future in running:
+                            future.cancel()
+                        break
+
+                    submit_more()
+
+            output = output_dir
+            if merged_path and not cancelled:
+                self._merge([path for path, ok in zip(paths, rendered) if ok], merged_path)
+                output = merged_path
+        finally:
+            if merged_path:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        return {
+            'total': len(paths),
+            'rendered': sum(rendered),
+            'failed': failed,
+            'cancelled': cancelled,
+            'output': output,
+        }
+
+    @staticmethod
+    def _merge(paths, merged_path: str):
+        """Concatenate rendered PDFs in job order"""
+        from PyPDF2 import PdfWriter
+
+        writer = PdfWriter()
+        for path in paths:
+            writer.append(path)
+
+        with open(merged_path, 'wb') as f:
+            writer.write(f)
+        writer.close()
@@ -0,0 +1,98 @@
+"""
+Customer Statements - Bulk statements for every customer with an outstanding balance
+"""
+import itertools
+import re
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from utils.pdf_generator import PDFGenerator
+from utils.batch_render import ParallelPDFBatch
+
+
+def iter_statements(entries: Iterable[Dict]) -> Iterator[Tuple[Dict, Dict]]:
+    """
+    Group ``DatabaseManager.iter_statement_entries`` rows into (customer, ledger) pairs
+
+    Single pass: relies on the rows being ordered by customer, so only one
+    customer's entries are held at a time. The ledger dict has the shape
+    ``PDFGenerator.generate_customer_ledger_pdf`` expects, plus payments.
+    """
+    for customer_id, rows in itertools.groupby(entries, key=itemgetter('customer_id')):
+        customer = None
+        invoices = []
+        payments = []
+
+        for row in rows:
+            if customer is None:
+                customer = {
+                    'id': customer_id,
+                    'customer_name': row['customer_name'],
+                    'phone': row['phone'],
+                    'email': row['email'],
+                    'address': row['address'],
+                }
+
+            if row['entry_type'] == 'invoice':
+                invoices.append({
+                    'invoice_date': row['entry_date'],
+                    'invoice_number': row['invoice_number'],
+                    'grand_total': row['grand_total'],
+                    'amount_paid': row['amount_paid'],
+                    'balance_amount': row['balance_amount'],
+                    'payment_status': row['payment_status'],
+                })
+            else:
+                payments.append({
+                    'payment_date': row['entry_date'],
+                    'invoice_number': row['invoice_number'],
+                    'amount': row['amount'],
+                    'payment_mode': row['payment_mode'],
+                    'reference_number': row['reference_number'],
+                })
+
+        yield customer, {
+            'invoices': invoices,
+            'payments': payments,
+            'total_purchases': sum(inv['grand_total'] for inv in invoices),
+            'total_paid': sum(inv['amount_paid'] for inv in invoices),
+            'total_due': sum(inv['balance_amount'] for inv in invoices),
+        }
+
+
+def render_statement(company_settings: Dict, customer: Dict, ledger: Dict, output_path: str) -> bool:
+    """Worker entry point for one customer statement"""
+    return PDFGenerator(company_settings).generate_customer_ledger_pdf(customer, ledger, output_path)
+
+
+def statement_file_name(customer: Dict) -> str:
+    """Per-customer file name; the ID keeps namesakes apart"""
+    safe_name = re.sub(r'[^\w-]+', '_', customer['customer_name']).strip('_')
+    return f"statement_{customer['id']}_{safe_name}.pdf"
+
+
+class CustomerStatementBatch:
+    """Render statements for all customers with a balance, in parallel"""
+
+    def __init__(self, db_manager, workers: Optional[int] = None):
+        self.db_manager = db_manager
+        self.batch = ParallelPDFBatch(workers)
+
+    def export(self, output_dir: str = None, merged_path: str = None, min_balance: float = 0.01,
+               progress: Optional[Callable[[int, int, str], None]] = None,
+               is_cancelled: Optional[Callable[[], bool]] = None) -> Dict:
+        """
+        Stream statement data from the database straight into the worker pool
+
+        Must run on the thread that owns ``db_manager``'s connection.
+        """
+        company = self.db_manager.get_company_settings()
+        total = self.db_manager.count_customers_with_balance(min_balance)
+
+        entries = self.db_manager.iter_statement_entries(min_balance)
+        jobs = (
+            (customer['customer_name'], statement_file_name(customer), render_statement,
+             (company, customer, ledger))
+            for customer, ledger in iter_statements(entries)
+        )
+        return self.batch.run(jobs, total, output_dir, merged_path, progress, is_cancelled)
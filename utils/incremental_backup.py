@@ -0,0 +1,451 @@
+"""
+Incremental Backups - Compressed page-level backups with retention
+
+Each run takes a consistent copy of the database through the SQLite
+backup API, hashes its pages and stores only the pages that changed since
+the previous backup, gzip-compressed. The first run, and every
+FULL_EVERY-th after it, stores every page. Any backup can be rebuilt into
+a database file for point-in-time restore by applying its chain in order.
+
+A backup is three files in the backup folder:
+    <id>.json     manifest (kind, parent, page size and count, sizes)
+    <id>.pages    gzip stream of (page number, page) records, ascending
+    <id>.hashes   16-byte digest of every page, for the next run to diff against
+
+Retention keeps the newest backup of each of the last N days, weeks and
+months. Expired backups are folded into the backup that follows them, so
+chains stay restorable. BackupScheduler runs a backup once a day when the
+database has been idle for a while.
+"""
+import gzip
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKUP_DIR = "backups"
+CONFIG_FILE = "backup_config.json"
+
+DEFAULT_CONFIG = {
+    'enabled': True,
+    'daily': 7,
+    'weekly': 4,
+    'monthly': 12,
+    'interval_hours': 24,
+}
+
+# A new full backup starts a chain after this many incrementals
+FULL_EVERY = 30
+
+# Seconds without a committed write before a due backup runs
+IDLE_SECONDS = 300
+
+# How often the scheduler checks whether a backup is due
+CHECK_SECONDS = 60
+
+DIGEST_SIZE = 16
+PAGE_HEADER = struct.Struct(">I")
+COMPRESS_LEVEL = 6
+
+
+def page_digest(page: bytes) -> bytes:
+    return hashlib.blake2b(page, digest_size=DIGEST_SIZE).digest()
+
+
+def retained_ids(backups: List[Dict], config: Dict, now: datetime = None) -> set:
+    """
+    IDs kept by the daily/weekly/monthly policy
+
+    The newest backup in each of the last ``daily`` days, ``weekly`` ISO
+    weeks and ``monthly`` months is kept, as is the newest backup overall.
+    """
+    now = now or datetime.now()
+    keep = set()
+    if backups:
+        keep.add(backups[-1]['id'])
+
+    periods = (
+        ('daily', lambda d: d.date()),
+        ('weekly', lambda d: d.isocalendar()[:2]),
+        ('monthly', lambda d: (d.year, d.month)),
+    )
+    for name, period_of in periods:
+        count = config.get(name, 0)
+        if count <= 0:
+            continue
+        if name == 'daily':
+            oldest = period_of(now - timedelta(days=count - 1))
+        elif name == 'weekly':
+            oldest = period_of(now - timedelta(weeks=count - 1))
+        else:
+            months = now.year * 12 + now.month - 1 - (count - 1)
+            oldest = (months // 12, months % 12 + 1)
+
+        newest_per_period = {}
+        for backup in backups:
+            period = period_of(datetime.fromisoformat(backup['created']))
+            if period >= oldest:
+                newest_per_period[period] = backup['id']
+        keep.update(newest_per_period.values())
+    return keep
+
+
+class IncrementalBackupStore:
+    """A folder of page-level backup chains"""
+
+    def __init__(self, backup_dir: str = DEFAULT_BACKUP_DIR):
+        self.backup_dir = backup_dir
+        os.makedirs(backup_dir, exist_ok=True)
+        # Creating, pruning and restoring don't overlap
+        self._lock = threading.Lock()
+
+    # ==================== CONFIG ====================
+
+    def load_config(self) -> Dict:
+        """Retention and schedule settings; kept with the backups so a restore doesn't change them"""
+        config = dict(DEFAULT_CONFIG)
+        try:
+            with open(os.path.join(self.backup_dir, CONFIG_FILE), encoding='utf-8') as f:
+                config.update(json.load(f))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable backup config: {e}")
+        return config
+
+    def save_config(self, config: Dict):
+        """Save retention and schedule settings"""
+        path = os.path.join(self.backup_dir, CONFIG_FILE)
+        with open(path + ".part", 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=2)
+        os.replace(path + ".part", path)
+
+    # ==================== LISTING ====================
+
+    def list_backups(self) -> List[Dict]:
+        """Manifests of all backups, oldest first"""
+        backups = []
+        for name in os.listdir(self.backup_dir):
+            if name.endswith(".json") and name != CONFIG_FILE:
+                try:
+                    with open(os.path.join(self.backup_dir, name), encoding='utf-8') as f:
+                        backups.append(json.load(f))
+                except Exception as e:
+                    logger.warning(f"Skipping unreadable backup manifest {name}: {e}")
+        return sorted(backups, key=lambda b: b['created'])
+
+    def chain(self, backup_id: str) -> List[Dict]:
+        """The full backup a backup depends on, then each incremental up to it"""
+        manifests = {b['id']: b for b in self.list_backups()}
+        chain = []
+        current = manifests.get(backup_id)
+        while current:
+            chain.append(current)
+            if current['kind'] == 'full':
+                return list(reversed(chain))
+            current = manifests.get(current['parent'])
+        raise FileNotFoundError(f"Backup chain for {backup_id} is incomplete")
+
+    def _path(self, backup_id: str, extension: str) -> str:
+        return os.path.join(self.backup_dir, f"{backup_id}{extension}")
+
+    # ==================== CREATE ====================
+
+    def create(self, db_manager, progress: Callable[[str, int, int], None] = None,
+               is_cancelled: Callable[[], bool] = None) -> Optional[Dict]:
+        """
+        Back up the database behind db_manager; returns the new manifest
+
+        Returns None if cancelled. progress is called as (stage, done, total).
+        """
+        with self._lock:
+            fd, snapshot_path = tempfile.mkstemp(suffix=".db", dir=self.backup_dir)
+            os.close(fd)
+            try:
+                def on_copy(done, total):
+                    if progress:
+                        progress("Copying", done, total)
+
+                if not db_manager.backup_database(snapshot_path, progress=on_copy, is_cancelled=is_cancelled):
+                    if is_cancelled and is_cancelled():
+                        return None
+                    raise RuntimeError("Could not take a consistent copy of the database")
+                return self._store(snapshot_path, progress, is_cancelled)
+            finally:
+                if os.path.exists(snapshot_path):
+                    os.remove(snapshot_path)
+
+    def _store(self, snapshot_path: str, progress, is_cancelled) -> Optional[Dict]:
+        """Diff a verified snapshot against the latest backup and write the changed pages"""
+        with open(snapshot_path, 'rb') as f:
+            header = f.read(100)
+        page_size = struct.unpack(">H", header[16:18])[0]
+        page_size = 65536 if page_size == 1 else page_size
+        page_count = os.path.getsize(snapshot_path) // page_size
+
+        backups = self.list_backups()
+        parent = backups[-1] if backups else None
+        if parent and (parent['page_size'] != page_size or len(self.chain(parent['id'])) > FULL_EVERY):
+            parent = None
+        previous = self._read_hashes(parent['id']) if parent else []
+
+        created = datetime.now()
+        backup_id = created.strftime("%Y%m%d_%H%M%S")
+        while os.path.exists(self._path(backup_id, ".json")):
+            created += timedelta(seconds=1)
+            backup_id = created.strftime("%Y%m%d_%H%M%S")
+
+        pages_path = self._path(backup_id, ".pages")
+        hashes_path = self._path(backup_id, ".hashes")
+        stored = 0
+        try:
+            with open(snapshot_path, 'rb') as source, \
+                    gzip.open(pages_path + ".part", 'wb', compresslevel=COMPRESS_LEVEL) as pages, \
+                    open(hashes_path + ".part", 'wb') as hashes:
+                for index in range(page_count):
+                    if is_cancelled and is_cancelled():
+                        return None
+                    page = source.read(page_size)
+                    digest = page_digest(page)
+                    hashes.write(digest)
+                    if index >= len(previous) or previous[index] != digest:
+                        pages.write(PAGE_HEADER.pack(index + 1))
+                        pages.write(page)
+                        stored += 1
+                    if progress and index % 1024 == 0:
+                        progress("Compressing", index, page_count)
+
+            os.replace(pages_path + ".part", pages_path)
+            os.replace(hashes_path + ".part", hashes_path)
+            # Only the newest backup's hashes are ever diffed against
+            if backups and os.path.exists(self._path(backups[-1]['id'], ".hashes")):
+                os.remove(self._path(backups[-1]['id'], ".hashes"))
+        finally:
+            for path in (pages_path + ".part", hashes_path + ".part"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        manifest = {
+            'id': backup_id,
+            'kind': 'incremental' if parent else 'full',
+            'parent': parent['id'] if parent else None,
+            'created': created.isoformat(timespec='seconds'),
+            'page_size': page_size,
+            'page_count': page_count,
+            'pages_stored': stored,
+            'database_bytes': page_count * page_size,
+            'stored_bytes': os.path.getsize(pages_path),
+        }
+        self._write_manifest(manifest)
+        return manifest
+
+    def _write_manifest(self, manifest: Dict):
+        path = self._path(manifest['id'], ".json")
+        with open(path + ".part", 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + ".part", path)
+
+    def _read_hashes(self, backup_id: str) -> List[bytes]:
+        try:
+            with open(self._path(backup_id, ".hashes"), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        return [data[i:i + DIGEST_SIZE] for i in range(0, len(data), DIGEST_SIZE)]
+
+    def _iter_pages(self, backup_id: str, page_size: int) -> Iterator[Tuple[int, bytes]]:
+        """(page number, page) records of one backup, ascending"""
+        with gzip.open(self._path(backup_id, ".pages"), 'rb') as f:
+            while True:
+                head = f.read(PAGE_HEADER.size)
+                if not head:
+                    return
+                yield PAGE_HEADER.unpack(head)[0], f.read(page_size)
+
+    # ==================== RESTORE ====================
+
+    def materialize(self, backup_id: str, output_path: str) -> str:
+        """Rebuild the database as it was at a backup, verified with PRAGMA integrity_check"""
+        import sqlite3
+
+        chain = self.chain(backup_id)
+        target = chain[-1]
+        page_size = target['page_size']
+        with open(output_path, 'wb') as out:
+            for member in chain:
+                for page_number, page in self._iter_pages(member['id'], page_size):
+                    if page_number <= target['page_count']:
+                        out.seek((page_number - 1) * page_size)
+                        out.write(page)
+            out.truncate(target['page_count'] * page_size)
+
+        conn = sqlite3.connect(output_path)
+        try:
+            result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        finally:
+            conn.close()
+        if result != "ok":
+            raise RuntimeError(f"Backup {backup_id} failed integrity check: {result}")
+        return output_path
+
+    def restore(self, db_manager, backup_id: str) -> bool:
+        """Restore the live database to a backup"""
+        with self._lock:
+            fd, restore_path = tempfile.mkstemp(suffix=".db", dir=self.backup_dir)
+            os.close(fd)
+            try:
+                self.materialize(backup_id, restore_path)
+                return db_manager.restore_database(restore_path)
+            finally:
+                os.remove(restore_path)
+
+    # ==================== RETENTION ====================
+
+    def prune(self, config: Dict = None, now: datetime = None) -> List[str]:
+        """Fold backups outside the retention policy into their successors; returns removed IDs"""
+        config = config or self.load_config()
+        with self._lock:
+            keep = retained_ids(self.list_backups(), config, now)
+            removed = []
+            for backup_id in [b['id'] for b in self.list_backups() if b['id'] not in keep]:
+                # Re-read manifests, earlier folds change parents and kinds
+                backups = self.list_backups()
+                backup = next(b for b in backups if b['id'] == backup_id)
+                child = next((b for b in backups if b['parent'] == backup_id), None)
+                if child:
+                    self._fold(backup, child)
+                self._delete(backup_id)
+                removed.append(backup_id)
+            return removed
+
+    def _fold(self, backup: Dict, child: Dict):
+        """Merge a backup's pages into its child, which then takes its place in the chain"""
+        page_size = child['page_size']
+        pages_path = self._path(child['id'], ".pages")
+        older = self._iter_pages(backup['id'], page_size)
+        newer = self._iter_pages(child['id'], page_size)
+        stored = 0
+
+        with gzip.open(pages_path + ".part", 'wb', compresslevel=COMPRESS_LEVEL) as out:
+            old_record = next(older, None)
+            new_record = next(newer, None)
+            while old_record or new_record:
+                if new_record and (not old_record or new_record[0] <= old_record[0]):
+                    record = new_record
+                    if old_record and old_record[0] == new_record[0]:
+                        old_record = next(older, None)
+                    new_record = next(newer, None)
+                else:
+                    record = old_record
+                    old_record = next(older, None)
+                if record[0] <= child['page_count']:
+                    out.write(PAGE_HEADER.pack(record[0]))
+                    out.write(record[1])
+                    stored += 1
+        os.replace(pages_path + ".part", pages_path)
+
+        child.update({
+            'kind': backup['kind'],
+            'parent': backup['parent'],
+            'pages_stored': stored,
+            'stored_bytes': os.path.getsize(pages_path),
+        })
+        self._write_manifest(child)
+
+    def _delete(self, backup_id: str):
+        # Manifest first, so a half-deleted backup never looks complete
+        for extension in (".json", ".pages", ".hashes"):
+            path = self._path(backup_id, extension)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class BackupScheduler:
+    """Runs a due incremental backup, then retention, once the database has gone idle"""
+
+    def __init__(self, db_manager, store: IncrementalBackupStore = None):
+        """
+        Args:
+            db_manager: The UI thread's DatabaseManager; the scheduler opens its own connection
+            store: Backup folder, the default one if not given
+        """
+        self.db_manager = db_manager
+        self.store = store or IncrementalBackupStore()
+        self.listeners: List[Callable[[Dict], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_listener(self, callback: Callable[[Dict], None]):
+        """Register a callback for finished backups, called with the manifest on the worker thread"""
+        self.listeners.append(callback)
+
+    def start(self):
+        """Start the scheduler"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="incremental-backup", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the scheduler; a backup in progress is abandoned and leaves nothing behind"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def is_due(self, now: datetime = None) -> bool:
+        """True if enabled and the last backup is older than the configured interval"""
+        config = self.store.load_config()
+        if not config.get('enabled'):
+            return False
+        backups = self.store.list_backups()
+        if not backups:
+            return True
+        last = datetime.fromisoformat(backups[-1]['created'])
+        return (now or datetime.now()) - last >= timedelta(hours=config['interval_hours'])
+
+    def _run(self):
+        """Scheduler loop; owns its own SQLite connection"""
+        from database.db_manager import DatabaseManager
+
+        db = DatabaseManager(self.db_manager.db_path)
+        try:
+            last_version = None
+            idle_since = time.monotonic()
+            while not self._stop.wait(CHECK_SECONDS):
+                # data_version moves whenever another connection commits
+                data_version = db.execute_query("PRAGMA data_version")[0]['data_version']
+                if data_version != last_version:
+                    last_version = data_version
+                    idle_since = time.monotonic()
+                    continue
+                if time.monotonic() - idle_since < IDLE_SECONDS or not self.is_due():
+                    continue
+
+                try:
+                    manifest = self.store.create(db, is_cancelled=self._stop.is_set)
+                    if not manifest:
+                        continue
+                    self.store.prune()
+                except Exception as e:
+                    # Try again at the next check rather than giving up on backups
+                    logger.warning(f"Incremental backup failed: {e}")
+                    continue
+                logger.info(f"Incremental backup {manifest['id']} stored {manifest['pages_stored']:,} pages")
+                for listener in self.listeners:
+                    try:
+                        listener(manifest)
+                    except Exception as e:
+                        logger.warning(f"Backup listener failed: {e}")
+        except Exception as e:
+            logger.warning(f"Backup scheduler stopped: {e}")
+        finally:
+            db.close()
@@ -0,0 +1,173 @@
+"""
+Pattern Engine - Precompiled regex packs for supplier price-list text
+"""
+import re
+from typing import List, Dict, Tuple, Optional, Iterator
+
+
+# Shared price token: optional currency prefix, Indian/Western thousands separators, 2 decimals
+PRICE = r'(?:Rs\.?\s*|₹\s*)?(\d+(?:,\d{3})*(?:\.\d{2})?)'
+
+DEFAULT_PATTERNS = [
+    # Pattern 1: Code | Name | Price (with various separators)
+    r'([A-Z0-9\-/]+)\s*[\|\t]\s*([A-Za-z0-9\s\-\(\)\.]+?)\s*[\|\t]\s*' + PRICE,
+
+    # Pattern 2: Code Name Price (space separated)
+    r'([A-Z0-9\-/]{3,})\s+([A-Za-z][A-Za-z0-9\s\-\(\)\.]{5,}?)\s+' + PRICE,
+
+    # Pattern 3: Name followed by price on same line
+    r'([A-Za-z][A-Za-z0-9\s\-\(\)\.]{10,}?)\s+' + PRICE + r'\s*$',
+
+    # Pattern 4: Solar panel specific (Watt, Voltage, etc.)
+    r'(\d+W?)\s+([A-Za-z0-9\s\-\(\)\.]+?(?:Panel|Module|Cell)?)\s+' + PRICE,
+
+    # Pattern 5: Model/SKU based
+    r'(?:Model|SKU|Code)[\s:]*([A-Z0-9\-/]+)\s+([A-Za-z0-9\s\-\(\)\.]+?)\s+' + PRICE,
+]
+
+PATTERN_FLAGS = re.MULTILINE | re.IGNORECASE
+
+# Line-level regexes used by the extractor's text and table parsers
+LINE_PRICE_RE = re.compile(PRICE)
+LINE_CODE_RE = re.compile(r'^([A-Z0-9\-/]{3,})\s+(.+)$')
+HEADER_LINE_RE = re.compile(r'sr\.|no\.|page|total|subtotal|grand')
+# Currency markers and separators only; the decimal point must survive
+PRICE_NOISE_RE = re.compile(r'₹|Rs\.?|INR|[,\s]', re.IGNORECASE)
+PRICE_NUMBER_RE = re.compile(r'(\d+(?:\.\d+)?)')
+DIGITS_RE = re.compile(r'\d+')
+
+
+NAMED_GROUP_RE = re.compile(r'\(\?P<(\w+)>')
+NAMED_BACKREF_RE = re.compile(r'\(\?P=(\w+)\)')
+
+
+def _name_groups(pattern: str, prefix: str) -> Tuple[str, int]:
+    """
+    Rewrite every capturing group in ``pattern`` as a named group ``<prefix>g<n>``
+
+    Groups the pattern already names are renamed too, along with their
+    ``(?P=name)`` backreferences, so names never clash across patterns.
+    """
+    out = []
+    names = {}
+    count = 0
+    escaped = False
+    in_class = False
+    idx = 0
+
+    while idx < len(pattern):
+        char = pattern[idx]
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif in_class:
+            if char == ']':
+                in_class = False
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            named = NAMED_GROUP_RE.match(pattern, idx)
+            backref = NAMED_BACKREF_RE.match(pattern, idx)
+            if named or not pattern.startswith('?', idx + 1):
+                if named:
+                    names[named.group(1)] = f'{prefix}g{count}'
+                    idx = named.end()
+                else:
+                    idx += 1
+                out.append(f'(?P<{prefix}g{count}>')
+                count += 1
+                continue
+            if backref:
+                out.append(f'(?P={names[backref.group(1)]})')
+                idx = backref.end()
+                continue
+        out.append(char)
+        idx += 1
+
+    return ''.join(out), count
+
+
+class PatternEngine:
+    """
+    Compiled pattern pack for scanning price-list text
+
+    Packs are compiled once per process and shared by every extractor.
+    A pack registered with ``combine=True`` is scanned with a single
+    alternation regex (one pass over the text, leftmost match wins);
+    otherwise each pattern is scanned in turn, which keeps overlapping
+    matches from different patterns exactly like the original extractor.
+
+    Example:
+        PatternEngine.register_pack('acme', [r'ITEM\\s+(\\S+)\\s+(.+?)\\s+' + PRICE],
+                                    combine=True)
+        extractor = EnhancedPDFPriceExtractor(pattern_pack='acme')
+    """
+
+    _pack_sources: Dict[str, Tuple[List[str], bool]] = {
+        'default': (DEFAULT_PATTERNS, False),
+    }
+    _engines: Dict[str, 'PatternEngine'] = {}
+
+    def __init__(self, patterns: List[str], combine: bool = False):
+        self.combine = combine
+        self.compiled = [re.compile(pattern, PATTERN_FLAGS) for pattern in patterns]
+        self.group_counts = [regex.groups for regex in self.compiled]
+        self.combined = None
+
+        if combine:
+            alternatives = []
+            for idx, pattern in enumerate(patterns):
+                named, _ = _name_groups(pattern, f'p{idx}')
+                alternatives.append(f'(?:{named})')
+            self.combined = re.compile('|'.join(alternatives), PATTERN_FLAGS)
+
+    @classmethod
+    def register_pack(cls, name: str, patterns: List[str], combine: bool = False):
+        """Register (or replace) a supplier-specific pattern pack"""
+        for pattern in patterns:
+            # Fail fast on a bad pattern rather than on the first import
+            if re.compile(pattern, PATTERN_FLAGS).groups not in (2, 3):
+                raise ValueError(f"Pattern must capture (code, name, price) or (name, price): {pattern}")
+        cls._pack_sources[name] = (list(patterns), combine)
+        cls._engines.pop(name, None)
+
+    @classmethod
+    def available_packs(cls) -> List[str]:
+        """Names of all registered packs"""
+        return sorted(cls._pack_sources)
+
+    @classmethod
+    def get(cls, name: str = 'default') -> 'PatternEngine':
+        """Return the compiled engine for a pack, compiling it on first use"""
+        engine = cls._engines.get(name)
+        if engine is None:
+            if name not in cls._pack_sources:
+                raise KeyError(f"Unknown pattern pack: {name}")
+            patterns, combine = cls._pack_sources[name]
+            engine = cls(patterns, combine)
+            cls._engines[name] = engine
+        return engine
+
+    def scan(self, text: str) -> Iterator[Tuple[Optional[str], str, str]]:
+        """
+        Scan text and yield raw (code, name, price) matches
+
+        ``code`` is None for patterns that only capture a name and a price.
+        """
+        if self.combined is not None:
+            for match in self.combined.finditer(text):
+                # lastgroup is the last group closed, i.e. "p<idx>g<n>"
+                idx = int(match.lastgroup[1:match.lastgroup.index('g')])
+                groups = tuple(match.group(f'p{idx}g{n}') for n in range(self.group_counts[idx]))
+                yield self._split_groups(groups)
+        else:
+            for regex in self.compiled:
+                for match in regex.finditer(text):
+                    yield self._split_groups(match.groups())
+
+    def _split_groups(self, groups: tuple) -> Tuple[Optional[str], str, str]:
+        """Normalise 2- and 3-group matches to (code, name, price)"""
+        if len(groups) == 3:
+            return groups
+        return None, groups[0], groups[1]
@@ -0,0 +1,121 @@
+"""
+Rendered PDF Cache - Serve invoice reprints from disk instead of re-rendering
+
+Entries are content-addressed: the key hashes the invoice row, its items,
+the company header settings and the template version. A payment or edit
+changes the row, so the next lookup misses and the stale entry for that
+invoice is replaced.
+"""
+import glob
+import hashlib
+import json
+import os
+from typing import Callable, Dict, List, Optional
+import logging
+
+from utils.pdf_generator import InvoiceTemplate, INVOICE_TEMPLATE_VERSION
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+class RenderedPDFCache:
+    """Size-bounded, least-recently-used cache of rendered invoice PDFs"""
+
+    def __init__(self, cache_dir: str = "pdf_cache", max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def cache_key(company_settings: Dict, invoice: Dict, items: List[Dict]) -> str:
+        """Hash of everything that affects the rendered invoice"""
+        payload = {
+            'template': INVOICE_TEMPLATE_VERSION,
+            'settings': InvoiceTemplate.settings_version(company_settings),
+            'invoice': invoice,
+            'items': items,
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def path_for(self, invoice_id: int, key: str) -> str:
+        """Entry file name; the invoice ID prefix lets stale versions be found"""
+        return os.path.join(self.cache_dir, f"{invoice_id}-{key}.pdf")
+
+    def get(self, company_settings: Dict, invoice: Dict, items: List[Dict]) -> Optional[str]:
+        """Path of the cached PDF, or None on a miss"""
+        path = self.path_for(invoice['id'], self.cache_key(company_settings, invoice, items))
+        try:
+            # Access time drives LRU eviction; mtime is more reliable than atime
+            os.utime(path)
+            return path
+        except OSError:
+            return None
+
+    def get_or_render(self, company_settings: Dict, invoice: Dict, items: List[Dict],
+                      render: Callable[[str], bool]) -> Optional[str]:
+        """
+        Return the cached PDF, rendering it with ``render(path)`` on a miss
+
+        Returns None if rendering fails.
+        """
+        cached = self.get(company_settings, invoice, items)
+        if cached:
+            return cached
+
+        path = self.path_for(invoice['id'], self.cache_key(company_settings, invoice, items))
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            if not render(temp_path):
+                return None
+            self.invalidate(invoice['id'])
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        self.evict(keep=path)
+        return path
+
+    def invalidate(self, invoice_id: int):
+        """Drop every cached version of an invoice"""
+        for path in glob.glob(os.path.join(self.cache_dir, f"{invoice_id}-*.pdf")):
+            self._remove(path)
+
+    def clear(self):
+        """Drop all cached PDFs"""
+        for path in glob.glob(os.path.join(self.cache_dir, "*.pdf")):
+            self._remove(path)
+
+    def evict(self, keep: str = None):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for path in glob.glob(os.path.join(self.cache_dir, "*.pdf")):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        for _, size, path in sorted(entries):
+            if path == keep:
+                continue
+            self._remove(path)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    @staticmethod
+    def _remove(path: str):
+        """Delete a cache file that another process may already have removed"""
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.debug(f"Could not remove cached PDF {path}: {e}")
@@ -7,92 +7,322 @@ from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from reportlab.lib.utils import ImageReader, simpleSplit
 from datetime import datetime
+import io
 import os
 
 
-class PDFGenerator:
-    def __init__(self, company_settings: dict):
-        self.company_settings = company_settings
-        self.styles = getSampleStyleSheet()
-        self.setup_custom_styles()
+# Fonts used by the invoice layout; metrics are loaded once per process
+TEMPLATE_FONTS = ('Helvetica', 'Helvetica-Bold')
+
+# Company settings fields that end up in the invoice header
+HEADER_FIELDS = ('company_name', 'address', 'phone', 'email', 'gstin', 'logo_path', 'invoice_renderer')
+
+# 'canvas' draws simple invoices directly and falls back to 'platypus' when they overflow a page
+INVOICE_RENDERERS = ('canvas', 'platypus')
+DEFAULT_INVOICE_RENDERER = 'canvas'
+
+MAX_CACHED_TEMPLATES = 8
+
+# Bump whenever the invoice layout changes so cached PDFs are re-rendered
+INVOICE_TEMPLATE_VERSION = 3
+
+# The logo prints at 1 inch; 300px keeps it sharp at 300 DPI without
+# re-compressing a full-size photo into every PDF
+LOGO_MAX_PIXELS = 300
+
+INVOICE_INFO_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#2c3e50')),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+])
+
+INVOICE_ITEMS_STYLE = TableStyle([
+    # Header
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495e')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    
+    # Body
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('ALIGN', (0, 1), (0, -1), 'CENTER'),
+    ('ALIGN', (2, 1), (-1, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
     
-    def setup_custom_styles(self):
-        """Setup custom paragraph styles"""
-        self.styles.add(ParagraphStyle(
+    # Grid
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')])
+])
+
+INVOICE_TOTALS_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#2c3e50')),
+    ('LINEABOVE', (0, -3), (-1, -3), 1, colors.HexColor('#34495e')),
+    ('LINEABOVE', (0, -1), (-1, -1), 2, colors.HexColor('#34495e')),
+])
+
+INVOICE_INFO_COL_WIDTHS = [1.5*inch, 2*inch, 1*inch, 2*inch]
+INVOICE_ITEMS_COL_WIDTHS = [0.4*inch, 2.5*inch, 0.7*inch, 0.6*inch,
+                            1*inch, 0.7*inch, 0.7*inch, 1.2*inch]
+INVOICE_TOTALS_COL_WIDTHS = [5*inch, 2*inch]
+
+# Canvas fast path geometry, in points
+PAGE_MARGIN = 0.5*inch
+CELL_PADDING = 6
+CELL_V_PADDING = 3
+LEADING = 1.2
+INVOICE_HEADER_COLOR = colors.HexColor('#34495e')
+INVOICE_TEXT_COLOR = colors.HexColor('#2c3e50')
+INVOICE_MUTED_COLOR = colors.HexColor('#666666')
+INVOICE_STRIPE_COLOR = colors.HexColor('#f8f9fa')
+
+STOCK_REPORT_HEADER = ['Code', 'Product Name', 'Category', 'Current Stock', 'Min Level', 'Unit']
+STOCK_REPORT_COL_WIDTHS = [1*inch, 2.5*inch, 1.2*inch, 1*inch, 1*inch, 0.8*inch]
+
+STOCK_REPORT_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495e')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('ALIGN', (3, 1), (-1, -1), 'RIGHT'),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')])
+])
+
+_stylesheet = None
+
+
+def get_stylesheet():
+    """Sample stylesheet plus the custom invoice styles, built once per process"""
+    global _stylesheet
+    if _stylesheet is None:
+        styles = getSampleStyleSheet()
+        
+        styles.add(ParagraphStyle(
             name='CompanyName',
-            parent=self.styles['Heading1'],
+            parent=styles['Heading1'],
             fontSize=20,
             textColor=colors.HexColor('#1a1a1a'),
             spaceAfter=6,
             alignment=TA_CENTER
         ))
         
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='CompanyDetails',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=9,
             textColor=colors.HexColor('#666666'),
             alignment=TA_CENTER
         ))
         
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='InvoiceTitle',
-            parent=self.styles['Heading2'],
+            parent=styles['Heading2'],
             fontSize=16,
             textColor=colors.HexColor('#2c3e50'),
             spaceAfter=12,
             alignment=TA_CENTER
         ))
         
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='SectionHeader',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=10,
             textColor=colors.HexColor('#34495e'),
             fontName='Helvetica-Bold',
             spaceAfter=6
         ))
         
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='RightAlign',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=10,
             alignment=TA_RIGHT
         ))
+        
+        for font_name in TEMPLATE_FONTS:
+            pdfmetrics.getFont(font_name)
+        
+        _stylesheet = styles
+    return _stylesheet
+
+
+def clip_text(text, font: str, size: float, width: float) -> str:
+    """Cut text to fit width in the given font, ending in '...' if anything was cut"""
+    text = str(text)
+    if stringWidth(text, font, size) <= width:
+        return text
+    while text and stringWidth(text + '...', font, size) > width:
+        text = text[:-1]
+    return text.rstrip() + '...'
+
+
+class InvoiceTemplate:
+    """
+    Static parts of an invoice, built once per company settings version
+    
+    The header flowables (logo, company name, address block, title) are
+    shared by every invoice rendered with the same settings, so the logo
+    is decoded and the header paragraphs are parsed only once. Templates
+    are not thread-safe; render from one thread per process.
+    """
+    
+    _cache = {}
+    
+    def __init__(self, company_settings: dict):
+        self.styles = get_stylesheet()
+        self.renderer = company_settings.get('invoice_renderer') or DEFAULT_INVOICE_RENDERER
+        
+        logo_path = company_settings.get('logo_path')
+        self.logo_data = self._load_logo(logo_path).getvalue() if logo_path and os.path.exists(logo_path) else None
+        
+        self.header = self._build_header(company_settings)
+        self.canvas_header, self.canvas_header_height = self._build_canvas_header(company_settings)
+    
+    @staticmethod
+    def settings_version(company_settings: dict) -> tuple:
+        """Cache key: header fields plus the logo's modification time"""
+        logo_path = company_settings.get('logo_path')
+        logo_mtime = os.path.getmtime(logo_path) if logo_path and os.path.exists(logo_path) else None
+        return tuple(company_settings.get(field) for field in HEADER_FIELDS) + (logo_mtime,)
+    
+    @classmethod
+    def for_settings(cls, company_settings: dict) -> 'InvoiceTemplate':
+        """Get the cached template for these settings, building it if they changed"""
+        key = cls.settings_version(company_settings)
+        template = cls._cache.get(key)
+        if template is None:
+            if len(cls._cache) >= MAX_CACHED_TEMPLATES:
+                cls._cache.clear()
+            template = cls._cache[key] = cls(company_settings)
+        return template
+    
+    @classmethod
+    def clear_cache(cls):
+        """Drop all cached templates and the shared stylesheet"""
+        global _stylesheet
+        cls._cache.clear()
+        _stylesheet = None
+    
+    def _build_header(self, company_settings: dict) -> list:
+        """Logo, company block and title, shared across invoices"""
+        header = []
+        
+        if self.logo_data:
+            # A file object makes Image decode eagerly and keep the reader,
+            # so the image data is decoded once and reused by every build
+            logo = Image(io.BytesIO(self.logo_data), width=1*inch, height=1*inch)
+            header.append(logo)
+            header.append(Spacer(1, 0.1*inch))
+        
+        header.append(Paragraph(company_settings.get('company_name', 'My Business'),
+                                self.styles['CompanyName']))
+        
+        company_details = f"{company_settings.get('address', '')}<br/>"
+        company_details += f"Phone: {company_settings.get('phone', '')} | "
+        company_details += f"Email: {company_settings.get('email', '')}<br/>"
+        if company_settings.get('gstin'):
+            company_details += f"GSTIN: {company_settings['gstin']}"
+        
+        header.append(Paragraph(company_details, self.styles['CompanyDetails']))
+        header.append(Spacer(1, 0.3*inch))
+        
+        header.append(Paragraph(f"<b>TAX INVOICE</b>", self.styles['InvoiceTitle']))
+        header.append(Spacer(1, 0.2*inch))
+        return header
+    
+    def _build_canvas_header(self, company_settings: dict) -> tuple:
+        """
+        Precomputed drawing ops for the canvas fast path
+        
+        Returns (ops, height); each op is ('image', reader, width, height, y)
+        or ('text', font, size, color, y, text), with y measured down from
+        the top margin and text centred on the page.
+        """
+        ops = []
+        y = 0
+        
+        if self.logo_data:
+            ops.append(('image', ImageReader(io.BytesIO(self.logo_data)), 1*inch, 1*inch, y + 1*inch))
+            y += 1*inch + 0.1*inch
+        
+        frame_width = A4[0] - 2*PAGE_MARGIN
+        y += 20
+        company_name = clip_text(company_settings.get('company_name', 'My Business'), 'Helvetica-Bold', 20, frame_width)
+        ops.append(('text', 'Helvetica-Bold', 20, colors.HexColor('#1a1a1a'), y, company_name))
+        y += 8
+        
+        details = simpleSplit(company_settings.get('address') or '', 'Helvetica', 9, frame_width)
+        details.append(f"Phone: {company_settings.get('phone', '')} | Email: {company_settings.get('email', '')}")
+        if company_settings.get('gstin'):
+            details.append(f"GSTIN: {company_settings['gstin']}")
+        for line in details:
+            y += 12
+            # simpleSplit leaves a word longer than the line whole
+            line = clip_text(line, 'Helvetica', 9, frame_width)
+            ops.append(('text', 'Helvetica', 9, INVOICE_MUTED_COLOR, y, line))
+        
+        y += 0.3*inch + 28
+        ops.append(('text', 'Helvetica-Bold', 16, INVOICE_TEXT_COLOR, y, "TAX INVOICE"))
+        y += 12 + 0.2*inch
+        return ops, y
+    
+    @staticmethod
+    def _load_logo(logo_path: str) -> io.BytesIO:
+        """Read the logo into memory, downscaled to print size"""
+        from PIL import Image as PILImage
+        
+        with PILImage.open(logo_path) as image:
+            if max(image.size) <= LOGO_MAX_PIXELS:
+                with open(logo_path, 'rb') as f:
+                    return io.BytesIO(f.read())
+            
+            image.thumbnail((LOGO_MAX_PIXELS, LOGO_MAX_PIXELS))
+            buffer = io.BytesIO()
+            image.save(buffer, format='PNG')
+            buffer.seek(0)
+            return buffer
+
+
+class PDFGenerator:
+    def __init__(self, company_settings: dict, invoice_renderer: str = None):
+        """
+        Args:
+            company_settings: Company settings row
+            invoice_renderer: 'canvas' or 'platypus'; defaults to the template's setting
+        """
+        if invoice_renderer and invoice_renderer not in INVOICE_RENDERERS:
+            raise ValueError(f"Unknown invoice renderer: {invoice_renderer}")
+        self.company_settings = company_settings
+        self.invoice_renderer = invoice_renderer
+        self.styles = get_stylesheet()
     
     def generate_invoice_pdf(self, invoice_data: dict, items: list, output_path: str) -> bool:
         """Generate invoice PDF"""
         try:
+            template = InvoiceTemplate.for_settings(self.company_settings)
+            
+            renderer = self.invoice_renderer or template.renderer
+            if renderer == 'canvas' and self._draw_invoice_canvas(invoice_data, items, output_path, template):
+                return True
+            
             doc = SimpleDocTemplate(output_path, pagesize=A4,
                                    rightMargin=0.5*inch, leftMargin=0.5*inch,
                                    topMargin=0.5*inch, bottomMargin=0.5*inch)
             
-            story = []
-            
-            # Company Header
-            if self.company_settings.get('logo_path') and os.path.exists(self.company_settings['logo_path']):
-                logo = Image(self.company_settings['logo_path'], width=1*inch, height=1*inch)
-                story.append(logo)
-                story.append(Spacer(1, 0.1*inch))
-            
-            company_name = Paragraph(self.company_settings.get('company_name', 'My Business'), 
-                                    self.styles['CompanyName'])
-            story.append(company_name)
-            
-            company_details = f"{self.company_settings.get('address', '')}<br/>"
-            company_details += f"Phone: {self.company_settings.get('phone', '')} | "
-            company_details += f"Email: {self.company_settings.get('email', '')}<br/>"
-            if self.company_settings.get('gstin'):
-                company_details += f"GSTIN: {self.company_settings['gstin']}"
-            
-            story.append(Paragraph(company_details, self.styles['CompanyDetails']))
-            story.append(Spacer(1, 0.3*inch))
-            
-            # Invoice Title
-            invoice_title = Paragraph(f"<b>TAX INVOICE</b>", self.styles['InvoiceTitle'])
-            story.append(invoice_title)
-            story.append(Spacer(1, 0.2*inch))
+            story = list(template.header)
             
             # Invoice Details Table
             invoice_info_data = [
@@ -100,14 +330,8 @@ class PDFGenerator:
                 ['Time:', invoice_data['invoice_time'], 'Status:', invoice_data['payment_status'].upper()]
             ]
             
-            invoice_info_table = Table(invoice_info_data, colWidths=[1.5*inch, 2*inch, 1*inch, 2*inch])
-            invoice_info_table.setStyle(TableStyle([
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#2c3e50')),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ]))
+            invoice_info_table = Table(invoice_info_data, colWidths=INVOICE_INFO_COL_WIDTHS)
+            invoice_info_table.setStyle(INVOICE_INFO_STYLE)
             story.append(invoice_info_table)
             story.append(Spacer(1, 0.2*inch))
             
@@ -137,28 +361,8 @@ class PDFGenerator:
                     f"₹{item['total_amount']:.2f}"
                 ])
             
-            items_table = Table(items_data, colWidths=[0.4*inch, 2.5*inch, 0.7*inch, 0.6*inch, 
-                                                       1*inch, 0.7*inch, 0.7*inch, 1.2*inch])
-            
-            items_table.setStyle(TableStyle([
-                # Header
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495e')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 9),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                
-                # Body
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 8),
-                ('ALIGN', (0, 1), (0, -1), 'CENTER'),
-                ('ALIGN', (2, 1), (-1, -1), 'RIGHT'),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                
-                # Grid
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')])
-            ]))
+            items_table = Table(items_data, colWidths=INVOICE_ITEMS_COL_WIDTHS)
+            items_table.setStyle(INVOICE_ITEMS_STYLE)
             
             story.append(items_table)
             story.append(Spacer(1, 0.2*inch))
@@ -182,16 +386,8 @@ class PDFGenerator:
                 totals_data.append(['Amount Paid:', f"₹{invoice_data['amount_paid']:.2f}"])
                 totals_data.append(['<b>Balance Due:</b>', f"<b>₹{invoice_data['balance_amount']:.2f}</b>"])
             
-            totals_table = Table(totals_data, colWidths=[5*inch, 2*inch])
-            totals_table.setStyle(TableStyle([
-                ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-                ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#2c3e50')),
-                ('LINEABOVE', (0, -3), (-1, -3), 1, colors.HexColor('#34495e')),
-                ('LINEABOVE', (0, -1), (-1, -1), 2, colors.HexColor('#34495e')),
-            ]))
+            totals_table = Table(totals_data, colWidths=INVOICE_TOTALS_COL_WIDTHS)
+            totals_table.setStyle(INVOICE_TOTALS_STYLE)
             
             story.append(totals_table)
             story.append(Spacer(1, 0.3*inch))
@@ -215,6 +411,204 @@ class PDFGenerator:
             print(f"Error generating PDF: {e}")
             return False
     
+    def _draw_invoice_canvas(self, invoice_data: dict, items: list, output_path, template: InvoiceTemplate) -> bool:
+        """
+        Canvas fast path: draw a one-page invoice at fixed coordinates
+        
+        Returns False without writing anything if the invoice does not fit
+        on one page, so the caller can fall back to platypus.
+        """
+        page_width, page_height = A4
+        frame_width = page_width - 2*PAGE_MARGIN
+        
+        # Rows: one line per item plus the product code line
+        item_row_height = 2 * 8 * LEADING + 2*CELL_V_PADDING
+        header_row_height = 9 * LEADING + 2*CELL_V_PADDING
+        info_row_height = 9 * LEADING + 2*CELL_V_PADDING
+        totals_row_height = 10 * LEADING + 2*CELL_V_PADDING
+        
+        customer_lines = [(f"{invoice_data['customer_name']}", 'Helvetica-Bold')]
+        if invoice_data.get('customer_phone'):
+            customer_lines.append((f"Phone: {invoice_data['customer_phone']}", 'Helvetica'))
+        if invoice_data.get('customer_address'):
+            customer_lines.extend((line, 'Helvetica') for line in
+                                  simpleSplit(invoice_data['customer_address'], 'Helvetica', 10, frame_width))
+        customer_lines = [(clip_text(line, font, 10, frame_width), font) for line, font in customer_lines]
+        
+        totals = [('Subtotal:', f"₹{invoice_data['subtotal']:.2f}", False)]
+        if invoice_data.get('discount_amount', 0) > 0:
+            totals.append((f"Discount ({invoice_data.get('discount_percent', 0):.1f}%):",
+                           f"- ₹{invoice_data['discount_amount']:.2f}", False))
+        if invoice_data.get('tax_amount', 0) > 0:
+            totals.append(('Tax (GST):', f"₹{invoice_data['tax_amount']:.2f}", False))
+        totals.append(('Grand Total:', f"₹{invoice_data['grand_total']:.2f}", True))
+        totals.append(('Rounded Total:', f"₹{invoice_data['rounded_total']:.2f}", True))
+        if invoice_data.get('amount_paid', 0) > 0:
+            totals.append(('Amount Paid:', f"₹{invoice_data['amount_paid']:.2f}", False))
+            totals.append(('Balance Due:', f"₹{invoice_data['balance_amount']:.2f}", True))
+        
+        notes = simpleSplit(invoice_data['notes'], 'Helvetica', 10, frame_width) if invoice_data.get('notes') else []
+        
+        needed = (template.canvas_header_height
+                  + 2*info_row_height + 0.2*inch
+                  + 16 + 12*len(customer_lines) + 0.2*inch
+                  + header_row_height + item_row_height*len(items) + 0.2*inch
+                  + totals_row_height*len(totals) + 0.3*inch
+                  + (16 + 12*len(notes) + 0.2*inch if notes else 0)
+                  + 0.3*inch + 12)
+        if needed > page_height - 2*PAGE_MARGIN:
+            return False
+        
+        pdf = canvas.Canvas(output_path, pagesize=A4)
+        top = page_height - PAGE_MARGIN
+        
+        # Company header
+        for op in template.canvas_header:
+            if op[0] == 'image':
+                _, reader, width, height, y = op
+                pdf.drawImage(reader, (page_width - width) / 2, top - y, width, height, mask='auto')
+            else:
+                _, font, size, color, y, text = op
+                pdf.setFont(font, size)
+                pdf.setFillColor(color)
+                pdf.drawCentredString(page_width / 2, top - y, text)
+        y = top - template.canvas_header_height
+        
+        # Invoice details
+        x = (page_width - sum(INVOICE_INFO_COL_WIDTHS)) / 2
+        col_x = [x + sum(INVOICE_INFO_COL_WIDTHS[:i]) for i in range(4)]
+        pdf.setFillColor(INVOICE_TEXT_COLOR)
+        for row in ([('Invoice No:', invoice_data['invoice_number']), ('Date:', invoice_data['invoice_date'])],
+                    [('Time:', invoice_data['invoice_time']),
+                     ('Status:', invoice_data['payment_status'].upper())]):
+            baseline = y - info_row_height / 2 - 9 * 0.35
+            for pair_idx, (label, value) in enumerate(row):
+                pdf.setFont('Helvetica-Bold', 9)
+                pdf.drawString(col_x[pair_idx*2] + CELL_PADDING, baseline, label)
+                pdf.setFont('Helvetica', 9)
+                value_width = INVOICE_INFO_COL_WIDTHS[pair_idx*2 + 1] - 2*CELL_PADDING
+                pdf.drawString(col_x[pair_idx*2 + 1] + CELL_PADDING, baseline,
+                               clip_text(value, 'Helvetica', 9, value_width))
+            y -= info_row_height
+        y -= 0.2*inch
+        
+        # Customer details
+        y -= 10
+        pdf.setFont('Helvetica-Bold', 10)
+        pdf.setFillColor(INVOICE_HEADER_COLOR)
+        pdf.drawString(PAGE_MARGIN, y, 'Bill To:')
+        y -= 6
+        pdf.setFillColor(colors.black)
+        for text, font in customer_lines:
+            y -= 12
+            pdf.setFont(font, 10)
+            pdf.drawString(PAGE_MARGIN, y, text)
+        y -= 0.2*inch
+        
+        # Items grid
+        widths = INVOICE_ITEMS_COL_WIDTHS
+        x = (page_width - sum(widths)) / 2
+        col_x = [x + sum(widths[:i]) for i in range(len(widths) + 1)]
+        grid_top = y
+        
+        pdf.setFillColor(INVOICE_HEADER_COLOR)
+        pdf.rect(col_x[0], y - header_row_height, col_x[-1] - col_x[0], header_row_height, stroke=0, fill=1)
+        pdf.setFillColor(colors.whitesmoke)
+        pdf.setFont('Helvetica-Bold', 9)
+        baseline = y - header_row_height / 2 - 9 * 0.35
+        for idx, title in enumerate(['#', 'Product', 'Qty', 'Unit', 'Price', 'Disc%', 'GST%', 'Amount']):
+            pdf.drawCentredString((col_x[idx] + col_x[idx + 1]) / 2, baseline, title)
+        y -= header_row_height
+        
+        # Stripes first, then every cell in one text object instead of a
+        # text object per drawString call
+        pdf.setFillColor(INVOICE_STRIPE_COLOR)
+        for idx in range(2, len(items) + 1, 2):
+            pdf.rect(col_x[0], y - item_row_height*idx, col_x[-1] - col_x[0], item_row_height, stroke=0, fill=1)
+        
+        text = pdf.beginText()
+        text.setFont('Helvetica', 8)
+        text.setFillColor(colors.black)
+        for idx, item in enumerate(items, 1):
+            baseline = y - item_row_height / 2 - 8 * 0.35
+            number = str(idx)
+            text.setTextOrigin((col_x[0] + col_x[1] - stringWidth(number, 'Helvetica', 8)) / 2, baseline)
+            text.textOut(number)
+            # Cells are clipped to their column; the grid would otherwise cut through the text
+            name_width = widths[1] - 2*CELL_PADDING
+            text.setTextOrigin(col_x[1] + CELL_PADDING, baseline + 8 * LEADING / 2)
+            text.textOut(clip_text(item['product_name'], 'Helvetica', 8, name_width))
+            text.setTextOrigin(col_x[1] + CELL_PADDING, baseline - 8 * LEADING / 2)
+            text.textOut(clip_text(f"({item['product_code']})", 'Helvetica', 8, name_width))
+            for col, value in enumerate([
+                f"{item['quantity']:.2f}",
+                str(item['unit']),
+                f"₹{item['unit_price']:.2f}",
+                f"{item.get('discount_percent', 0):.1f}%",
+                f"{item.get('gst_rate', 0):.1f}%",
+                f"₹{item['total_amount']:.2f}"
+            ], 2):
+                value = clip_text(value, 'Helvetica', 8, widths[col] - 2*CELL_PADDING)
+                text.setTextOrigin(col_x[col + 1] - CELL_PADDING - stringWidth(value, 'Helvetica', 8), baseline)
+                text.textOut(value)
+            y -= item_row_height
+        pdf.drawText(text)
+        
+        pdf.setStrokeColor(colors.grey)
+        pdf.setLineWidth(0.5)
+        for x in col_x:
+            pdf.line(x, grid_top, x, y)
+        row_y = grid_top
+        pdf.line(col_x[0], row_y, col_x[-1], row_y)
+        row_y -= header_row_height
+        for _ in range(len(items) + 1):
+            pdf.line(col_x[0], row_y, col_x[-1], row_y)
+            row_y -= item_row_height
+        y -= 0.2*inch
+        
+        # Totals
+        x = (page_width - sum(INVOICE_TOTALS_COL_WIDTHS)) / 2
+        label_right = x + INVOICE_TOTALS_COL_WIDTHS[0] - CELL_PADDING
+        value_right = x + sum(INVOICE_TOTALS_COL_WIDTHS) - CELL_PADDING
+        pdf.setFillColor(INVOICE_TEXT_COLOR)
+        pdf.setStrokeColor(INVOICE_HEADER_COLOR)
+        for idx, (label, value, bold) in enumerate(totals):
+            # Same rules as the platypus table: above the third-last and last rows
+            if idx == len(totals) - 3 or idx == len(totals) - 1:
+                pdf.setLineWidth(1 if idx == len(totals) - 3 else 2)
+                pdf.line(x, y, x + sum(INVOICE_TOTALS_COL_WIDTHS), y)
+            
+            baseline = y - totals_row_height / 2 - 10 * 0.35
+            pdf.setFont('Helvetica-Bold' if bold else 'Helvetica', 10)
+            pdf.drawRightString(label_right, baseline, label)
+            pdf.drawRightString(value_right, baseline, value)
+            y -= totals_row_height
+        y -= 0.3*inch
+        
+        # Notes
+        if notes:
+            y -= 10
+            pdf.setFont('Helvetica-Bold', 10)
+            pdf.setFillColor(INVOICE_HEADER_COLOR)
+            pdf.drawString(PAGE_MARGIN, y, 'Notes:')
+            y -= 6
+            pdf.setFont('Helvetica', 10)
+            pdf.setFillColor(colors.black)
+            for line in notes:
+                y -= 12
+                pdf.drawString(PAGE_MARGIN, y, line)
+            y -= 0.2*inch
+        
+        # Footer
+        y -= 0.3*inch + 9
+        pdf.setFont('Helvetica', 9)
+        pdf.setFillColor(INVOICE_MUTED_COLOR)
+        pdf.drawCentredString(page_width / 2, y, "Thank you for your business!")
+        
+        pdf.showPage()
+        pdf.save()
+        return True
+    
     def generate_customer_ledger_pdf(self, customer: dict, ledger_data: dict, output_path: str) -> bool:
         """Generate customer ledger PDF"""
         try:
@@ -288,6 +682,37 @@ class PDFGenerator:
                 
                 story.append(invoice_table)
             
+            # Payments Table (bulk statements include payment history)
+            if ledger_data.get('payments'):
+                story.append(Spacer(1, 0.3*inch))
+                story.append(Paragraph('<b>Payment History:</b>', self.styles['SectionHeader']))
+                
+                payment_data = [['Date', 'Invoice No', 'Mode', 'Reference', 'Amount']]
+                
+                for payment in ledger_data['payments']:
+                    payment_data.append([
+                        payment['payment_date'],
+                        payment['invoice_number'],
+                        (payment['payment_mode'] or '').upper(),
+                        payment.get('reference_number') or '-',
+                        f"₹{payment['amount']:.2f}"
+                    ])
+                
+                payment_table = Table(payment_data, colWidths=[1*inch, 1.5*inch, 1.2*inch, 
+                                                               2*inch, 1.4*inch])
+                
+                payment_table.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495e')),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, 0), (-1, -1), 9),
+                    ('ALIGN', (4, 0), (4, -1), 'RIGHT'),
+                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')])
+                ]))
+                
+                story.append(payment_table)
+            
             doc.build(story)
             return True
             
@@ -314,7 +739,7 @@ class PDFGenerator:
             story.append(Spacer(1, 0.3*inch))
             
             # Products Table
-            product_data = [['Code', 'Product Name', 'Category', 'Current Stock', 'Min Level', 'Unit']]
+            product_data = [STOCK_REPORT_HEADER]
             
             for product in products:
                 product_data.append([
@@ -326,18 +751,8 @@ class PDFGenerator:
                     product['unit']
                 ])
             
-            product_table = Table(product_data, colWidths=[1*inch, 2.5*inch, 1.2*inch, 
-                                                          1*inch, 1*inch, 0.8*inch])
-            
-            product_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495e')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('ALIGN', (3, 1), (-1, -1), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')])
-            ]))
+            product_table = Table(product_data, colWidths=STOCK_REPORT_COL_WIDTHS)
+            product_table.setStyle(STOCK_REPORT_STYLE)
             
             story.append(product_table)
             
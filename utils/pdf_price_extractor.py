@@ -4,9 +4,10 @@ Supports multiple formats including solar panels, electronics, and general produ
 """
 import pdfplumber
 import PyPDF2
-import re
 from fuzzywuzzy import fuzz
-from typing import List, Dict, Tuple, Optional
+from utils.pattern_engine import (PatternEngine, LINE_PRICE_RE, LINE_CODE_RE, HEADER_LINE_RE,
+                                  PRICE_NOISE_RE, PRICE_NUMBER_RE, DIGITS_RE)
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -16,9 +17,13 @@ logger = logging.getLogger(__name__)
 class EnhancedPDFPriceExtractor:
     """Enhanced PDF price extractor with multiple extraction strategies"""
     
-    def __init__(self):
+    # Recorded in price_update_history for prices applied from this extractor
+    update_source = 'pdf_import'
+    
+    def __init__(self, pattern_pack: str = 'default'):
         self.extracted_products = []
         self.extraction_method = None
+        self.pattern_engine = PatternEngine.get(pattern_pack)
         
     def extract_from_pdf(self, pdf_path: str) -> List[Dict]:
         """
@@ -55,6 +60,77 @@ class EnhancedPDFPriceExtractor:
         logger.error("All extraction methods failed")
         return []
     
+    def iter_pages(self, pdf_path: str) -> Iterator[Tuple[int, int, List[Dict]]]:
+        """
+        Stream products page by page without holding the whole document
+        
+        The first strategy that finds products on a page is kept for the rest
+        of the document, mirroring the fallback order of ``extract_from_pdf``.
+        Each page's layout cache is released as soon as it has been parsed and
+        nothing is accumulated in ``self.extracted_products``.
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Yields:
+            Tuples of (page_number, total_pages, products_on_page)
+        """
+        logger.info(f"Streaming PDF extraction from: {pdf_path}")
+        self.extraction_method = None
+        
+        try:
+            pdf = pdfplumber.open(pdf_path)
+        except Exception as e:
+            logger.warning(f"pdfplumber could not open PDF, falling back to PyPDF2: {str(e)}")
+            yield from self._iter_pages_with_pypdf2(pdf_path)
+            return
+        
+        seen = set()
+        page_strategies = [
+            ('_extract_with_pdfplumber_tables', lambda page, num: self._tables_from_page(page, num)),
+            ('_extract_with_pdfplumber_text', lambda page, num: self._lines_from_text(page.extract_text(), num)),
+            ('_extract_with_pattern_matching', lambda page, num: self._patterns_from_text(page.extract_text(), num, seen)),
+        ]
+        
+        with pdf:
+            total_pages = len(pdf.pages)
+            for page_num, page in enumerate(pdf.pages, 1):
+                products = []
+                try:
+                    for name, strategy in page_strategies:
+                        if self.extraction_method and name != self.extraction_method:
+                            continue
+                        try:
+                            products = strategy(page, page_num)
+                        except Exception as e:
+                            logger.warning(f"Method {name} failed on page {page_num}: {str(e)}")
+                            continue
+                        if products:
+                            if not self.extraction_method:
+                                self.extraction_method = name
+                                logger.info(f"Streaming with {name} from page {page_num}")
+                            break
+                finally:
+                    self._release_page(page)
+                
+                yield page_num, total_pages, products
+    
+    def _iter_pages_with_pypdf2(self, pdf_path: str) -> Iterator[Tuple[int, int, List[Dict]]]:
+        """Stream products page by page using PyPDF2"""
+        self.extraction_method = '_extract_with_pypdf2'
+        
+        with open(pdf_path, 'rb') as file:
+            reader = PyPDF2.PdfReader(file)
+            total_pages = len(reader.pages)
+            
+            for page_num, page in enumerate(reader.pages, 1):
+                yield page_num, total_pages, self._lines_from_text(page.extract_text(), page_num)
+    
+    def iter_products(self, pdf_path: str) -> Iterator[Dict]:
+        """Stream extracted products one at a time (see ``iter_pages``)"""
+        for _, _, products in self.iter_pages(pdf_path):
+            yield from products
+    
     def _extract_with_pdfplumber_tables(self, pdf_path: str) -> List[Dict]:
         """Extract using pdfplumber table detection"""
         products = []
@@ -62,29 +138,8 @@ class EnhancedPDFPriceExtractor:
         with pdfplumber.open(pdf_path) as pdf:
             for page_num, page in enumerate(pdf.pages, 1):
                 logger.info(f"Processing page {page_num} with table extraction")
-                
-                # Extract tables
-                tables = page.extract_tables()
-                
-                for table_idx, table in enumerate(tables):
-                    if not table or len(table) < 2:
-                        continue
-                    
-                    # Analyze header to find column positions
-                    header = table[0]
-                    col_mapping = self._analyze_header(header)
-                    
-                    # Extract data rows
-                    for row_idx, row in enumerate(table[1:], 1):
-                        if not row or len(row) < 2:
-                            continue
-                        
-                        product = self._extract_product_from_row(row, col_mapping)
-                        if product:
-                            product['page'] = page_num
-                            product['table'] = table_idx
-                            product['row'] = row_idx
-                            products.append(product)
+                products.extend(self._tables_from_page(page, page_num))
+                self._release_page(page)
         
         return products
     
@@ -94,17 +149,8 @@ class EnhancedPDFPriceExtractor:
         
         with pdfplumber.open(pdf_path) as pdf:
             for page_num, page in enumerate(pdf.pages, 1):
-                text = page.extract_text()
-                if not text:
-                    continue
-                
-                # Split into lines
-                lines = text.split('\n')
-                
-                for line_idx, line in enumerate(lines):
-                    product = self._parse_line_for_product(line, page_num, line_idx)
-                    if product:
-                        products.append(product)
+                products.extend(self._lines_from_text(page.extract_text(), page_num))
+                self._release_page(page)
         
         return products
     
@@ -116,87 +162,57 @@ class EnhancedPDFPriceExtractor:
             reader = PyPDF2.PdfReader(file)
             
             for page_num, page in enumerate(reader.pages, 1):
-                text = page.extract_text()
-                if not text:
-                    continue
-                
-                lines = text.split('\n')
-                
-                for line_idx, line in enumerate(lines):
-                    product = self._parse_line_for_product(line, page_num, line_idx)
-                    if product:
-                        products.append(product)
+                products.extend(self._lines_from_text(page.extract_text(), page_num))
         
         return products
     
     def _extract_with_pattern_matching(self, pdf_path: str) -> List[Dict]:
         """Extract using advanced pattern matching for various formats"""
         products = []
+        seen = set()
         
         with pdfplumber.open(pdf_path) as pdf:
             for page_num, page in enumerate(pdf.pages, 1):
-                text = page.extract_text()
-                if not text:
+                products.extend(self._patterns_from_text(page.extract_text(), page_num, seen))
+                self._release_page(page)
+        
+        return products
+    
+    def _patterns_from_text(self, text: str, page_num: int, seen: set) -> List[Dict]:
+        """Run the pattern set over one page of text, skipping products already in ``seen``"""
+        products = []
+        if not text:
+            return products
+        
+        for code, name, price in self.pattern_engine.scan(text):
+            if code is None:
+                # No code, generate one
+                code = self._generate_code_from_name(name)
+            
+            # Clean and validate
+            code = code.strip()
+            name = name.strip()
+            price_str = price.replace(',', '').strip()
+            
+            if not name or len(name) < 3:
+                continue
+            
+            try:
+                price_value = float(price_str)
+                if price_value <= 0 or price_value > 10000000:
                     continue
-                
-                # Multiple patterns for different formats
-                patterns = [
-                    # Pattern 1: Code | Name | Price (with various separators)
-                    r'([A-Z0-9\-/]+)\s*[\|\t]\s*([A-Za-z0-9\s\-\(\)\.]+?)\s*[\|\t]\s*(?:Rs\.?\s*|₹\s*)?(\d+(?:,\d{3})*(?:\.\d{2})?)',
-                    
-                    # Pattern 2: Code Name Price (space separated)
-                    r'([A-Z0-9\-/]{3,})\s+([A-Za-z][A-Za-z0-9\s\-\(\)\.]{5,}?)\s+(?:Rs\.?\s*|₹\s*)?(\d+(?:,\d{3})*(?:\.\d{2})?)',
-                    
-                    # Pattern 3: Name followed by price on same line
-                    r'([A-Za-z][A-Za-z0-9\s\-\(\)\.]{10,}?)\s+(?:Rs\.?\s*|₹\s*)?(\d+(?:,\d{3})*(?:\.\d{2})?)\s*$',
-                    
-                    # Pattern 4: Solar panel specific (Watt, Voltage, etc.)
-                    r'(\d+W?)\s+([A-Za-z0-9\s\-\(\)\.]+?(?:Panel|Module|Cell)?)\s+(?:Rs\.?\s*|₹\s*)?(\d+(?:,\d{3})*(?:\.\d{2})?)',
-                    
-                    # Pattern 5: Model/SKU based
-                    r'(?:Model|SKU|Code)[\s:]*([A-Z0-9\-/]+)\s+([A-Za-z0-9\s\-\(\)\.]+?)\s+(?:Rs\.?\s*|₹\s*)?(\d+(?:,\d{3})*(?:\.\d{2})?)',
-                ]
-                
-                for pattern in patterns:
-                    matches = re.finditer(pattern, text, re.MULTILINE | re.IGNORECASE)
-                    
-                    for match in matches:
-                        groups = match.groups()
-                        
-                        if len(groups) == 3:
-                            code, name, price = groups
-                        elif len(groups) == 2:
-                            # No code, generate one
-                            name, price = groups
-                            code = self._generate_code_from_name(name)
-                        else:
-                            continue
-                        
-                        # Clean and validate
-                        code = code.strip()
-                        name = name.strip()
-                        price_str = price.replace(',', '').strip()
-                        
-                        if not name or len(name) < 3:
-                            continue
-                        
-                        try:
-                            price_value = float(price_str)
-                            if price_value <= 0 or price_value > 10000000:
-                                continue
-                        except ValueError:
-                            continue
-                        
-                        products.append({
-                            'product_code': code,
-                            'product_name': name,
-                            'price': price_value,
-                            'page': page_num,
-                            'source': 'pattern_matching'
-                        })
+            except ValueError:
+                continue
+            
+            products.append({
+                'product_code': code,
+                'product_name': name,
+                'price': price_value,
+                'page': page_num,
+                'source': 'pattern_matching'
+            })
         
         # Remove duplicates
-        seen = set()
         unique_products = []
         for p in products:
             key = (p['product_code'], p['product_name'])
@@ -298,11 +314,11 @@ class EnhancedPDFPriceExtractor:
             return None
         
         # Skip header-like lines
-        if any(keyword in line.lower() for keyword in ['sr.', 'no.', 'page', 'total', 'subtotal', 'grand']):
+        if HEADER_LINE_RE.search(line.lower()):
             return None
         
         # Try to extract price
-        price_match = re.search(r'(?:Rs\.?\s*|₹\s*)?(\d+(?:,\d{3})*(?:\.\d{2})?)', line)
+        price_match = LINE_PRICE_RE.search(line)
         if not price_match:
             return None
         
@@ -318,7 +334,7 @@ class EnhancedPDFPriceExtractor:
         name_part = line[:price_match.start()].strip()
         
         # Try to extract code from name part
-        code_match = re.match(r'^([A-Z0-9\-/]{3,})\s+(.+)$', name_part)
+        code_match = LINE_CODE_RE.match(name_part)
         if code_match:
             code = code_match.group(1)
             name = code_match.group(2).strip()
@@ -337,6 +353,53 @@ class EnhancedPDFPriceExtractor:
             'line': line_idx
         }
     
+    def _tables_from_page(self, page, page_num: int) -> List[Dict]:
+        """Extract products from the tables detected on a single pdfplumber page"""
+        products = []
+        
+        for table_idx, table in enumerate(page.extract_tables()):
+            if not table or len(table) < 2:
+                continue
+            
+            # Analyze header to find column positions
+            header = table[0]
+            col_mapping = self._analyze_header(header)
+            
+            # Extract data rows
+            for row_idx, row in enumerate(table[1:], 1):
+                if not row or len(row) < 2:
+                    continue
+                
+                product = self._extract_product_from_row(row, col_mapping)
+                if product:
+                    product['page'] = page_num
+                    product['table'] = table_idx
+                    product['row'] = row_idx
+                    products.append(product)
+        
+        return products
+    
+    def _lines_from_text(self, text: str, page_num: int) -> List[Dict]:
+        """Parse every line of one page of text for products"""
+        products = []
+        if not text:
+            return products
+        
+        for line_idx, line in enumerate(text.split('\n')):
+            product = self._parse_line_for_product(line, page_num, line_idx)
+            if product:
+                products.append(product)
+        
+        return products
+    
+    def _release_page(self, page):
+        """Drop the cached layout objects pdfplumber keeps on a parsed page"""
+        close = getattr(page, 'close', None)
+        if close:
+            close()
+        else:
+            page.flush_cache()
+    
     def _get_cell_value(self, row: List[str], col_idx: int) -> str:
         """Safely get cell value from row"""
         if col_idx < 0 or col_idx >= len(row):
@@ -349,10 +412,10 @@ class EnhancedPDFPriceExtractor:
             return None
         
         # Remove currency symbols and commas
-        price_str = re.sub(r'[₹Rs\.,\s]', '', price_str)
+        price_str = PRICE_NOISE_RE.sub('', price_str)
         
         # Extract first number
-        match = re.search(r'(\d+(?:\.\d{2})?)', price_str)
+        match = PRICE_NUMBER_RE.search(price_str)
         if match:
             try:
                 return float(match.group(1))
@@ -371,7 +434,7 @@ class EnhancedPDFPriceExtractor:
         code = ''.join(word[:3] for word in words if word)
         
         # Add numbers if exists in name
-        numbers = re.findall(r'\d+', name)
+        numbers = DIGITS_RE.findall(name)
         if numbers:
             code += numbers[0][:3]
         
@@ -387,23 +450,35 @@ class EnhancedPDFPriceExtractor:
         Returns:
             List of matched products with confidence scores
         """
-        matched_products = []
+        return list(self.iter_matches(self.extracted_products, existing_products))
+    
+    def iter_matches(self, products: Iterable[Dict], existing_products: List[Dict]) -> Iterator[Dict]:
+        """
+        Match products against the catalog as they arrive
+        
+        Args:
+            products: Any iterable of extracted products, e.g. ``iter_products``
+            existing_products: List of existing products from database
+            
+        Yields:
+            Match results in the same format as ``match_with_existing_products``
+        """
+        # Lower-case the catalog once instead of once per extracted product
+        catalog = [
+            (existing, existing['product_code'].lower(), existing['product_name'].lower())
+            for existing in existing_products
+        ]
         
-        for extracted in self.extracted_products:
+        for extracted in products:
             best_match = None
             best_score = 0
+            extracted_code = extracted['product_code'].lower()
+            extracted_name = extracted['product_name'].lower()
             
-            for existing in existing_products:
+            for existing, existing_code, existing_name in catalog:
                 # Calculate similarity scores
-                code_score = fuzz.ratio(
-                    extracted['product_code'].lower(),
-                    existing['product_code'].lower()
-                )
-                
-                name_score = fuzz.token_set_ratio(
-                    extracted['product_name'].lower(),
-                    existing['product_name'].lower()
-                )
+                code_score = fuzz.ratio(extracted_code, existing_code)
+                name_score = fuzz.token_set_ratio(extracted_name, existing_name)
                 
                 # Weighted average (name is more important)
                 combined_score = (code_score * 0.3) + (name_score * 0.7)
@@ -414,21 +489,19 @@ class EnhancedPDFPriceExtractor:
             
             # Determine match status
             if best_score >= 70:  # Threshold for match
-                matched_products.append({
+                yield {
                     'extracted': extracted,
                     'matched': best_match,
                     'confidence': best_score,
                     'status': 'matched'
-                })
+                }
             else:
-                matched_products.append({
+                yield {
                     'extracted': extracted,
                     'matched': None,
                     'confidence': 0,
                     'status': 'no_match'
-                })
-        
-        return matched_products
+                }
     
     def get_extraction_stats(self) -> Dict:
         """Get statistics about extraction"""
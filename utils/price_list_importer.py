@@ -0,0 +1,157 @@
+"""
+Spreadsheet Price List Importer - Stream supplier XLSX/CSV price lists
+Feeds the same matching and bulk price-update pipeline as the PDF extractor
+"""
+import csv
+import os
+from typing import List, Dict, Tuple, Optional, Iterator
+import logging
+
+from utils.pdf_price_extractor import EnhancedPDFPriceExtractor
+
+logger = logging.getLogger(__name__)
+
+SPREADSHEET_EXTENSIONS = ('.xlsx', '.xlsm')
+CSV_EXTENSIONS = ('.csv', '.txt')
+
+# Rows parsed per yielded batch; keeps UI updates coarse and memory flat
+BATCH_SIZE = 1000
+
+# Title/address rows suppliers put above the real header
+MAX_HEADER_SCAN_ROWS = 25
+
+
+class SpreadsheetPriceExtractor(EnhancedPDFPriceExtractor):
+    """Price extractor for XLSX and CSV files that never loads the whole sheet"""
+
+    update_source = 'spreadsheet_import'
+
+    def extract_from_pdf(self, pdf_path: str) -> List[Dict]:
+        """Non-streaming entry point kept for API compatibility with the PDF extractor"""
+        self.extracted_products = list(self.iter_products(pdf_path))
+        return self.extracted_products
+
+    def iter_pages(self, path: str) -> Iterator[Tuple[int, int, List[Dict]]]:
+        """
+        Stream products in batches of ``BATCH_SIZE`` rows
+
+        Yields the same (position, total, products) tuples as the PDF
+        extractor. Position/total are bytes for CSV and rows for XLSX,
+        so ``position * 100 / total`` is a usable progress percentage.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension in SPREADSHEET_EXTENSIONS:
+            self.extraction_method = '_iter_xlsx_rows'
+            rows = self._iter_xlsx_rows(path)
+        else:
+            self.extraction_method = '_iter_csv_rows'
+            rows = self._iter_csv_rows(path)
+
+        col_mapping = None
+        pending = []
+        batch = []
+        position, total = 0, 1
+
+        for row_num, (position, total, row) in enumerate(rows, 1):
+            if col_mapping is None:
+                col_mapping = self._detect_header(row)
+                if col_mapping is not None:
+                    pending = []
+                    continue
+
+                pending.append(row)
+                if len(pending) < MAX_HEADER_SCAN_ROWS:
+                    continue
+
+                # No recognisable header; infer columns from the row layout instead
+                logger.warning(f"No header found in {path}, inferring columns from row layout")
+                col_mapping = self._analyze_header([])
+                for earlier in pending[:-1]:
+                    product = self._product_from_cells(earlier, col_mapping)
+                    if product:
+                        batch.append(product)
+                pending = []
+
+            product = self._product_from_cells(row, col_mapping)
+            if product:
+                product['row'] = row_num
+                batch.append(product)
+
+            if len(batch) >= BATCH_SIZE:
+                yield position, total, batch
+                batch = []
+
+        if col_mapping is None:
+            # Short file without a header row
+            col_mapping = self._analyze_header([])
+            batch.extend(p for p in (self._product_from_cells(row, col_mapping) for row in pending) if p)
+
+        yield total, total, batch
+
+    def _detect_header(self, row: tuple) -> Optional[Dict[str, int]]:
+        """Return a column mapping if the row looks like a header, else None"""
+        if not row or not any(row):
+            return None
+
+        col_mapping = self._analyze_header([str(cell) if cell is not None else '' for cell in row])
+        if col_mapping['price'] == -1 or (col_mapping['name'] == -1 and col_mapping['code'] == -1):
+            return None
+        return col_mapping
+
+    def _product_from_cells(self, row: tuple, col_mapping: Dict[str, int]) -> Optional[Dict]:
+        """Build a product from typed cells, trusting numeric price cells as-is"""
+        if not row or len(row) < 2:
+            return None
+
+        product = self._extract_product_from_row(
+            [str(cell) if cell is not None else '' for cell in row], col_mapping
+        )
+        if not product:
+            return None
+
+        price_idx = col_mapping.get('price', -1)
+        if 0 <= price_idx < len(row) and isinstance(row[price_idx], (int, float)):
+            product['price'] = float(row[price_idx])
+
+        return product
+
+    def _iter_csv_rows(self, path: str) -> Iterator[Tuple[int, int, List[str]]]:
+        """Yield (byte_offset, file_size, row) from a CSV file"""
+        total = max(os.path.getsize(path), 1)
+
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            sample = f.read(8192)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=',;\t|')
+            except csv.Error:
+                dialect = csv.excel
+
+            position = 0
+            for row_num, row in enumerate(csv.reader(f, dialect), 1):
+                # tell() is unavailable while iterating a text file, so
+                # sample progress from the underlying binary buffer
+                if row_num % BATCH_SIZE == 0:
+                    position = f.buffer.tell()
+                yield position, total, row
+
+    def _iter_xlsx_rows(self, path: str) -> Iterator[Tuple[int, int, tuple]]:
+        """Yield (row_number, max_row, values) from the first sheet in read-only mode"""
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            sheet = workbook.worksheets[0]
+            total = max(sheet.max_row or 1, 1)
+
+            for row_num, row in enumerate(sheet.iter_rows(values_only=True), 1):
+                yield row_num, total, row
+        finally:
+            workbook.close()
+
+
+def get_price_list_extractor(path: str, pattern_pack: str = 'default') -> EnhancedPDFPriceExtractor:
+    """Pick the extractor for a supplier price list based on its file extension"""
+    if path.lower().endswith(SPREADSHEET_EXTENSIONS + CSV_EXTENSIONS):
+        return SpreadsheetPriceExtractor(pattern_pack)
+    return EnhancedPDFPriceExtractor(pattern_pack)
@@ -0,0 +1,147 @@
+"""
+Print Queue - Render invoice PDFs on a background thread
+Jobs live in the print_jobs table, so anything queued survives a restart
+"""
+import os
+import shutil
+import threading
+from typing import Callable, Dict, List, Optional
+import logging
+
+from utils.pdf_generator import PDFGenerator
+from utils.pdf_cache import RenderedPDFCache
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+RETRY_DELAY_SECONDS = 2
+
+# Idle re-check interval in case a wake-up is missed
+POLL_SECONDS = 30
+
+
+class InvoicePrintQueue:
+    """Persistent, ordered background renderer for invoice PDFs"""
+
+    def __init__(self, db_manager, output_dir: str = "invoices", cache: RenderedPDFCache = None):
+        """
+        Args:
+            db_manager: The UI thread's DatabaseManager, used only by enqueue/retry
+            output_dir: Root folder; PDFs go to <output_dir>/<YYYY-MM>/<invoice_number>.pdf
+            cache: Rendered PDF cache that serves unchanged invoices on reprint
+        """
+        self.db_manager = db_manager
+        self.output_dir = output_dir
+        self.cache = cache or RenderedPDFCache()
+        self.listeners: List[Callable[[Dict], None]] = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_listener(self, callback: Callable[[Dict], None]):
+        """Register a callback for job status changes (called on the worker thread)"""
+        self.listeners.append(callback)
+
+    def start(self):
+        """Start the worker thread and resume any jobs left from a previous run"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="invoice-print-queue", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the worker after the job in progress; queued jobs stay queued"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def enqueue(self, invoice_id: int) -> int:
+        """Queue an invoice for rendering and return the job ID (call from the UI thread)"""
+        job_id = self.db_manager.add_print_job(invoice_id)
+        if job_id != -1:
+            self._wake.set()
+        return job_id
+
+    def retry(self, job_id: int) -> bool:
+        """Put a failed job back in the queue with a fresh set of attempts (call from the UI thread)"""
+        if not self.db_manager.update_print_job(job_id, 'queued', reset_attempts=True):
+            return False
+        self._wake.set()
+        return True
+
+    def output_path_for(self, invoice: Dict) -> str:
+        """Month folder plus invoice number keeps the output directory in billing order"""
+        month = (invoice.get('invoice_date') or '')[:7] or 'undated'
+        return os.path.join(self.output_dir, month, f"{invoice['invoice_number']}.pdf")
+
+    def _run(self):
+        """Worker loop; owns its own SQLite connection"""
+        from database.db_manager import DatabaseManager
+
+        db = DatabaseManager(self.db_manager.db_path)
+        try:
+            resumed = db.requeue_print_jobs()
+            if resumed:
+                logger.info(f"Resuming {resumed} interrupted print job(s)")
+
+            while not self._stop.is_set():
+                job = db.get_next_print_job()
+                if not job:
+                    self._wake.wait(POLL_SECONDS)
+                    self._wake.clear()
+                    continue
+                self._process(db, job)
+        finally:
+            db.close()
+
+    def _process(self, db, job: Dict):
+        """Render one job, retrying with a back-off before marking it failed"""
+        job_id = job['id']
+        db.update_print_job(job_id, 'rendering', count_attempt=True)
+        self._notify(db, job_id)
+
+        try:
+            invoice = db.get_invoice_by_id(job['invoice_id'])
+            if not invoice:
+                raise ValueError(f"Invoice {job['invoice_id']} not found")
+
+            items = db.get_invoice_items(job['invoice_id'])
+            company = db.get_company_settings()
+
+            output_path = self.output_path_for(invoice)
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+            generator = PDFGenerator(company)
+            cached_path = self.cache.get_or_render(
+                company, invoice, items,
+                lambda path: generator.generate_invoice_pdf(invoice, items, path)
+            )
+            if not cached_path:
+                raise RuntimeError("PDF generation failed")
+            shutil.copyfile(cached_path, output_path)
+
+            db.update_print_job(job_id, 'done', output_path=output_path)
+        except Exception as e:
+            attempts = job['attempts'] + 1
+            logger.warning(f"Print job {job_id} failed (attempt {attempts}/{MAX_ATTEMPTS}): {e}")
+
+            if attempts < MAX_ATTEMPTS:
+                db.update_print_job(job_id, 'queued', error=str(e))
+                self._stop.wait(RETRY_DELAY_SECONDS * attempts)
+            else:
+                db.update_print_job(job_id, 'failed', error=str(e))
+
+        self._notify(db, job_id)
+
+    def _notify(self, db, job_id: int):
+        """Send the job's current state to every listener"""
+        job = db.get_print_job(job_id)
+        if not job:
+            return
+        for callback in self.listeners:
+            try:
+                callback(job)
+            except Exception as e:
+                logger.warning(f"Print queue listener failed: {e}")
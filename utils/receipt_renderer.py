@@ -0,0 +1,133 @@
+"""
+Receipt Renderer - Thermal receipt output for 58mm/80mm printers
+Takes the same invoice/items data as PDFGenerator.generate_invoice_pdf and
+produces plain text or raw ESC/POS bytes without going through reportlab
+"""
+import textwrap
+from typing import Dict, List, Tuple
+
+# Characters per line in the printer's default font (Font A, 12x24)
+PAPER_WIDTHS = {
+    '58mm': 32,
+    '80mm': 48,
+}
+
+# Line styles understood by both outputs
+NORMAL, BOLD, LARGE = 'normal', 'bold', 'large'
+
+ESC_INIT = b'\x1b@'
+ESC_STYLE = {
+    NORMAL: b'\x1bE\x00\x1d!\x00',
+    BOLD: b'\x1bE\x01\x1d!\x00',
+    # Double height only, so the line still fits the character width
+    LARGE: b'\x1bE\x01\x1d!\x01',
+}
+ESC_FEED = b'\x1bd\x04'
+ESC_PARTIAL_CUT = b'\x1dV\x42\x00'
+
+# Most printers power up in code page 437; the rupee sign is not in it
+RECEIPT_ENCODING = 'cp437'
+
+
+class ReceiptRenderer:
+    """Fixed-width receipt layout shared by the text and ESC/POS outputs"""
+
+    def __init__(self, company_settings: Dict, paper: str = '80mm'):
+        if paper not in PAPER_WIDTHS:
+            raise ValueError(f"Unsupported paper width: {paper}")
+        self.company_settings = company_settings
+        self.paper = paper
+        self.width = PAPER_WIDTHS[paper]
+
+    def render_lines(self, invoice_data: Dict, items: List[Dict]) -> List[Tuple[str, str]]:
+        """Receipt as (style, padded_text) lines"""
+        width = self.width
+        settings = self.company_settings
+        lines = []
+
+        def center(text, style=NORMAL):
+            for part in textwrap.wrap(text, width) or ['']:
+                lines.append((style, part.center(width).rstrip()))
+
+        def left_right(left, right, style=NORMAL):
+            gap = width - len(left) - len(right)
+            if gap < 1:
+                lines.append((style, left[:width]))
+                lines.append((style, right.rjust(width)))
+            else:
+                lines.append((style, left + ' ' * gap + right))
+
+        def rule(char='-'):
+            lines.append((NORMAL, char * width))
+
+        # Company header
+        center(settings.get('company_name') or 'My Business', LARGE)
+        if settings.get('address'):
+            center(settings['address'])
+        if settings.get('phone'):
+            center(f"Ph: {settings['phone']}")
+        if settings.get('gstin'):
+            center(f"GSTIN: {settings['gstin']}")
+        rule('=')
+
+        # Invoice details
+        center("TAX INVOICE", BOLD)
+        issued = f"{invoice_data.get('invoice_date') or ''} {(invoice_data.get('invoice_time') or '')[:5]}"
+        left_right(f"Bill: {invoice_data['invoice_number']}", issued.strip())
+        for part in textwrap.wrap(f"Customer: {invoice_data['customer_name']}", width):
+            lines.append((NORMAL, part))
+        if invoice_data.get('customer_phone'):
+            lines.append((NORMAL, f"Ph: {invoice_data['customer_phone']}"[:width]))
+        rule()
+
+        # Items: name on its own line(s), then qty x rate and amount
+        for item in items:
+            for part in textwrap.wrap(item['product_name'], width) or ['']:
+                lines.append((NORMAL, part))
+            detail = f"  {item['quantity']:g} {item.get('unit', '')} x {item['unit_price']:.2f}"
+            if item.get('gst_rate'):
+                detail += f" +{item['gst_rate']:g}%"
+            left_right(detail, f"{item['total_amount']:,.2f}")
+        rule()
+
+        # Totals
+        left_right("Subtotal", f"{invoice_data['subtotal']:,.2f}")
+        if (invoice_data.get('discount_amount') or 0) > 0:
+            left_right("Discount", f"-{invoice_data['discount_amount']:,.2f}")
+        if (invoice_data.get('tax_amount') or 0) > 0:
+            left_right("GST", f"{invoice_data['tax_amount']:,.2f}")
+        left_right("TOTAL", f"Rs.{invoice_data['rounded_total']:,.2f}", BOLD)
+        if (invoice_data.get('amount_paid') or 0) > 0:
+            left_right("Paid", f"{invoice_data['amount_paid']:,.2f}")
+            left_right("Balance", f"{invoice_data['balance_amount']:,.2f}", BOLD)
+        rule()
+
+        center("Thank you for your business!")
+        return lines
+
+    def render_text(self, invoice_data: Dict, items: List[Dict]) -> str:
+        """Plain-text receipt, e.g. for preview or a generic text printer"""
+        return '\n'.join(text for _, text in self.render_lines(invoice_data, items)) + '\n'
+
+    def render_escpos(self, invoice_data: Dict, items: List[Dict]) -> bytes:
+        """Raw ESC/POS job: initialise, styled lines, feed and partial cut"""
+        parts = [ESC_INIT]
+        current_style = NORMAL
+        for style, text in self.render_lines(invoice_data, items):
+            if style != current_style:
+                parts.append(ESC_STYLE[style])
+                current_style = style
+            parts.append(text.encode(RECEIPT_ENCODING, 'replace'))
+            parts.append(b'\n')
+
+        if current_style != NORMAL:
+            parts.append(ESC_STYLE[NORMAL])
+        parts.append(ESC_FEED)
+        parts.append(ESC_PARTIAL_CUT)
+        return b''.join(parts)
+
+    @staticmethod
+    def write(data: bytes, path: str):
+        """Write a job to a file or a printer device (e.g. /dev/usb/lp0 or \\\\host\\printer)"""
+        with open(path, 'wb') as f:
+            f.write(data)
@@ -0,0 +1,195 @@
+"""
+Report Cache - Serve unchanged reports without re-querying
+
+Entries are keyed by report type and parameters and remember the
+``data_versions`` counters of the tables they were built from. A lookup
+whose counters still match is served from memory; a background thread
+rebuilds entries whose tables have changed so the next lookup is instant
+too.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Total cached rows across all entries; the least recently used go first
+DEFAULT_MAX_ROWS = 200000
+
+# How often the refresher checks for changes made by other connections
+REFRESH_SECONDS = 5
+
+
+def _sales(db, start_date="", end_date=""):
+    return db.search_invoices(start_date=start_date, end_date=end_date)
+
+
+def _stock(db):
+    return db.get_all_products()
+
+
+def _low_stock(db):
+    return db.get_low_stock_products()
+
+
+def _stock_movement(db, start_date="", end_date=""):
+    return db.get_stock_movement(start_date, end_date)
+
+
+def _product_sales(db, start_date="", end_date=""):
+    return db.get_product_sales(start_date, end_date)
+
+
+def _gst(db, start_date="", end_date=""):
+    return db.get_gst_summary(start_date, end_date)
+
+
+def _aging(db, as_of=None):
+    return db.get_receivables_aging(as_of)
+
+
+def _customers(db):
+    return db.get_customer_summary()
+
+
+# report_type -> (tables it reads, loader(db, **params))
+REPORT_SOURCES = {
+    'sales': (('invoices',), _sales),
+    'stock': (('products', 'categories'), _stock),
+    'low_stock': (('products', 'categories'), _low_stock),
+    'stock_movement': (('stock_transactions', 'products'), _stock_movement),
+    'product_sales': (('invoice_items', 'invoices', 'products'), _product_sales),
+    'gst': (('invoice_items', 'invoices'), _gst),
+    'aging': (('invoices',), _aging),
+    'customers': (('customers', 'invoices'), _customers),
+}
+
+
+class ReportCache:
+    """Size-bounded LRU cache of report rows, validated against table change counters"""
+
+    def __init__(self, db_manager, max_rows: int = DEFAULT_MAX_ROWS):
+        """
+        Args:
+            db_manager: The UI thread's DatabaseManager, used by get()
+            max_rows: Upper bound on rows held across all entries
+        """
+        self.db_manager = db_manager
+        self.max_rows = max_rows
+        self.listeners: List[Callable[[str, Dict], None]] = []
+        # key -> (versions, rows); key is (report_type, sorted params)
+        self._entries: "OrderedDict[Tuple, Tuple[Dict, List[Dict]]]" = OrderedDict()
+        self._rows = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_listener(self, callback: Callable[[str, Dict], None]):
+        """Register a callback for refreshed entries, called as (report_type, params) on the worker thread"""
+        self.listeners.append(callback)
+
+    def start(self):
+        """Start the background refresher"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="report-cache-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the refresher after the rebuild in progress"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def get(self, report_type: str, **params) -> List[Dict]:
+        """Rows for a report, from the cache if none of its tables changed (call from the UI thread)"""
+        tables, loader = REPORT_SOURCES[report_type]
+        key = (report_type, tuple(sorted(params.items())))
+        versions = self.db_manager.get_data_versions(tables)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == versions:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        rows = loader(self.db_manager, **params)
+        self._store(key, versions, rows)
+        return rows
+
+    def invalidate(self, report_type: str = None):
+        """Drop cached entries for one report type, or all of them"""
+        with self._lock:
+            for key in [key for key in self._entries if report_type in (None, key[0])]:
+                self._rows -= len(self._entries.pop(key)[1])
+
+    def _store(self, key: Tuple, versions: Dict, rows: List[Dict]):
+        """Insert or replace an entry, then evict down to max_rows"""
+        with self._lock:
+            self._put(key, versions, rows)
+
+    def _put(self, key: Tuple, versions: Dict, rows: List[Dict]):
+        """_store without taking the lock"""
+        old = self._entries.pop(key, None)
+        if old:
+            self._rows -= len(old[1])
+
+        # A report bigger than the whole cache is returned but not kept
+        if len(rows) > self.max_rows:
+            return
+
+        self._entries[key] = (versions, rows)
+        self._rows += len(rows)
+        while self._rows > self.max_rows:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._rows -= len(evicted)
+
+    def _run(self):
+        """Refresher loop; owns its own SQLite connection"""
+        from database.db_manager import DatabaseManager
+
+        db = DatabaseManager(self.db_manager.db_path)
+        try:
+            last_seen = None
+            while not self._stop.wait(REFRESH_SECONDS):
+                # data_version changes only when another connection commits,
+                # so an idle database costs one pragma per interval
+                data_version = db.execute_query("PRAGMA data_version")[0]['data_version']
+                if data_version == last_seen:
+                    continue
+                last_seen = data_version
+                self._refresh_stale(db)
+        except Exception as e:
+            logger.warning(f"Report cache refresher stopped: {e}")
+        finally:
+            db.close()
+
+    def _refresh_stale(self, db):
+        """Rebuild every entry whose tables changed, most recently used first"""
+        with self._lock:
+            snapshot = [(key, entry[0]) for key, entry in reversed(self._entries.items())]
+
+        for key, cached_versions in snapshot:
+            if self._stop.is_set():
+                return
+
+            report_type, params = key
+            tables, loader = REPORT_SOURCES[report_type]
+            versions = db.get_data_versions(tables)
+            if versions == cached_versions:
+                continue
+
+            rows = loader(db, **dict(params))
+            with self._lock:
+                # Skip entries evicted or reloaded by the UI in the meantime
+                if key not in self._entries or self._entries[key][0] != cached_versions:
+                    continue
+                self._put(key, versions, rows)
+
+            for listener in self.listeners:
+                try:
+                    listener(report_type, dict(params))
+                except Exception as e:
+                    logger.warning(f"Report cache listener failed: {e}")
@@ -0,0 +1,443 @@
+"""
+Report Export - Stream report rows from the database into CSV, XLSX or PDF
+
+Rows come straight from ``DatabaseManager.iter_report_rows`` in chunks and
+each writer emits them as they arrive, so memory use does not depend on
+the size of the report.
+"""
+import csv
+import os
+import zlib
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import logging
+
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+logger = logging.getLogger(__name__)
+
+# Column kinds: 'text' is written as-is, 'money' and 'number' stay numeric
+# in CSV/XLSX and are right-aligned in PDF
+TEXT, MONEY, NUMBER = 'text', 'money', 'number'
+
+INVOICE_COLUMNS = [
+    ("Date", 'invoice_date', TEXT, 1),
+    ("Invoice #", 'invoice_number', TEXT, 1.2),
+    ("Customer", 'customer_name', TEXT, 2.4),
+    ("Total", 'grand_total', MONEY, 1.2),
+    ("Paid", 'amount_paid', MONEY, 1.2),
+    ("Balance", 'balance_amount', MONEY, 1.2),
+    ("Status", 'payment_status', TEXT, 1.2),
+]
+
+# report_type -> (title, [(header, key, kind, relative width)])
+REPORTS = {
+    'sales': ("Sales Report", INVOICE_COLUMNS[:5] + INVOICE_COLUMNS[6:]),
+    'payments': ("Payment Report", INVOICE_COLUMNS),
+    'stock': ("Stock Report", [
+        ("Code", 'product_code', TEXT, 1),
+        ("Product", 'product_name', TEXT, 2.5),
+        ("Unit", 'unit', TEXT, 0.6),
+        ("Current Stock", 'current_stock', NUMBER, 1),
+        ("Min Level", 'min_stock_level', NUMBER, 0.9),
+        ("Value", 'stock_value', MONEY, 1.2),
+        ("Status", 'stock_status', TEXT, 0.8),
+    ]),
+    'low_stock': ("Low Stock Report", [
+        ("Code", 'product_code', TEXT, 1),
+        ("Product", 'product_name', TEXT, 2.5),
+        ("Unit", 'unit', TEXT, 0.6),
+        ("Current Stock", 'current_stock', NUMBER, 1),
+        ("Min Level", 'min_stock_level', NUMBER, 0.9),
+        ("Shortage", 'shortage', NUMBER, 0.9),
+        ("Reorder Qty", 'reorder_qty', NUMBER, 0.9),
+    ]),
+    'stock_movement': ("Stock Movement Report", [
+        ("Code", 'product_code', TEXT, 1),
+        ("Product", 'product_name', TEXT, 2.5),
+        ("Unit", 'unit', TEXT, 0.6),
+        ("Opening", 'opening_qty', NUMBER, 1),
+        ("Inward", 'inward_qty', NUMBER, 1),
+        ("Outward", 'outward_qty', NUMBER, 1),
+        ("Closing", 'closing_qty', NUMBER, 1),
+    ]),
+    'product_sales': ("Product Sales Report", [
+        ("Code", 'product_code', TEXT, 1),
+        ("Product", 'product_name', TEXT, 2.5),
+        ("Qty", 'quantity', NUMBER, 0.8),
+        ("Unit", 'unit', TEXT, 0.6),
+        ("Revenue", 'revenue', MONEY, 1.2),
+        ("Tax", 'tax_amount', MONEY, 1.1),
+        ("Total", 'total_amount', MONEY, 1.2),
+        ("Margin", 'margin', MONEY, 1.2),
+    ]),
+    'gst': ("GST Summary", [
+        ("Month", 'tax_month', TEXT, 0.9),
+        ("GST %", 'gst_rate', NUMBER, 0.6),
+        ("Taxable Value", 'taxable_amount', MONEY, 1.3),
+        ("CGST", 'cgst_amount', MONEY, 1.1),
+        ("SGST", 'sgst_amount', MONEY, 1.1),
+        ("Total Tax", 'gst_amount', MONEY, 1.1),
+        ("Invoice Value", 'total_amount', MONEY, 1.3),
+        ("Lines", 'line_count', NUMBER, 0.7),
+    ]),
+    'gst_invoices': ("GST Invoice Register", [
+        ("Date", 'invoice_date', TEXT, 0.9),
+        ("Invoice No", 'invoice_number', TEXT, 1.1),
+        ("Customer", 'customer_name', TEXT, 2),
+        ("GSTIN", 'gstin', TEXT, 1.3),
+        ("GST %", 'gst_rate', NUMBER, 0.6),
+        ("Taxable Value", 'taxable_amount', MONEY, 1.2),
+        ("CGST", 'cgst_amount', MONEY, 1),
+        ("SGST", 'sgst_amount', MONEY, 1),
+        ("Invoice Value", 'total_amount', MONEY, 1.2),
+    ]),
+    'aging': ("Receivables Aging", [
+        ("Customer", 'customer_name', TEXT, 2.4),
+        ("Invoices", 'invoice_count', NUMBER, 0.7),
+        ("Oldest", 'oldest_invoice_date', TEXT, 1),
+        ("0-30 days", 'days_0_30', MONEY, 1.1),
+        ("31-60 days", 'days_31_60', MONEY, 1.1),
+        ("61-90 days", 'days_61_90', MONEY, 1.1),
+        ("90+ days", 'days_90_plus', MONEY, 1.1),
+        ("Total Due", 'total_due', MONEY, 1.2),
+    ]),
+    'customers': ("Customer Summary", [
+        ("Customer", 'customer_name', TEXT, 2.5),
+        ("Phone", 'phone', TEXT, 1.2),
+        ("Total Purchases", 'total_purchases', MONEY, 1.3),
+        ("Total Paid", 'total_paid', MONEY, 1.3),
+        ("Balance", 'balance', MONEY, 1.3),
+    ]),
+    'products': ("Product List", [
+        ("Code", 'product_code', TEXT, 1),
+        ("Product", 'product_name', TEXT, 2.5),
+        ("Category", 'category_name', TEXT, 1.2),
+        ("Unit", 'unit', TEXT, 0.6),
+        ("Purchase Price", 'purchase_price', MONEY, 1.1),
+        ("Selling Price", 'selling_price', MONEY, 1.1),
+        ("GST %", 'gst_rate', NUMBER, 0.6),
+        ("Stock", 'current_stock', NUMBER, 0.8),
+        ("Min Level", 'min_stock_level', NUMBER, 0.8),
+    ]),
+}
+
+EXPORT_FORMATS = ('csv', 'xlsx', 'pdf')
+
+
+def format_value(value, kind: str) -> str:
+    """Display text for a cell, as shown in the PDF"""
+    if value is None:
+        return ''
+    if kind == MONEY:
+        return f"{value:,.2f}"
+    if kind == NUMBER:
+        return f"{value:g}"
+    return str(value)
+
+
+class CSVReportWriter:
+    """Plain CSV with a header row; numbers are left unformatted"""
+
+    def __init__(self, path: str, title: str, subtitle: str, columns: List[tuple]):
+        self.columns = columns
+        # utf-8-sig so Excel detects the encoding
+        self.file = open(path, 'w', newline='', encoding='utf-8-sig')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([header for header, _, _, _ in columns])
+
+    def write_rows(self, rows: List[Dict]):
+        keys = [key for _, key, _, _ in self.columns]
+        self.writer.writerows([row[key] for key in keys] for row in rows)
+
+    def close(self):
+        self.file.close()
+
+
+class XLSXReportWriter:
+    """openpyxl write-only workbook; rows are flushed to disk as they are appended"""
+
+    def __init__(self, path: str, title: str, subtitle: str, columns: List[tuple]):
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+        from openpyxl.utils import get_column_letter
+
+        self.path = path
+        self.columns = columns
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(title[:31])
+        self.sheet.freeze_panes = 'A2'
+
+        for idx, (_, _, _, width) in enumerate(columns, 1):
+            self.sheet.column_dimensions[get_column_letter(idx)].width = width * 12
+
+        header = []
+        for name, _, _, _ in columns:
+            cell = WriteOnlyCell(self.sheet, value=name)
+            cell.font = Font(bold=True)
+            header.append(cell)
+        self.sheet.append(header)
+
+        # One styled cell per money column, reused for every row
+        self.money_cells = {}
+        for idx, (_, _, kind, _) in enumerate(columns):
+            if kind == MONEY:
+                cell = WriteOnlyCell(self.sheet)
+                cell.number_format = '#,##0.00'
+                self.money_cells[idx] = cell
+
+    def write_rows(self, rows: List[Dict]):
+        keys = [key for _, key, _, _ in self.columns]
+        for row in rows:
+            values = [row[key] for key in keys]
+            for idx, cell in self.money_cells.items():
+                cell.value = values[idx]
+                values[idx] = cell
+            self.sheet.append(values)
+
+    def close(self):
+        self.workbook.save(self.path)
+
+
+class PDFReportWriter:
+    """
+    Landscape A4 tables written page by page straight to the file
+
+    reportlab's canvas keeps every page in memory until save(), so this
+    writer emits the PDF objects itself: each page's content stream is
+    compressed and written as soon as the page is full, and only the
+    object offsets are kept for the cross-reference table. Text uses the
+    standard Helvetica fonts, so nothing is embedded.
+    """
+
+    PAGE_SIZE = landscape(A4)
+    MARGIN = 36
+    ROW_HEIGHT = 14
+    HEADER_HEIGHT = 18
+    FONT_SIZE = 8
+    PADDING = 4
+
+    # Fixed object numbers; pages follow from FIRST_PAGE_OBJECT
+    CATALOG, PAGES, FONT, FONT_BOLD = 1, 2, 3, 4
+    FIRST_PAGE_OBJECT = 5
+
+    def __init__(self, path: str, title: str, subtitle: str, columns: List[tuple]):
+        self.file = open(path, 'wb')
+        self.title = title
+        self.subtitle = subtitle
+        self.columns = columns
+
+        page_width, page_height = self.PAGE_SIZE
+        table_width = page_width - 2 * self.MARGIN
+        scale = table_width / sum(width for _, _, _, width in columns)
+        self.col_x = [self.MARGIN]
+        for _, _, _, width in columns:
+            self.col_x.append(self.col_x[-1] + width * scale)
+
+        self.table_top = page_height - self.MARGIN - 40
+        self.rows_per_page = int((self.table_top - self.HEADER_HEIGHT - self.MARGIN - 12) // self.ROW_HEIGHT)
+
+        self.offsets = {}
+        self.page_objects = []
+        self.next_object = self.FIRST_PAGE_OBJECT
+        self.page_rows = []
+
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._write_object(self.CATALOG, f"<< /Type /Catalog /Pages {self.PAGES} 0 R >>".encode())
+        for number, font in ((self.FONT, 'Helvetica'), (self.FONT_BOLD, 'Helvetica-Bold')):
+            self._write_object(number, f"<< /Type /Font /Subtype /Type1 /BaseFont /{font} "
+                                       f"/Encoding /WinAnsiEncoding >>".encode())
+
+    def write_rows(self, rows: List[Dict]):
+        for row in rows:
+            self.page_rows.append(row)
+            if len(self.page_rows) >= self.rows_per_page:
+                self._flush_page()
+
+    def close(self):
+        if self.page_rows or not self.page_objects:
+            self._flush_page()
+
+        kids = ' '.join(f"{number} 0 R" for number in self.page_objects)
+        self._write_object(self.PAGES, f"<< /Type /Pages /Kids [{kids}] "
+                                       f"/Count {len(self.page_objects)} >>".encode())
+
+        xref_offset = self.file.tell()
+        count = self.next_object
+        self.file.write(f"xref\n0 {count}\n0000000000 65535 f \n".encode())
+        self.file.write(''.join(f"{self.offsets[number]:010d} 00000 n \n"
+                                for number in range(1, count)).encode())
+        self.file.write(f"trailer\n<< /Size {count} /Root {self.CATALOG} 0 R >>\n"
+                        f"startxref\n{xref_offset}\n%%EOF\n".encode())
+        self.file.close()
+
+    def _write_object(self, number: int, body: bytes):
+        self.offsets[number] = self.file.tell()
+        self.file.write(f"{number} 0 obj\n".encode())
+        self.file.write(body)
+        self.file.write(b"\nendobj\n")
+
+    @staticmethod
+    def _escape(text: str) -> str:
+        """PDF string literal body in WinAnsi; characters outside it become '?'"""
+        text = text.encode('cp1252', 'replace').decode('latin-1')
+        return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+    def _fit(self, text: str, font: str, width: float) -> str:
+        """Trim text that would overflow its cell"""
+        # Cheap upper bound first; most cells never need measuring
+        if len(text) * self.FONT_SIZE * 0.6 <= width:
+            return text
+        while text and stringWidth(text + '...', font, self.FONT_SIZE) > width:
+            text = text[:-1]
+        return text + '...'
+
+    def _flush_page(self):
+        page_width, page_height = self.PAGE_SIZE
+        page_number = len(self.page_objects) + 1
+        left, right = self.col_x[0], self.col_x[-1]
+        ops = []
+
+        # Title block
+        ops.append(f"BT /F2 14 Tf 0.173 0.243 0.314 rg {left} {page_height - self.MARGIN - 14} Td "
+                   f"({self._escape(self.title)}) Tj ET")
+        ops.append(f"BT /F1 9 Tf 0.4 0.4 0.4 rg {left} {page_height - self.MARGIN - 28} Td "
+                   f"({self._escape(self.subtitle)}) Tj ET")
+
+        # Header band, row stripes and grid
+        y = self.table_top
+        bottom = y - self.HEADER_HEIGHT - self.ROW_HEIGHT * len(self.page_rows)
+        ops.append(f"0.204 0.286 0.369 rg {left} {y - self.HEADER_HEIGHT} {right - left} {self.HEADER_HEIGHT} re f")
+        ops.append("0.973 0.976 0.98 rg")
+        for idx in range(1, len(self.page_rows), 2):
+            row_top = y - self.HEADER_HEIGHT - idx * self.ROW_HEIGHT
+            ops.append(f"{left} {row_top - self.ROW_HEIGHT} {right - left} {self.ROW_HEIGHT} re f")
+
+        ops.append("0.5 w 0.5 0.5 0.5 RG")
+        for x in self.col_x:
+            ops.append(f"{x:.2f} {y} m {x:.2f} {bottom} l")
+        ops.append(f"{left} {y} m {right} {y} l")
+        row_y = y - self.HEADER_HEIGHT
+        for _ in range(len(self.page_rows) + 1):
+            ops.append(f"{left} {row_y} m {right} {row_y} l")
+            row_y -= self.ROW_HEIGHT
+        ops.append("S")
+
+        # Cell text, in one text object
+        ops.append("BT")
+        ops.append(f"/F2 {self.FONT_SIZE} Tf 1 1 1 rg")
+        baseline = y - self.HEADER_HEIGHT / 2 - self.FONT_SIZE * 0.35
+        for idx, (header, _, _, _) in enumerate(self.columns):
+            cell_width = self.col_x[idx + 1] - self.col_x[idx] - 2 * self.PADDING
+            text = self._fit(header, 'Helvetica-Bold', cell_width)
+            x = (self.col_x[idx] + self.col_x[idx + 1] - stringWidth(text, 'Helvetica-Bold', self.FONT_SIZE)) / 2
+            ops.append(f"1 0 0 1 {x:.2f} {baseline:.2f} Tm ({self._escape(text)}) Tj")
+
+        ops.append(f"/F1 {self.FONT_SIZE} Tf 0 0 0 rg")
+        baseline = y - self.HEADER_HEIGHT - self.ROW_HEIGHT / 2 - self.FONT_SIZE * 0.35
+        for row in self.page_rows:
+            for idx, (_, key, kind, _) in enumerate(self.columns):
+                cell_width = self.col_x[idx + 1] - self.col_x[idx] - 2 * self.PADDING
+                text = self._fit(format_value(row[key], kind), 'Helvetica', cell_width)
+                if kind == TEXT:
+                    x = self.col_x[idx] + self.PADDING
+                else:
+                    x = self.col_x[idx + 1] - self.PADDING - stringWidth(text, 'Helvetica', self.FONT_SIZE)
+                ops.append(f"1 0 0 1 {x:.2f} {baseline:.2f} Tm ({self._escape(text)}) Tj")
+            baseline -= self.ROW_HEIGHT
+
+        # Page number
+        ops.append(f"/F1 8 Tf 0.4 0.4 0.4 rg 1 0 0 1 {page_width / 2 - 12:.2f} {self.MARGIN / 2} Tm "
+                   f"(Page {page_number}) Tj")
+        ops.append("ET")
+
+        content = zlib.compress('\n'.join(ops).encode('latin-1'))
+        content_object, page_object = self.next_object, self.next_object + 1
+        self.next_object += 2
+
+        self._write_object(content_object,
+                           f"<< /Length {len(content)} /Filter /FlateDecode >>\nstream\n".encode()
+                           + content + b"\nendstream")
+        self._write_object(page_object, (
+            f"<< /Type /Page /Parent {self.PAGES} 0 R /MediaBox [0 0 {page_width:.2f} {page_height:.2f}] "
+            f"/Resources << /Font << /F1 {self.FONT} 0 R /F2 {self.FONT_BOLD} 0 R >> >> "
+            f"/Contents {content_object} 0 R >>"
+        ).encode())
+
+        self.page_objects.append(page_object)
+        self.page_rows = []
+
+
+REPORT_WRITERS = {
+    'csv': CSVReportWriter,
+    'xlsx': XLSXReportWriter,
+    'pdf': PDFReportWriter,
+}
+
+
+class ReportExporter:
+    """Export one report from the database to a file"""
+
+    def __init__(self, db_manager, chunk_size: int = 1000):
+        self.db_manager = db_manager
+        self.chunk_size = chunk_size
+
+    def export(self, report_type: str, output_path: str, fmt: str = None,
+               start_date: str = "", end_date: str = "",
+               progress: Optional[Callable[[int, int], None]] = None,
+               is_cancelled: Optional[Callable[[], bool]] = None) -> Dict:
+        """
+        Write ``report_type`` to ``output_path`` as csv, xlsx or pdf
+
+        ``fmt`` defaults to the file extension. The file is written under a
+        temporary name and only moved into place once complete, so a
+        cancelled or failed export never leaves a partial report behind.
+        ``progress(rows_written, total_rows)`` is called after every chunk.
+        Must run on the thread that owns ``db_manager``'s connection.
+        """
+        if report_type not in REPORTS:
+            raise ValueError(f"Unknown report type: {report_type}")
+        fmt = (fmt or os.path.splitext(output_path)[1].lstrip('.')).lower()
+        if fmt not in REPORT_WRITERS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+
+        title, columns = REPORTS[report_type]
+        subtitle = f"Generated {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+        if start_date or end_date:
+            subtitle = f"{start_date or '...'} to {end_date or '...'} - {subtitle}"
+
+        total = self.db_manager.count_report_rows(report_type, start_date, end_date)
+        temp_path = f"{output_path}.part"
+        written = 0
+        cancelled = False
+
+        try:
+            writer = REPORT_WRITERS[fmt](temp_path, title, subtitle, columns)
+            try:
+                for rows in self.db_manager.iter_report_rows(report_type, start_date, end_date,
+                                                             self.chunk_size):
+                    if is_cancelled and is_cancelled():
+                        cancelled = True
+                        break
+                    writer.write_rows(rows)
+                    written += len(rows)
+                    if progress:
+                        progress(written, max(total, written))
+            finally:
+                writer.close()
+
+            if not cancelled:
+                os.replace(temp_path, output_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        logger.info(f"Exported {written} rows of {report_type} to {output_path}")
+        return {
+            'rows': written,
+            'total': total,
+            'cancelled': cancelled,
+            'output': None if cancelled else output_path,
+        }
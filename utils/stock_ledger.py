@@ -0,0 +1,74 @@
+"""
+Stock Ledger Check - Compare products.current_stock with the stock ledger
+
+Expected stock is opening_stock plus every stock transaction, summed for
+all products in one grouped query. Mismatches are reported and, with
+--repair, current_stock is set to the ledger value in a single
+transaction. Snapshots that disagree with the ledger are rewritten too.
+
+Run headless from the project root:
+    python -m utils.stock_ledger [--db billing_inventory.db] [--repair]
+"""
+import argparse
+import sys
+import time
+from typing import Dict
+
+from database.db_manager import DatabaseManager
+
+
+def run_check(db: DatabaseManager, repair: bool = False) -> Dict:
+    """Check (and optionally repair) the ledger; returns a summary dict"""
+    started = time.perf_counter()
+    mismatches = db.repair_stock_ledger() if repair else db.check_stock_ledger()
+    if mismatches is None:
+        raise RuntimeError("Stock ledger repair failed; nothing was changed")
+
+    snapshots_ok = db.check_stock_snapshots() == 0
+    snapshots_rebuilt = 0
+    if repair and not snapshots_ok:
+        snapshots_rebuilt = db.rebuild_stock_snapshots()
+
+    return {
+        'mismatches': mismatches,
+        'repaired': repair,
+        'snapshots_ok': snapshots_ok,
+        'snapshots_rebuilt': snapshots_rebuilt,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', default="billing_inventory.db", help="Database file")
+    parser.add_argument('--repair', action='store_true', help="Set current_stock to the ledger value")
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db)
+    try:
+        result = run_check(db, args.repair)
+    finally:
+        db.close()
+
+    mismatches = result['mismatches']
+    for row in mismatches:
+        print(f"{row['product_code']:<15} {row['product_name'][:40]:<40} "
+              f"current {row['current_stock']:>12g}   ledger {row['ledger_stock']:>12g}   "
+              f"difference {row['difference']:>+12g}")
+
+    action = "repaired" if result['repaired'] else "found"
+    print(f"{len(mismatches)} mismatch(es) {action} in {result['seconds']:.1f}s")
+    if not result['snapshots_ok']:
+        if result['snapshots_rebuilt'] == -1:
+            print("Stock snapshots disagree with the ledger and could not be rebuilt")
+        elif result['repaired']:
+            print(f"Rebuilt {result['snapshots_rebuilt']} stock snapshot(s) that disagreed with the ledger")
+        else:
+            print("Stock snapshots disagree with the ledger; run with --repair to rebuild them")
+
+    if mismatches and not result['repaired']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
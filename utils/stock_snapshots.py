@@ -0,0 +1,156 @@
+"""
+Stock Snapshots - Write per-product stock snapshots on a schedule
+
+A snapshot records every product's stock at the end of a day, so stock
+as of any date starts from the nearest snapshot and replays only the
+transactions after it. The scheduler catches up on missed snapshots at
+start and then hourly, writing month-ends by default or every day with
+the 'daily' frequency. After each pass it checks the ledger against
+products.current_stock.
+"""
+import threading
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+FREQUENCIES = ('monthly', 'daily')
+DEFAULT_FREQUENCY = 'monthly'
+
+# Daily snapshots older than this are pruned; month-end snapshots are always kept
+DAILY_RETENTION_DAYS = 62
+
+# How often the scheduler looks for due snapshots
+CHECK_SECONDS = 3600
+
+
+def is_month_end(day: date) -> bool:
+    return (day + timedelta(days=1)).day == 1
+
+
+def due_snapshot_dates(after: date, until: date, frequency: str = DEFAULT_FREQUENCY,
+                       daily_from: date = None) -> List[str]:
+    """
+    Snapshot dates in (after, until], oldest first
+
+    Month-ends are always due; with the 'daily' frequency so is every day
+    from daily_from on, so a long catch-up doesn't write years of daily rows.
+    """
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Unknown snapshot frequency: {frequency}")
+    daily_from = daily_from or after
+    dates = []
+    day = after + timedelta(days=1)
+    while day <= until:
+        if is_month_end(day) or (frequency == 'daily' and day >= daily_from):
+            dates.append(day.isoformat())
+        day += timedelta(days=1)
+    return dates
+
+
+def write_due_snapshots(db, frequency: str = DEFAULT_FREQUENCY, today: date = None) -> List[str]:
+    """Write every snapshot due up to yesterday; returns the dates written"""
+    today = today or date.today()
+    yesterday = today - timedelta(days=1)
+    daily_from = today - timedelta(days=DAILY_RETENTION_DAYS)
+
+    latest = db.get_latest_stock_snapshot_date()
+    if latest:
+        after = date.fromisoformat(latest)
+    else:
+        # Nothing to replay before the first transaction
+        first = db.execute_query("SELECT MIN(transaction_date) AS first_date FROM stock_transactions")
+        if not first or not first[0]['first_date']:
+            return []
+        after = date.fromisoformat(first[0]['first_date']) - timedelta(days=1)
+
+    written = []
+    for snapshot_date in due_snapshot_dates(after, yesterday, frequency, daily_from):
+        if db.write_stock_snapshot(snapshot_date) == -1:
+            break
+        written.append(snapshot_date)
+
+    if frequency == 'daily':
+        db.prune_stock_snapshots(daily_from.isoformat())
+    return written
+
+
+class StockSnapshotScheduler:
+    """Background writer of due stock snapshots, with a ledger check after each pass"""
+
+    def __init__(self, db_manager, frequency: str = DEFAULT_FREQUENCY):
+        """
+        Args:
+            db_manager: The UI thread's DatabaseManager; the scheduler opens its own connection
+            frequency: 'monthly' or 'daily'
+        """
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"Unknown snapshot frequency: {frequency}")
+        self.db_manager = db_manager
+        self.frequency = frequency
+        self.listeners: List[Callable[[Dict], None]] = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_listener(self, callback: Callable[[Dict], None]):
+        """
+        Register a callback for completed passes, called on the worker thread
+        with {'written': [dates], 'mismatches': [rows]}
+        """
+        self.listeners.append(callback)
+
+    def start(self):
+        """Start the scheduler; the first pass runs straight away"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._wake.set()
+        self._thread = threading.Thread(target=self._run, name="stock-snapshots", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the scheduler after the snapshot in progress"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def run_now(self):
+        """Ask for a pass without waiting for the next check"""
+        self._wake.set()
+
+    def _run(self):
+        """Scheduler loop; owns its own SQLite connection"""
+        from database.db_manager import DatabaseManager
+
+        db = DatabaseManager(self.db_manager.db_path)
+        try:
+            while not self._stop.is_set():
+                self._wake.wait(CHECK_SECONDS)
+                self._wake.clear()
+                if self._stop.is_set():
+                    break
+                self._pass(db)
+        except Exception as e:
+            logger.warning(f"Stock snapshot scheduler stopped: {e}")
+        finally:
+            db.close()
+
+    def _pass(self, db):
+        """Write due snapshots, then verify the ledger against current_stock"""
+        written = write_due_snapshots(db, self.frequency)
+        if written:
+            logger.info(f"Wrote stock snapshots for {', '.join(written)}")
+
+        mismatches = db.verify_stock_snapshots()
+        if mismatches:
+            logger.warning(f"{len(mismatches)} product(s) have current_stock out of line with the stock ledger")
+
+        result = {'written': written, 'mismatches': mismatches}
+        for listener in self.listeners:
+            try:
+                listener(result)
+            except Exception as e:
+                logger.warning(f"Stock snapshot listener failed: {e}")